@@ -42,12 +42,25 @@ def main(args):
     #crop image and extract 3dmm from image
     first_frame_dir = os.path.join(save_dir, 'first_frame_dir')
     os.makedirs(first_frame_dir, exist_ok=True)
-    print('3DMM Extraction for source image')
-    first_coeff_path, crop_pic_path, crop_info =  preprocess_model.generate(pic_path, first_frame_dir, args.preprocess,\
-                                                                             source_image_flag=True, pic_size=args.size)
-    if first_coeff_path is None:
-        print("Can't get the coeffs of the input")
-        return
+    cache = None
+    cached = None
+    if args.preprocess_cache:
+        from src.utils.preprocess_cache import PreprocessCache
+        cache = PreprocessCache(args.preprocess_cache)
+        cached = cache.get(pic_path, args.preprocess, args.size)
+    if cached is not None:
+        print('3DMM Extraction for source image (cached)')
+        first_coeff_path, crop_pic_path, crop_info = cached
+    else:
+        print('3DMM Extraction for source image')
+        first_coeff_path, crop_pic_path, crop_info =  preprocess_model.generate(pic_path, first_frame_dir, args.preprocess,\
+                                                                                 source_image_flag=True, pic_size=args.size)
+        if first_coeff_path is None:
+            print("Can't get the coeffs of the input")
+            return
+        if cache is not None:
+            first_coeff_path, crop_pic_path, crop_info = cache.put(pic_path, args.preprocess, args.size,
+                                                                   first_coeff_path, crop_pic_path, crop_info)
 
     if ref_eyeblink is not None:
         ref_eyeblink_videoname = os.path.splitext(os.path.split(ref_eyeblink)[-1])[0]
@@ -118,6 +131,7 @@ if __name__ == '__main__':
     parser.add_argument("--preprocess", default='crop', choices=['crop', 'extcrop', 'resize', 'full', 'extfull'], help="how to preprocess the images" ) 
     parser.add_argument("--verbose",action="store_true", help="saving the intermedia output or not" ) 
     parser.add_argument("--old_version",action="store_true", help="use the pth other than safetensor version" ) 
+    parser.add_argument("--preprocess_cache", default=None, help="directory caching source image crop + 3DMM coeffs across runs" ) 
 
 
     # net structure and parameters
@@ -0,0 +1,102 @@
+"""Persistent on-disk cache of SadTalker's source-image preprocessing.
+
+Shared by `inference.py` (`--preprocess_cache`) and the render server in the
+parent repo (`scripts/sadtalker_server.py`), so both reuse the same entries.
+Standard library only.
+"""
+import os
+import json
+import time
+import hashlib
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when SadTalker's preprocessing (or its face/3DMM checkpoints) changes
+PREPROCESS_CACHE_VERSION = "v1"
+
+
+def _plain(value: Any) -> Any:
+    """crop_info as JSON-safe lists/numbers (SadTalker mixes tuples and numpy values)."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class PreprocessCache:
+    """Persistent cache of SadTalker's per-image preprocessing.
+
+    Face detection, landmarks, cropping and 3DMM coefficient extraction
+    (`CropAndExtract.generate`) depend only on the source image, the
+    preprocess mode and the size. The anchor image is the same for every
+    clip, so results are stored once under
+    `<root>/<sha256>_<preprocess>_<size>/` (coefficients `.mat`, cropped
+    frame, `entry.json` with `crop_info`) and reused by every later render,
+    across restarts and between the server and one-off `inference.py` runs.
+    Image hashes are memoized per path, size and mtime.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.hits = 0
+        self.misses = 0
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def _image_hash(self, image: str) -> str:
+        st = os.stat(image)
+        key = (os.path.abspath(image), st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(key)
+        if digest is None:
+            with open(image, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self._hashes[key] = digest
+        return digest
+
+    def entry_dir(self, image: str, preprocess: str, size: int) -> str:
+        return os.path.join(self.root, f"{self._image_hash(image)[:24]}_{preprocess}_{int(size)}_{PREPROCESS_CACHE_VERSION}")
+
+    @staticmethod
+    def _load(d: str) -> Optional[Tuple[str, str, Any]]:
+        try:
+            with open(os.path.join(d, "entry.json"), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            coeff, crop = os.path.join(d, entry["first_coeff"]), os.path.join(d, entry["crop_pic"])
+        except (OSError, ValueError, KeyError):
+            return None
+        if not (os.path.isfile(coeff) and os.path.isfile(crop)):
+            return None
+        return coeff, crop, entry["crop_info"]
+
+    def get(self, image: str, preprocess: str, size: int) -> Optional[Tuple[str, str, Any]]:
+        cached = self._load(self.entry_dir(image, preprocess, size))
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def put(self, image: str, preprocess: str, size: int, first_coeff_path: str, crop_pic_path: str, crop_info: Any) -> Tuple[str, str, Any]:
+        """Store one preprocessing result; returns the cached `(first_coeff_path, crop_pic_path, crop_info)`."""
+        d = self.entry_dir(image, preprocess, size)
+        tmp = f"{d}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        coeff_name, crop_name = os.path.basename(first_coeff_path), os.path.basename(crop_pic_path)
+        shutil.copyfile(first_coeff_path, os.path.join(tmp, coeff_name))
+        shutil.copyfile(crop_pic_path, os.path.join(tmp, crop_name))
+        with open(os.path.join(tmp, "entry.json"), "w", encoding="utf-8") as f:
+            json.dump({"first_coeff": coeff_name, "crop_pic": crop_name, "crop_info": _plain(crop_info),
+                       "image": os.path.abspath(image), "created": time.time()}, f)
+        try:
+            os.replace(tmp, d)
+        except OSError:
+            # Another render stored the same entry first; keep theirs
+            shutil.rmtree(tmp, ignore_errors=True)
+        # Hits and misses return the same (JSON round-tripped) values
+        return self._load(d) or (first_coeff_path, crop_pic_path, crop_info)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,99 @@
+import os
+import sys
+import math
+import time
+import wave
+import struct
+import argparse
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from single_pipeline.agents import tts_agent_stub
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+
+
+def legacy_write_wav(path, duration_seconds=2.0, sample_rate=16000, text=None):
+    """The previous per-sample implementation, kept here as the benchmark baseline."""
+    words = [w for w in (text or "").split() if w]
+    n_samples = int(duration_seconds * sample_rate)
+    base_freq = 220.0
+    amplitude = 0.25
+    with wave.open(path, "w") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        if words:
+            tone_len = 0.35
+            pause_len = 0.08
+            for w in words:
+                w_hash = (sum(ord(c) for c in w) % 80) - 40
+                freq = max(140.0, min(360.0, base_freq + float(w_hash)))
+                frames_tone = int(tone_len * sample_rate)
+                for i in range(frames_tone):
+                    t = float(i) / sample_rate
+                    attack = min(1.0, i / (sample_rate * 0.02))
+                    release = max(0.2, 1.0 - (i / frames_tone))
+                    a = amplitude * attack * 0.8 * release
+                    sample_f = math.sin(2 * math.pi * freq * t) + 0.3 * math.sin(2 * math.pi * (freq * 2.0) * t)
+                    wf.writeframes(struct.pack("<h", int(max(-32767, min(32767, a * 32767 * sample_f)))))
+                silence = struct.pack("<h", 0)
+                for _ in range(int(pause_len * sample_rate)):
+                    wf.writeframes(silence)
+        else:
+            for i in range(n_samples):
+                t = float(i) / sample_rate
+                attack = min(1.0, i / (sample_rate * 0.02))
+                release = max(0.2, 1.0 - (i / n_samples))
+                a = amplitude * attack * 0.8 * release
+                sample_f = (
+                    math.sin(2 * math.pi * base_freq * t)
+                    + 0.5 * math.sin(2 * math.pi * (base_freq * 2.0) * t)
+                    + 0.25 * math.sin(2 * math.pi * (base_freq * 3.0) * t)
+                )
+                wf.writeframes(struct.pack("<h", int(max(-32767, min(32767, a * 32767 * sample_f)))))
+
+
+def _frames(path):
+    with wave.open(path, "rb") as wf:
+        data = wf.readframes(wf.getnframes())
+    return struct.unpack(f"<{len(data) // 2}h", data)
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTSAgentStub._write_wav against the per-sample baseline")
+    parser.add_argument("--words", type=int, default=150, help="Narration length in words (~60 s at the stub's pacing)")
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = " ".join(f"word{i % 37}" for i in range(args.words))
+    stub = TTSAgentStub()
+    duration = stub._duration_for_text(text)
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "legacy.wav")
+        new_path = os.path.join(tmp, "current.wav")
+        for label, kw in (("words", {"text": text}), ("plain", {"text": None})):
+            old = _time(lambda: legacy_write_wav(old_path, duration, args.sample_rate, **kw), args.repeat)
+            new = _time(lambda: stub._write_wav(new_path, duration, args.sample_rate, **kw), args.repeat)
+            a, b = _frames(old_path), _frames(new_path)
+            max_diff = max((abs(x - y) for x, y in zip(a, b)), default=0)
+            print(
+                f"{label:6s} frames={len(b)} legacy={old * 1000:.1f}ms current={new * 1000:.1f}ms "
+                f"speedup={old / new:.1f}x same_length={len(a) == len(b)} max_sample_diff={max_diff}"
+            )
+    print(f"numpy={'yes' if tts_agent_stub.np is not None else 'no (pure-Python fallback)'}")
+
+
+if __name__ == "__main__":
+    main()
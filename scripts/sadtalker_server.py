@@ -0,0 +1,348 @@
+"""Long-running SadTalker render server: models load once, each job pays inference only.
+
+Run it with SadTalker's own interpreter (it needs torch and SadTalker's
+`src` package, and nothing from this repo):
+
+    <SadTalker>/venv/Scripts/python.exe scripts/sadtalker_server.py --root <SadTalker> --port 7861
+
+Endpoints (JSON, bound to 127.0.0.1 by default):
+    GET    /health          status, loaded model sets, device, queue depth, jobs done
+    POST   /warmup          load models for {"preprocess", "size"} now (blocks until ready)
+    POST   /jobs            queue {"source_image", "driven_audio", "result_dir", ...}; returns {"job_id"}
+    GET    /jobs/<id>       queued | running | withdrawn | done | failed | cancelled, with "result_path" (<result_dir>/<job_id>.mp4)
+    DELETE /jobs/<id>       cancel a queued job; a running one is withdrawn (its result is deleted when it finishes)
+
+Jobs run one at a time on a single render thread (one GPU context).
+Source-image preprocessing (face crop + 3DMM coefficients) is cached on
+disk per image content, preprocess mode and size (`--preprocess-cache`),
+using SadTalker's `src/utils/preprocess_cache.py`, which `inference.py
+--preprocess_cache` shares, so both reuse the same entries.
+The avatar agent uses it when SADTALKER_SERVER_URL is set.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import shutil
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+def _import_root(root: str) -> None:
+    root = os.path.abspath(root)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+
+
+def load_preprocess_cache(root: str, cache_dir: str) -> Any:
+    """The checkout's `PreprocessCache` (src/utils/preprocess_cache.py), shared with inference.py."""
+    _import_root(root)
+    from src.utils.preprocess_cache import PreprocessCache  # type: ignore
+    return PreprocessCache(cache_dir)
+
+
+class SadTalkerEngine:
+    """SadTalker's inference.py pipeline with its models kept in memory.
+
+    `CropAndExtract`, `Audio2Coeff` and `AnimateFromCoeff` are built once per
+    (preprocess, size), which decides the checkpoints `init_path` selects,
+    and reused for every render.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        checkpoint_dir: Optional[str] = None,
+        device: Optional[str] = None,
+        preprocess_cache: Optional[Any] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.checkpoint_dir = checkpoint_dir or os.path.join(self.root, "checkpoints")
+        self.preprocess_cache = preprocess_cache
+        self._device = device
+        self._models: Dict[Tuple[str, int], Tuple[Any, Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def device(self) -> str:
+        if self._device is None:
+            import torch  # type: ignore
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        return self._device
+
+    def loaded(self) -> list:
+        return [f"{p}@{s}" for p, s in self._models]
+
+    def models(self, preprocess: str = "full", size: int = 256) -> Tuple[Any, Any, Any]:
+        key = (preprocess, int(size))
+        with self._lock:
+            if key not in self._models:
+                _import_root(self.root)
+                from src.utils.init_path import init_path  # type: ignore
+                from src.utils.preprocess import CropAndExtract  # type: ignore
+                from src.test_audio2coeff import Audio2Coeff  # type: ignore
+                from src.facerender.animate import AnimateFromCoeff  # type: ignore
+
+                paths = init_path(self.checkpoint_dir, os.path.join(self.root, "src", "config"), int(size), False, preprocess)
+                self._models[key] = (
+                    CropAndExtract(paths, self.device),
+                    Audio2Coeff(paths, self.device),
+                    AnimateFromCoeff(paths, self.device),
+                )
+            return self._models[key]
+
+    def render(self, job: Dict[str, Any], save_dir: str) -> str:
+        """Render one job into `save_dir`; returns the path of the produced mp4."""
+        from src.generate_batch import get_data  # type: ignore
+        from src.generate_facerender_batch import get_facerender_data  # type: ignore
+
+        preprocess = job.get("preprocess") or "full"
+        size = int(job.get("size") or 256)
+        still = bool(job.get("still", False))
+        preprocess_model, audio_to_coeff, animate_from_coeff = self.models(preprocess, size)
+        cached = self.preprocess_cache.get(job["source_image"], preprocess, size) if self.preprocess_cache else None
+        if cached is not None:
+            first_coeff_path, crop_pic_path, crop_info = cached
+        else:
+            first_frame_dir = os.path.join(save_dir, "first_frame_dir")
+            os.makedirs(first_frame_dir, exist_ok=True)
+            first_coeff_path, crop_pic_path, crop_info = preprocess_model.generate(
+                job["source_image"], first_frame_dir, preprocess, source_image_flag=True, pic_size=size
+            )
+            if first_coeff_path is None:
+                raise RuntimeError("no face found in source image")
+            if self.preprocess_cache:
+                first_coeff_path, crop_pic_path, crop_info = self.preprocess_cache.put(
+                    job["source_image"], preprocess, size, first_coeff_path, crop_pic_path, crop_info
+                )
+        batch = get_data(first_coeff_path, job["driven_audio"], self.device, None, still=still)
+        coeff_path = audio_to_coeff.generate(batch, save_dir, int(job.get("pose_style") or 0), None)
+        data = get_facerender_data(
+            coeff_path, crop_pic_path, first_coeff_path, job["driven_audio"], int(job.get("batch_size") or 2),
+            None, None, None, expression_scale=float(job.get("expression_scale") or 1.0),
+            still_mode=still, preprocess=preprocess, size=size,
+        )
+        return animate_from_coeff.generate(
+            data, save_dir, job["source_image"], crop_info, enhancer=job.get("enhancer"),
+            background_enhancer=job.get("background_enhancer"), preprocess=preprocess, img_size=size,
+        )
+
+
+class RenderService:
+    """Job queue in front of an engine; one render thread, bounded job history.
+
+    Jobs may only write below `output_root` (default `./outputs`); a
+    `result_dir` that resolves outside it is rejected.
+    """
+
+    def __init__(self, engine: Any, history: int = 500, output_root: Optional[str] = None):
+        self.engine = engine
+        self.history = history
+        self.output_root = os.path.realpath(output_root or "outputs")
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.done = 0
+        self.state = "idle"
+        self._thread = threading.Thread(target=self._worker, name="sadtalker-render", daemon=True)
+        self._thread.start()
+
+    def warmup(self, preprocess: str = "full", size: int = 256) -> float:
+        t0 = time.perf_counter()
+        self.state = "loading"
+        try:
+            self.engine.models(preprocess, size)
+        finally:
+            self.state = "idle"
+        return round(time.perf_counter() - t0, 3)
+
+    def submit(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        for field in ("source_image", "driven_audio", "result_dir"):
+            if not spec.get(field):
+                raise ValueError(f"missing {field}")
+        for field in ("source_image", "driven_audio"):
+            if not os.path.isfile(spec[field]):
+                raise ValueError(f"{field} not found: {spec[field]}")
+        result_dir = os.path.realpath(spec["result_dir"])
+        if result_dir != self.output_root and not result_dir.startswith(self.output_root + os.sep):
+            raise ValueError(f"result_dir outside the output root: {spec['result_dir']}")
+        job_id = uuid.uuid4().hex[:16]
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "spec": dict(spec),
+            "result_dir": result_dir,
+            "result_path": os.path.join(result_dir, f"{job_id}.mp4"),
+            "submitted": time.time(),
+        }
+        with self._lock:
+            self.jobs[job_id] = job
+            while len(self.jobs) > self.history:
+                old_id, old = next(iter(self.jobs.items()))
+                if old["status"] in ("queued", "running", "withdrawn"):
+                    break
+                del self.jobs[old_id]
+        self._queue.put(job_id)
+        return self.view(job_id)
+
+    def view(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return {k: v for k, v in job.items() if k not in ("spec", "result_dir")} if job else None
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job; a running one cannot be interrupted, so it is withdrawn instead."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job["status"] == "queued":
+                job["status"] = "cancelled"
+            elif job is not None and job["status"] == "running":
+                job["status"] = "withdrawn"
+        return self.view(job_id)
+
+    def health(self) -> Dict[str, Any]:
+        cache = getattr(self.engine, "preprocess_cache", None)
+        return {
+            "status": "ok",
+            "state": self.state,
+            "models_loaded": self.engine.loaded(),
+            "preprocess_cache": cache.stats() if cache else None,
+            "queued": self._queue.qsize(),
+            "jobs_done": self.done,
+            "uptime_seconds": round(time.time() - self.started, 1),
+        }
+
+    def _worker(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is None or job["status"] != "queued":
+                    continue
+                job["status"] = "running"
+                job["started"] = time.time()
+            self.state = "rendering"
+            spec = job["spec"]
+            work_dir = os.path.join(job["result_dir"], job_id)
+            try:
+                os.makedirs(work_dir, exist_ok=True)
+                produced = self.engine.render(spec, work_dir)
+                if produced and os.path.isfile(produced):
+                    os.replace(produced, job["result_path"])
+                if not os.path.isfile(job["result_path"]):
+                    raise RuntimeError("render produced no video")
+                status, error = "done", None
+            except Exception as e:
+                status, error = "failed", str(e)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                self.state = "idle"
+            with self._lock:
+                if job["status"] == "withdrawn":
+                    # Nobody will collect it; don't leave the video behind
+                    if os.path.exists(job["result_path"]):
+                        os.remove(job["result_path"])
+                    status, error = "cancelled", None
+                job["status"] = status
+                job["error"] = error
+                job["seconds"] = round(time.time() - job["started"], 3)
+                self.done += 1
+
+
+def make_handler(service: RenderService):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Any) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> Dict[str, Any]:
+            n = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(n) if n else b""
+            return json.loads(raw.decode("utf-8")) if raw else {}
+
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                return self._send(200, service.health())
+            if self.path.startswith("/jobs/"):
+                job = service.view(self.path[len("/jobs/"):])
+                return self._send(200 if job else 404, job or {"error": "unknown_job"})
+            self._send(404, {"error": "not_found"})
+
+        def do_POST(self) -> None:
+            try:
+                body = self._body()
+            except ValueError:
+                return self._send(400, {"error": "invalid_json"})
+            if self.path == "/warmup":
+                try:
+                    seconds = service.warmup(body.get("preprocess") or "full", int(body.get("size") or 256))
+                except Exception as e:
+                    return self._send(500, {"error": "warmup_failed", "message": str(e)})
+                return self._send(200, {**service.health(), "warmup_seconds": seconds})
+            if self.path == "/jobs":
+                try:
+                    return self._send(202, service.submit(body))
+                except ValueError as e:
+                    return self._send(400, {"error": "invalid_job", "message": str(e)})
+            self._send(404, {"error": "not_found"})
+
+        def do_DELETE(self) -> None:
+            if self.path.startswith("/jobs/"):
+                job = service.cancel(self.path[len("/jobs/"):])
+                return self._send(200 if job else 404, job or {"error": "unknown_job"})
+            self._send(404, {"error": "not_found"})
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def serve(service: RenderService, host: str = "127.0.0.1", port: int = 7861) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SadTalker render server (models loaded once)")
+    ap.add_argument("--root", default=os.getenv("SADTALKER_ROOT"), help="SadTalker checkout")
+    ap.add_argument("--checkpoints", default=os.getenv("SADTALKER_CHECKPOINTS"))
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=int(os.getenv("SADTALKER_SERVER_PORT", "7861")))
+    ap.add_argument("--device", default=None)
+    ap.add_argument("--preprocess-cache", default=os.getenv("SADTALKER_PREPROCESS_CACHE"),
+                    help="directory for cached source-image preprocessing (default <root>/preprocess_cache; 'off' disables)")
+    ap.add_argument("--output-root", default=os.getenv("SADTALKER_OUTPUT_DIR"),
+                    help="jobs may only write below this directory (default <root>/outputs)")
+    ap.add_argument("--no-warmup", action="store_true", help="load models on the first job instead of at startup")
+    args = ap.parse_args()
+    if not (args.root and os.path.isfile(os.path.join(args.root, "inference.py"))):
+        ap.error("--root must point at a SadTalker checkout (SADTALKER_ROOT)")
+    output_root = os.path.abspath(args.output_root or os.path.join(args.root, "outputs"))
+    # SadTalker resolves some assets relative to its checkout
+    os.chdir(args.root)
+    cache = None
+    if (args.preprocess_cache or "").lower() != "off":
+        cache = load_preprocess_cache(args.root, args.preprocess_cache or os.path.join(args.root, "preprocess_cache"))
+    service = RenderService(SadTalkerEngine(args.root, args.checkpoints, args.device, cache), output_root=output_root)
+    if not args.no_warmup:
+        print(json.dumps({"event": "sadtalker_warmup", "seconds": service.warmup()}), flush=True)
+    httpd = serve(service, args.host, args.port)
+    print(json.dumps({"event": "sadtalker_server_listening", "host": args.host, "port": args.port}), flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,12 @@ import glob
 import json
 import time
 import hashlib
+import threading
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException, Depends, Response
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.exceptions import RequestValidationError
 from starlette.requests import Request
@@ -17,10 +18,14 @@ from pydantic import BaseModel, Field
 import base64
 import jwt
 from single_pipeline.cli import run_fetch, run_filter, run_scripts, run_voice, run_avatar
-from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+from single_pipeline.agents.filter_agent import FilterAgent
+from single_pipeline.tts_pool import TTSPool
+from single_pipeline.tts_stream import ChunkedVoice
 from single_pipeline.agents.avatar_agent_stub import AvatarAgentStub
 from single_pipeline.rag_client import RAGClient
 from single_pipeline.debug.langgraph_stub import build_graph_from_traces
+from single_pipeline.work_queue import WorkQueue
+from single_pipeline.worker import submit_items
 from single_pipeline.registry import (
     DEFAULT_REGISTRY_PATH,
     load_registry,
@@ -28,6 +33,7 @@ from single_pipeline.registry import (
     save_registry_yaml,
     hot_reload,
 )
+from server.media import MediaFiles
 from server.db import (
     init_db,
     get_user_preferences as db_get_user_prefs,
@@ -38,6 +44,8 @@ from server.db import (
     count_article_groups as db_count_article_groups,
     get_grouped_articles as db_get_grouped_articles,
     get_article_by_id as db_get_article_by_id,
+    record_engagement as db_record_engagement,
+    get_engagement_stats as db_get_engagement_stats,
     get_group_representative as db_get_group_representative,
     get_articles_in_timeframe as db_get_articles_in_timeframe,
     upsert_article as db_upsert_article,
@@ -715,6 +723,14 @@ def _quality_score(m: EngagementMetrics) -> float:
     return round(score, 4)
 
 
+def _persist_engagement(article_id: str, quality: float) -> None:
+    # Aggregates outlive the in-memory event list; the pipeline reads them for priority scoring
+    try:
+        db_record_engagement(article_id, quality)
+    except Exception as e:
+        log.warning("engagement_persist_failed: %s", e)
+
+
 @APP.post("/api/metrics/engagement")
 def track_article_engagement(payload: dict, response: Response, auth: AuthContext = Depends(require_auth)):
     # Accept either single event or batch {"events": [...]}
@@ -750,6 +766,7 @@ def track_article_engagement(payload: dict, response: Response, auth: AuthContex
                     "quality_score": q,
                 })
                 _prune_event_list(_engagement_events, ENGAGEMENT_EVENTS_MAX_ENTRIES, ENGAGEMENT_EVENTS_TTL_SECONDS)
+                _persist_engagement(ev.article_id, q)
                 results.append({"engagement_id": eid, "quality_score": q})
             return {"success": True, "count": len(results), "engagement": results, "message": "Engagement metrics recorded"}
         else:
@@ -775,6 +792,7 @@ def track_article_engagement(payload: dict, response: Response, auth: AuthContex
                 "quality_score": q,
             })
             _prune_event_list(_engagement_events, ENGAGEMENT_EVENTS_MAX_ENTRIES, ENGAGEMENT_EVENTS_TTL_SECONDS)
+            _persist_engagement(ev.article_id, q)
             return {"success": True, "engagement_id": eid, "quality_score": q, "message": "Engagement metrics recorded"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -833,6 +851,25 @@ def render_avatar(payload: AvatarRenderRequest, response: Response, auth: AuthCo
     except Exception as e:
         raise HTTPException(status_code=500, detail={"error": "avatar_render_failed", "message": str(e)})
 
+# Shared TTS worker pool: engines stay warm across requests
+_tts_pool_instance: Optional[TTSPool] = None
+_tts_pool_lock = threading.Lock()
+
+
+def _tts_pool() -> TTSPool:
+    global _tts_pool_instance
+    with _tts_pool_lock:
+        if _tts_pool_instance is None:
+            _tts_pool_instance = TTSPool()
+        return _tts_pool_instance
+
+
+def _emotion_rate(emotion: Optional[int]) -> Optional[int]:
+    if isinstance(emotion, int):
+        return int(max(90, min(220, 120 + emotion)))
+    return None
+
+
 class VoiceItemRequest(BaseModel):
     title: str
     narration: str
@@ -844,6 +881,34 @@ class VoiceItemRequest(BaseModel):
     voice: Optional[str] = Field(default="en-US-Neural-1")
     category: Optional[str] = Field(default="general")
 
+def _voice_script(payload: VoiceItemRequest) -> Dict[str, Any]:
+    lang = (payload.lang or "en").lower()
+    # Map accent to language group where applicable
+    if payload.accent:
+        a = payload.accent.lower()
+        if a.startswith("hi"):
+            lang = "hi"
+        elif a.startswith("ta"):
+            lang = "ta"
+        elif a.startswith("bn"):
+            lang = "bn"
+        elif a.startswith("en"):
+            lang = "en"
+    return {
+        "title": payload.title,
+        "lang": lang,
+        "audience": payload.audience or "general",
+        "tone": payload.tone or "news",
+        "variants": {
+            "narration": payload.narration,
+        },
+        "metadata": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "category": payload.category or "general",
+        },
+    }
+
+
 @APP.post("/api/agents/voice/generate_item")
 def generate_voice_item(payload: VoiceItemRequest, response: Response, auth: AuthContext = Depends(require_auth)):
     err, info = _apply_rate_limit(_rate_buckets, RATE_LIMIT_PER_MINUTE, auth.user_id)
@@ -853,43 +918,52 @@ def generate_voice_item(payload: VoiceItemRequest, response: Response, auth: Aut
     response.headers["X-RateLimit-Remaining"] = str(info["remaining"])
     response.headers["X-RateLimit-Reset"] = str(info["reset"])
     try:
-        lang = (payload.lang or "en").lower()
-        # Map accent to language group where applicable
-        if payload.accent:
-            a = payload.accent.lower()
-            if a.startswith("hi"):
-                lang = "hi"
-            elif a.startswith("ta"):
-                lang = "ta"
-            elif a.startswith("bn"):
-                lang = "bn"
-            elif a.startswith("en"):
-                lang = "en"
-        script = {
-            "title": payload.title,
-            "lang": lang,
-            "audience": payload.audience or "general",
-            "tone": payload.tone or "news",
-            "variants": {
-                "narration": payload.narration,
-            },
-            "metadata": {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "category": payload.category or "general",
-            },
-        }
-        agent = TTSAgentStub(voice=payload.voice or "en-US-Neural-1")
-        try:
-            if isinstance(payload.emotion, int):
-                agent.rate = int(max(90, min(220, 120 + (payload.emotion or 0))))
-        except Exception:
-            pass
-        out = agent.synthesize([script], category=payload.category or "general")
-        item = out[0] if out else {}
+        item = _tts_pool().synthesize_item(
+            _voice_script(payload),
+            category=payload.category or "general",
+            rate=_emotion_rate(payload.emotion),
+            voice=payload.voice or "en-US-Neural-1",
+        )
         return {"status": "ok", "item": item}
     except Exception as e:
         raise HTTPException(status_code=500, detail={"error": "voice_item_failed", "message": str(e)})
 
+@APP.post("/api/agents/voice/generate_item/stream")
+def stream_voice_item(payload: VoiceItemRequest, format: str = "wav", auth: AuthContext = Depends(require_auth)):
+    """Sentence-chunked synthesis: audio starts flowing once the first sentence is ready.
+
+    `format=wav` streams one WAV (PCM appended per sentence); `format=ndjson`
+    streams one JSON line per sentence chunk (status, provider, duration) and a
+    final line with the assembled item. `X-Audio-Url` names the full WAV,
+    which exists once the stream ends.
+    """
+    err, info = _apply_rate_limit(_rate_buckets, RATE_LIMIT_PER_MINUTE, auth.user_id)
+    if err is not None:
+        return err
+    try:
+        chunked = ChunkedVoice(
+            _tts_pool(),
+            _voice_script(payload),
+            category=payload.category or "general",
+            rate=_emotion_rate(payload.emotion),
+            voice=payload.voice or "en-US-Neural-1",
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={"error": "voice_item_failed", "message": str(e)})
+    headers = {
+        "X-RateLimit-Limit": str(info["limit"]),
+        "X-RateLimit-Remaining": str(info["remaining"]),
+        "X-RateLimit-Reset": str(info["reset"]),
+        "X-Audio-Url": chunked.audio_url,
+        "X-Chunk-Count": str(len(chunked.sentences)),
+        "Cache-Control": "no-store",
+    }
+    if format == "ndjson":
+        lines = (json.dumps(ev, ensure_ascii=False) + "\n" for ev in chunked.events())
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(chunked.wav_stream(), media_type="audio/wav", headers=headers)
+
+
 class AvatarItemRequest(BaseModel):
     title: str
     narration: Optional[str] = None
@@ -943,14 +1017,12 @@ def render_avatar_item(payload: AvatarItemRequest, response: Response, auth: Aut
                 "tone": "news",
                 "variants": {"narration": payload.narration},
             }
-            tts = TTSAgentStub(voice=payload.voice or "en-US-Neural-1")
-            try:
-                if isinstance(payload.emotion, int):
-                    tts.rate = int(max(90, min(220, 120 + (payload.emotion or 0))))
-            except Exception:
-                pass
-            out = tts.synthesize([s], category=payload.category or "general")
-            voice_item = out[0] if out else {}
+            voice_item = _tts_pool().synthesize_item(
+                s,
+                category=payload.category or "general",
+                rate=_emotion_rate(payload.emotion),
+                voice=payload.voice or "en-US-Neural-1",
+            )
         agent = AvatarAgentStub(style=payload.style or "news-anchor")
         vids = agent.render([voice_item], category=payload.category or "general")
         item = vids[0] if vids else {}
@@ -966,6 +1038,8 @@ class PipelineRunRequest(BaseModel):
     category: Optional[str] = Field(default="general")
     voice: Optional[str] = Field(default="en-US-Neural-1")
     style: Optional[str] = Field(default="news-anchor")
+    # Enqueue scripts/voice/avatar for queue workers instead of running inline
+    queue: Optional[bool] = Field(default=None)
 
 
 @APP.post("/api/pipeline/run")
@@ -978,9 +1052,31 @@ def run_pipeline(payload: PipelineRunRequest, response: Response, auth: AuthCont
     response.headers["X-RateLimit-Remaining"] = str(info["remaining"])
     response.headers["X-RateLimit-Reset"] = str(info["reset"])
 
+    use_queue = payload.queue if payload.queue is not None else os.getenv("PIPELINE_RUN_MODE", "inline").lower() == "queue"
+    if use_queue:
+        # Items go straight from fetch to the work queue under a per-run id, so
+        # concurrent runs never share stage files
+        try:
+            registry = payload.registry or "single"
+            category = payload.category or "general"
+            sf = run_fetch(registry=registry, category=category)
+            filtered = FilterAgent(engagement_lookup=db_get_engagement_stats).filter_items(sf.get("items") or [])
+            sub = submit_items(filtered, registry=registry, category=category, voice=payload.voice, style=payload.style)
+            return {
+                "status": "queued",
+                "run_id": sub["run_id"],
+                "stages": {"fetch": {"count": len(sf.get("items") or []), "output_file": sf.get("output_file")}, "filter": {"count": len(filtered)}},
+            }
+        except Exception as e:
+            raise HTTPException(status_code=500, detail={"error": "pipeline_enqueue_failed", "message": str(e)})
+
     try:
         sf = run_fetch(registry=payload.registry or "single", category=payload.category or "general")
-        fl = run_filter(registry=payload.registry or "single", category=payload.category or "general")
+        fl = run_filter(
+            registry=payload.registry or "single",
+            category=payload.category or "general",
+            engagement_lookup=db_get_engagement_stats,
+        )
         sc = run_scripts(registry=payload.registry or "single", category=payload.category or "general")
         vc = run_voice(registry=payload.registry or "single", category=payload.category or "general", voice=payload.voice or "en-US-Neural-1")
         av = run_avatar(registry=payload.registry or "single", category=payload.category or "general", style=payload.style or "news-anchor")
@@ -998,6 +1094,19 @@ def run_pipeline(payload: PipelineRunRequest, response: Response, auth: AuthCont
         raise HTTPException(status_code=500, detail={"error": "pipeline_run_failed", "message": str(e)})
 
 
+@APP.get("/api/pipeline/queue/{run_id}")
+def pipeline_queue_status(run_id: str, auth: AuthContext = Depends(require_auth)):
+    q = WorkQueue()
+    try:
+        counts = q.counts(run_id)
+    finally:
+        q.close()
+    if not counts:
+        raise HTTPException(status_code=404, detail={"error": "run_not_found", "run_id": run_id})
+    pending = sum(n for c in counts.values() for st, n in c.items() if st in ("queued", "leased"))
+    return {"run_id": run_id, "counts": counts, "complete": pending == 0}
+
+
 # --------------------
 # Dashboard stats endpoint
 # --------------------
@@ -1599,7 +1708,7 @@ def ui_process(payload: BasicPipelineRequest, response: Response, auth: AuthCont
     try:
         registry = payload.registry or "single"
         category = payload.category or "general"
-        fl = run_filter(registry=registry, category=category)
+        fl = run_filter(registry=registry, category=category, engagement_lookup=db_get_engagement_stats)
         sc = run_scripts(registry=registry, category=category)
         base = os.path.join(os.path.dirname(__file__), "..", "single_pipeline", "output")
         filtered_path = _safe_join(os.path.abspath(base), f"{_sanitize_identifier(registry)}_filtered.json")
@@ -1676,8 +1785,9 @@ try:
 except Exception:
     pass
 
-APP.mount("/data/tts", StaticFiles(directory=_DATA_TTS_DIR), name="data_tts")
-APP.mount("/data/avatar", StaticFiles(directory=_DATA_AVATAR_DIR), name="data_avatar")
+# ETags, 304s, byte ranges and cache headers so seeks and repeat plays skip whole-file transfers
+APP.mount("/data/tts", MediaFiles(directory=_DATA_TTS_DIR), name="data_tts")
+APP.mount("/data/avatar", MediaFiles(directory=_DATA_AVATAR_DIR), name="data_avatar")
 
 
 @APP.get("/")
@@ -1690,6 +1800,12 @@ def _startup():
     except Exception as e:
         log.warning("db_init_failed")
 
+
+@APP.on_event("shutdown")
+def _shutdown():
+    if _tts_pool_instance is not None:
+        _tts_pool_instance.close()
+
 # --------------------
 # Admin: Feeds Registry (JWT admin only)
 # --------------------
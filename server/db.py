@@ -100,6 +100,16 @@ def init_db() -> None:
         );
         CREATE INDEX IF NOT EXISTS idx_stage_started ON pipeline_stage_events(started_at);
         CREATE INDEX IF NOT EXISTS idx_stage_status ON pipeline_stage_events(status);
+
+        -- Running engagement aggregates per article (feeds pipeline priority scoring)
+        CREATE TABLE IF NOT EXISTS article_engagement (
+            article_id TEXT PRIMARY KEY,
+            group_key TEXT,
+            views INTEGER NOT NULL DEFAULT 0,
+            quality_sum REAL NOT NULL DEFAULT 0,
+            updated_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_engagement_group ON article_engagement(group_key);
         """
     )
     # Backfill migration: add group_key if the column was missing in existing DBs
@@ -365,6 +375,47 @@ def count_articles(category: Optional[str] = None) -> int:
     return int(row[0]) if row else 0
 
 
+def record_engagement(article_id: str, quality_score: float) -> None:
+    """Add one engagement event to the article's running aggregate."""
+    conn = _get_conn()
+    row = conn.execute("SELECT group_key FROM articles WHERE id = ?", (article_id,)).fetchone()
+    group_key = row[0] if row else None
+    conn.execute(
+        """
+        INSERT INTO article_engagement (article_id, group_key, views, quality_sum, updated_at)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT(article_id) DO UPDATE SET
+            group_key=COALESCE(excluded.group_key, article_engagement.group_key),
+            views=article_engagement.views + 1,
+            quality_sum=article_engagement.quality_sum + excluded.quality_sum,
+            updated_at=excluded.updated_at
+        """,
+        (article_id, group_key, float(quality_score), _utc_now()),
+    )
+    conn.commit()
+
+
+def get_engagement_stats(keys: List[str]) -> Dict[str, Dict[str, float]]:
+    """Return `{key: {views, quality_sum}}` where key is an article id or group_key."""
+    if not keys:
+        return {}
+    conn = _get_conn()
+    marks = ",".join("?" * len(keys))
+    out: Dict[str, Dict[str, float]] = {}
+    cur = conn.execute(
+        f"SELECT article_id, views, quality_sum FROM article_engagement WHERE article_id IN ({marks})", list(keys)
+    )
+    for r in cur.fetchall():
+        out[r[0]] = {"views": float(r[1]), "quality_sum": float(r[2])}
+    cur = conn.execute(
+        f"SELECT group_key, SUM(views), SUM(quality_sum) FROM article_engagement WHERE group_key IN ({marks}) GROUP BY group_key",
+        list(keys),
+    )
+    for r in cur.fetchall():
+        out[r[0]] = {"views": float(r[1] or 0), "quality_sum": float(r[2] or 0)}
+    return out
+
+
 def get_article_by_id(article_id: str) -> Optional[Dict[str, Any]]:
     conn = _get_conn()
     cur = conn.execute("SELECT * FROM articles WHERE id = ?", (article_id,))
@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+CHUNK_SIZE = 256 * 1024
+# Names derived from a hash of everything that shapes the file, so their content never changes
+CONTENT_ADDRESSED = re.compile(r"(^|/)phrase_[0-9a-f]{16}\.wav$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a `Range` header into an inclusive `(start, end)` byte range.
+
+    Returns None when the whole file should be sent (no header, a header we
+    ignore per RFC 9110 such as multiple ranges or malformed syntax) and
+    raises RangeNotSatisfiable when the range lies outside the file.
+    """
+    if not header or not header.strip().lower().startswith("bytes="):
+        return None
+    spec = header.strip()[6:].strip()
+    if "," in spec:
+        return None
+    m = re.fullmatch(r"(\d*)\s*-\s*(\d*)", spec)
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    first, last = m.group(1), m.group(2)
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+class ETagCache:
+    """Strong ETags from file content (sha256), memoized per path, size and mtime.
+
+    Each file is hashed once until it is rewritten; repeat requests only
+    cost a `stat`.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, st: os.stat_result, f: Optional[BinaryIO] = None) -> str:
+        """ETag for `path` as of `st`; hashes the already open `f` (from the start) when given."""
+        key = (path, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            etag = self._entries.get(key)
+            if etag is not None:
+                self._entries.move_to_end(key)
+                return etag
+        if f is None:
+            with open(path, "rb") as fh:
+                return self.get(path, st, fh)
+        h = hashlib.sha256()
+        f.seek(0)
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+        etag = f'"{h.hexdigest()[:32]}"'
+        with self._lock:
+            self._entries[key] = etag
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison
+    for c in header.split(","):
+        c = c.strip()
+        if c == "*" or (c[2:] if c.startswith("W/") else c) == etag:
+            return True
+    return False
+
+
+class MediaFiles:
+    """ASGI app serving generated media with validators, ranges and caching.
+
+    Replaces plain `StaticFiles` for /data/tts and /data/avatar:
+    - strong ETags from a content hash, and `304 Not Modified` for
+      `If-None-Match` / `If-Modified-Since`, so repeat plays transfer no body;
+    - single byte ranges (`206`, honouring `If-Range`), so players seek
+      without re-downloading;
+    - `Cache-Control: immutable` for a year on content-addressed names
+      (`CONTENT_ADDRESSED`) or when the request pins `?v=<etag>`; other files
+      revalidate after MEDIA_CACHE_MAX_AGE seconds (default 60);
+    - zero-copy `sendfile` when the ASGI server offers the
+      `http.response.zerocopysend` extension (MEDIA_SENDFILE, default 1).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_age: Optional[int] = None,
+        immutable_max_age: int = 31536000,
+        sendfile: Optional[bool] = None,
+        etags: Optional[ETagCache] = None,
+    ):
+        self.directory = os.path.realpath(directory)
+        self.max_age = int(max_age if max_age is not None else os.getenv("MEDIA_CACHE_MAX_AGE", "60"))
+        self.immutable_max_age = immutable_max_age
+        if sendfile is None:
+            sendfile = os.getenv("MEDIA_SENDFILE", "1").lower() not in ("0", "false", "no")
+        self.sendfile = sendfile
+        self.etags = etags or ETagCache()
+
+    def _resolve(self, scope: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        path = scope.get("path") or "/"
+        root = scope.get("root_path") or ""
+        if root and path.startswith(root):
+            path = path[len(root):]
+        rel = path.lstrip("/")
+        full = os.path.realpath(os.path.join(self.directory, rel))
+        if not full.startswith(self.directory + os.sep) or not os.path.isfile(full):
+            return rel, None
+        return rel, full
+
+    def _cache_control(self, rel: str, etag: str, query: bytes) -> str:
+        pinned = parse_qs(query.decode("latin-1")).get("v", [None])[0]
+        if CONTENT_ADDRESSED.search(rel) or (pinned and f'"{pinned}"' == etag):
+            return f"public, max-age={self.immutable_max_age}, immutable"
+        return f"public, max-age={self.max_age}, must-revalidate"
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        assert scope["type"] == "http"
+        method = scope.get("method", "GET")
+        if method not in ("GET", "HEAD"):
+            await _respond(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+        loop = asyncio.get_running_loop()
+        opened = await loop.run_in_executor(None, self._open, scope)
+        if opened is None:
+            await _respond(send, 404, [(b"content-type", b"text/plain")], b"Not Found")
+            return
+        rel, full, f, st, etag = opened
+        try:
+            await self._serve(scope, send, loop, rel, full, f, st, etag)
+        finally:
+            f.close()
+
+    def _open(self, scope: Dict[str, Any]) -> Optional[Tuple[str, str, BinaryIO, os.stat_result, str]]:
+        """Resolve, open and fstat the requested file and compute its ETag (blocking; runs in the executor).
+
+        The body is later read from this same handle, so headers always
+        describe the bytes sent even if the file is replaced meanwhile.
+        """
+        rel, full = self._resolve(scope)
+        if full is None:
+            return None
+        try:
+            f = open(full, "rb")
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+        try:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode):
+                f.close()
+                return None
+            return rel, full, f, st, self.etags.get(full, st, f)
+        except BaseException:
+            f.close()
+            raise
+
+    async def _serve(
+        self,
+        scope: Dict[str, Any],
+        send: Callable,
+        loop: asyncio.AbstractEventLoop,
+        rel: str,
+        full: str,
+        f: BinaryIO,
+        st: os.stat_result,
+        etag: str,
+    ) -> None:
+        method = scope.get("method", "GET")
+        req = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers") or []}
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(st.st_mtime, usegmt=True).encode()),
+            (b"cache-control", self._cache_control(rel, etag, scope.get("query_string") or b"").encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+
+        if _not_modified(req, etag, st.st_mtime):
+            await _respond(send, 304, headers)
+            return
+
+        size = st.st_size
+        byte_range = None
+        if_range = req.get("if-range")
+        if "range" in req and (not if_range or if_range.strip() == etag):
+            try:
+                byte_range = parse_range(req["range"], size)
+            except RangeNotSatisfiable:
+                await _respond(send, 416, headers + [(b"content-range", f"bytes */{size}".encode())])
+                return
+
+        ctype = mimetypes.guess_type(full)[0] or "application/octet-stream"
+        headers.append((b"content-type", ctype.encode()))
+        if byte_range is None:
+            status, start, length = 200, 0, size
+        else:
+            status, start, length = 206, byte_range[0], byte_range[1] - byte_range[0] + 1
+            headers.append((b"content-range", f"bytes {byte_range[0]}-{byte_range[1]}/{size}".encode()))
+        headers.append((b"content-length", str(length).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if method == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if self.sendfile and "http.response.zerocopysend" in (scope.get("extensions") or {}):
+            await send({"type": "http.response.zerocopysend", "file": f, "offset": start, "count": length})
+            return
+        await loop.run_in_executor(None, f.seek, start)
+        remaining = length
+        while remaining > 0:
+            chunk = await loop.run_in_executor(None, f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank underneath us; end the response rather than hang
+            await send({"type": "http.response.body", "body": b""})
+
+
+def _not_modified(req: Dict[str, str], etag: str, mtime: float) -> bool:
+    if "if-none-match" in req:
+        return _etag_matches(req["if-none-match"], etag)
+    ims = req.get("if-modified-since")
+    if ims:
+        try:
+            return int(mtime) <= int(parsedate_to_datetime(ims).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _respond(send: Callable, status: int, headers: List[Tuple[bytes, bytes]], body: bytes = b"") -> None:
+    if status != 304:
+        headers = headers + [(b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -249,7 +249,7 @@ async function generateTTSForItem(item) {
     const json = await apiPost('/api/agents/voice/generate_item', payload, 30000);
     updateStages('voice', 'done');
     const it = json?.item || (Array.isArray(json?.items) ? json.items[0] : null);
-    const url = it?.audio_url || '(no url)';
+    const url = it?.delivery_url || it?.audio_url || '(no url)';
     status(`TTS ready • ${url}`);
     pushEvent({ kind: 'info', message: `TTS generated: ${url}` });
   } catch (err) {
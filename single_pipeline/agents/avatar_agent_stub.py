@@ -3,17 +3,73 @@ import json
 import hashlib
 import shutil
 import subprocess
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 import time
 
 from ..logging_utils import PipelineLogger, StageLogger
+from ..media_janitor import MediaIndex, ensure_janitor, media_index, media_index_for
 try:
     import httpx  # type: ignore
 except Exception:
     httpx = None
 
 
+def _cancelled(cancel: Optional[threading.Event]) -> bool:
+    return cancel is not None and cancel.is_set()
+
+
+def _wait(cancel: Optional[threading.Event], seconds: float) -> bool:
+    """Sleep between provider polls; returns True if cancelled meanwhile."""
+    if cancel is None:
+        time.sleep(seconds)
+        return False
+    return cancel.wait(seconds)
+
+
+def _run_cancellable(cmd: List[str], cancel: Optional[threading.Event] = None, cwd: Optional[str] = None) -> Tuple[int, bytes]:
+    """Run a render command; kill it if `cancel` is set. Returns (returncode, stderr)."""
+    p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    while True:
+        try:
+            _out, err = p.communicate(timeout=0.5)
+            return p.returncode, err or b""
+        except subprocess.TimeoutExpired:
+            if _cancelled(cancel):
+                p.kill()
+                p.communicate()
+                return -9, b"cancelled"
+
+
+def promote_attempt(out: Any) -> Any:
+    """Move a winning attempt's `pending_files` into place and index them; returns `out`."""
+    pending = out.pop("pending_files", None) if isinstance(out, dict) else None
+    if not pending:
+        return out
+    index = media_index(pending.get("index"))
+    retention = pending.get("retention_days", 30)
+    if pending.get("video") and os.path.exists(pending["video"]):
+        os.replace(pending["video"], pending["video_path"])
+        index.record(pending["video_path"], "avatar", retention, pending.get("duration_seconds"))
+    if pending.get("meta") and os.path.exists(pending["meta"]):
+        os.replace(pending["meta"], pending["metadata_path"])
+        index.record(pending["metadata_path"], "avatar", retention)
+    return out
+
+
+def discard_attempt(out: Any) -> None:
+    """Delete a losing attempt's temp files."""
+    pending = out.get("pending_files") if isinstance(out, dict) else None
+    for key in ("video", "meta"):
+        path = (pending or {}).get(key)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
 class AvatarAgentStub:
     """Stub avatar agent designed to be provider-pluggable.
 
@@ -28,6 +84,7 @@ class AvatarAgentStub:
         output_base: Optional[str] = None,
         retention_days: int = 30,
         preset_map: Optional[Dict[str, str]] = None,
+        media: Optional[MediaIndex] = None,
     ):
         self.style = style
         self.log = logger or PipelineLogger(component="avatar_stub")
@@ -55,25 +112,19 @@ class AvatarAgentStub:
         self.sadtalker_root = os.getenv("SADTALKER_ROOT")
         self.sadtalker_source_image = os.getenv("SADTALKER_SOURCE_IMAGE")
         self.sadtalker_output_dir = os.getenv("SADTALKER_OUTPUT_DIR")
+        # Persistent render server (scripts/sadtalker_server.py); models stay loaded between items
+        self.sadtalker_server_url = (os.getenv("SADTALKER_SERVER_URL") or "").rstrip("/")
+        self.sadtalker_server_timeout = float(os.getenv("SADTALKER_SERVER_TIMEOUT", "900"))
+        # Source-image preprocessing cache shared by the server and inference.py ('off' disables)
+        self.sadtalker_preprocess_cache = os.getenv("SADTALKER_PREPROCESS_CACHE")
+        # Retention runs in the background janitor, off the request path
+        self.media = media or media_index_for(self.output_base)
+        ensure_janitor(self.media)
 
     def _hash_id(self, title: str, key: str) -> str:
         h = hashlib.sha256((title + "|" + key).encode("utf-8", errors="ignore")).hexdigest()
         return f"article_{h[:12]}"
 
-    def _cleanup_old(self) -> None:
-        try:
-            os.makedirs(self.output_base, exist_ok=True)
-            cutoff = time.time() - (self.retention_days * 24 * 3600)
-            for fname in os.listdir(self.output_base):
-                fpath = os.path.join(self.output_base, fname)
-                try:
-                    if os.path.isfile(fpath) and os.path.getmtime(fpath) < cutoff:
-                        os.remove(fpath)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
     def _audio_duration_seconds(self, audio_path: Optional[str]) -> float:
         try:
             if not audio_path or not os.path.isfile(audio_path):
@@ -90,7 +141,8 @@ class AvatarAgentStub:
         exe = shutil.which("ffmpeg") or shutil.which("ffmpeg.exe")
         return bool(exe)
 
-    def _render_static_video(self, audio_path: Optional[str], out_path: str, duration: float) -> bool:
+    def _render_static_video(self, audio_path: Optional[str], out_path: str, duration: float,
+                             cancel: Optional[threading.Event] = None) -> bool:
         try:
             if not self._ffmpeg_available():
                 return False
@@ -114,13 +166,15 @@ class AvatarAgentStub:
                     "-map", "[v]",
                 ]
             cmd += ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-b:a", "192k", out_path]
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            code, err = _run_cancellable(cmd, cancel)
+            if code != 0:
+                raise RuntimeError(f"ffmpeg exited with {code}: {err.decode(errors='ignore')[-300:]}")
             return os.path.isfile(out_path)
         except Exception as e:
             self.log.warning("avatar_ffmpeg_failed", error=str(e))
             return False
 
-    def _render_via_did(self, audio_path: Optional[str], out_path: str) -> bool:
+    def _render_via_did(self, audio_path: Optional[str], out_path: str, cancel: Optional[threading.Event] = None) -> bool:
         try:
             if not (httpx and self.did_api_key and self.did_source_url and audio_path and os.path.isfile(audio_path)):
                 return False
@@ -137,6 +191,8 @@ class AvatarAgentStub:
                 return False
             poll_url = self.did_talk_api_url.rstrip("/") + "/" + tid
             for _ in range(60):
+                if _cancelled(cancel):
+                    return False
                 pr = httpx.get(poll_url, headers=headers, timeout=30)
                 if pr.status_code >= 300:
                     return False
@@ -154,7 +210,8 @@ class AvatarAgentStub:
                     return os.path.isfile(out_path)
                 if st.lower() in ("error", "failed"):
                     return False
-                time.sleep(2.0)
+                if _wait(cancel, 2.0):
+                    return False
             return False
         except Exception as e:
             self.log.warning("avatar_did_failed", error=str(e))
@@ -171,7 +228,7 @@ class AvatarAgentStub:
         except Exception:
             return None
 
-    def _render_via_heygen(self, audio_route: Optional[str], out_path: str) -> bool:
+    def _render_via_heygen(self, audio_route: Optional[str], out_path: str, cancel: Optional[threading.Event] = None) -> bool:
         try:
             if not (httpx and self.heygen_api_key and self.heygen_avatar_id and audio_route):
                 return False
@@ -208,6 +265,8 @@ class AvatarAgentStub:
                 return False
             poll_url = self.heygen_api_root + "/v1/video_status.get"
             for _ in range(90):
+                if _cancelled(cancel):
+                    return False
                 pr = httpx.get(poll_url, headers=headers, params={"video_id": vid}, timeout=30)
                 if pr.status_code >= 300:
                     return False
@@ -226,25 +285,82 @@ class AvatarAgentStub:
                     return os.path.isfile(out_path)
                 if st.lower() in ("error", "failed"):
                     return False
-                time.sleep(2.0)
+                if _wait(cancel, 2.0):
+                    return False
             return False
         except Exception as e:
             self.log.warning("avatar_heygen_failed", error=str(e))
             return False
 
-    def _render_via_local(self, source_image: Optional[str], audio_path: Optional[str], out_path: str) -> bool:
+    def _render_via_server(self, source_image: str, audio_path: str, out_path: str,
+                           cancel: Optional[threading.Event] = None, attempt: Optional[str] = None) -> Optional[bool]:
+        """Render on the SadTalker server; None when it is unreachable (caller falls back to inference.py)."""
+        if httpx is None:
+            return None
+        base = self.sadtalker_server_url
+        out_dir = self.sadtalker_output_dir or os.path.join(self.sadtalker_root or self.output_base, "outputs")
+        if attempt:
+            out_dir = os.path.join(out_dir, attempt)
+        spec = {
+            "source_image": os.path.abspath(source_image),
+            "driven_audio": os.path.abspath(audio_path),
+            "result_dir": os.path.abspath(out_dir),
+            "preprocess": "full",
+        }
         try:
-            root = self.sadtalker_root
-            if not (root and os.path.isdir(root)):
+            r = httpx.post(f"{base}/jobs", json=spec, timeout=10)
+        except httpx.TransportError as e:
+            self.log.warning("avatar_sadtalker_server_unavailable", url=base, error=str(e))
+            return None
+        if r.status_code != 202:
+            self.log.error("avatar_sadtalker_job_rejected", status=r.status_code, body=r.text[:300])
+            return False
+        job_id = r.json().get("job_id")
+        deadline = time.time() + self.sadtalker_server_timeout
+        while True:
+            if _wait(cancel, 0.5) or time.time() > deadline:
+                try:
+                    httpx.delete(f"{base}/jobs/{job_id}", timeout=5)
+                except Exception:
+                    pass
+                if not _cancelled(cancel):
+                    self.log.error("avatar_sadtalker_job_timeout", job_id=job_id)
                 return False
-            inf = os.path.join(root, "inference.py")
-            if not os.path.isfile(inf):
+            try:
+                job = httpx.get(f"{base}/jobs/{job_id}", timeout=10).json()
+            except Exception as e:
+                self.log.warning("avatar_sadtalker_poll_failed", job_id=job_id, error=str(e))
                 return False
+            status = job.get("status")
+            if status == "done":
+                shutil.move(job["result_path"], out_path)
+                self.log.info("avatar_sadtalker_job_done", job_id=job_id, seconds=job.get("seconds"))
+                return os.path.isfile(out_path)
+            if status not in ("queued", "running"):
+                self.log.error("avatar_sadtalker_job_failed", job_id=job_id, status=status, error=job.get("error"))
+                return False
+
+    def _render_via_local(self, source_image: Optional[str], audio_path: Optional[str], out_path: str,
+                          cancel: Optional[threading.Event] = None, attempt: Optional[str] = None) -> bool:
+        try:
             if not (source_image and os.path.isfile(source_image)):
                 return False
             if not (audio_path and os.path.isfile(audio_path)):
                 return False
+            if self.sadtalker_server_url:
+                served = self._render_via_server(source_image, audio_path, out_path, cancel, attempt)
+                if served is not None:
+                    return served
+            root = self.sadtalker_root
+            if not (root and os.path.isdir(root)):
+                return False
+            inf = os.path.join(root, "inference.py")
+            if not os.path.isfile(inf):
+                return False
             out_dir = self.sadtalker_output_dir or os.path.join(root, "outputs")
+            if attempt:
+                # Concurrent attempts must not pick up each other's newest mp4
+                out_dir = os.path.join(out_dir, attempt)
             os.makedirs(out_dir, exist_ok=True)
             py = os.getenv("SADTALKER_PYTHON")
             if not py:
@@ -272,10 +388,16 @@ class AvatarAgentStub:
             ckpt = os.getenv("SADTALKER_CHECKPOINTS")
             if ckpt and os.path.isdir(os.path.dirname(ckpt)):
                 cmd += ["--checkpoint_dir", ckpt]
-            p = subprocess.run(cmd, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if p.returncode != 0:
-                err_msg = p.stderr.decode(errors="ignore")
-                self.log.error("avatar_local_command_failed", returncode=p.returncode, error=err_msg)
+            cache_dir = self.sadtalker_preprocess_cache or os.path.join(root, "preprocess_cache")
+            if cache_dir.lower() != "off":
+                # Same default location as the server, so both reuse one anchor preprocessing
+                cmd += ["--preprocess_cache", os.path.abspath(cache_dir)]
+            returncode, stderr = _run_cancellable(cmd, cancel, cwd=root)
+            if _cancelled(cancel):
+                return False
+            if returncode != 0:
+                err_msg = stderr.decode(errors="ignore")
+                self.log.error("avatar_local_command_failed", returncode=returncode, error=err_msg)
                 raise RuntimeError(err_msg)
             mp4s: List[str] = []
             try:
@@ -295,11 +417,7 @@ class AvatarAgentStub:
             self.log.warning("avatar_local_failed", error=str(e))
             return False
 
-    def render(self, voice_items: List[Dict[str, Any]], category: str = "general") -> List[Dict[str, Any]]:
-        run = StageLogger(source="pipeline", category=category, meta={"stage": "avatar", "style": self.style})
-        run.start("avatar")
-        self._cleanup_old()
-        
+    def _ensure_overlay(self) -> None:
         # Default overlay if not set
         if not self.overlay_image_path:
             potential_assets = [
@@ -311,65 +429,116 @@ class AvatarAgentStub:
                     self.overlay_image_path = p
                     break
 
-        outputs: List[Dict[str, Any]] = []
-        for v in voice_items:
-            title = v.get("title") or v.get("script", {}).get("headline") or "Untitled"
-            lang = (v.get("lang") or "en").lower()
-            tone = "news"
-            preset = self.preset_map.get(f"{lang}|{tone}", self.style)
-            audio_url = v.get("audio_url")
-            
-            # Use existing ID if available to ensure consistency
-            article_id = v.get("id") or self._hash_id(title, audio_url or title)
-            base = f"{article_id}_{lang}_{tone}"
-            os.makedirs(self.output_base, exist_ok=True)
-            meta_path = os.path.join(self.output_base, f"{base}.json")
-            audio_path = v.get("audio_path")
-            duration = self._audio_duration_seconds(audio_path)
-            mp4_path = os.path.join(self.output_base, f"{base}.mp4")
-            rendered = False
-            if self.provider == "did":
-                rendered = self._render_via_did(audio_path, mp4_path)
-            elif self.provider == "heygen":
-                rendered = self._render_via_heygen(audio_url, mp4_path)
-            elif self.provider == "local":
-                src_img = self.sadtalker_source_image or self.overlay_image_path
-                rendered = self._render_via_local(src_img, audio_path, mp4_path)
-            elif self.provider == "ffmpeg":
-                rendered = self._render_static_video(audio_path, mp4_path, duration)
-            meta = {
-                "title": title,
-                "lang": lang,
-                "tone": tone,
-                "style_preset": preset,
-                "audio_url": audio_url,
-                "audio_path": audio_path,
-                "output": {
-                    "format": ("mp4" if rendered else "json"),
-                    "resolution": self.resolution,
-                    "duration_seconds": duration,
-                    "status": ("rendered" if rendered else "stub"),
-                },
+    def render_item(
+        self,
+        v: Dict[str, Any],
+        category: str = "general",
+        provider: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+        attempt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Render (or stub) the avatar video for a single voice item.
+
+        `provider` overrides AVATAR_PROVIDER for this item (e.g. "ffmpeg" for a
+        cheap static render when the item is about to miss its deadline).
+        With `attempt`, the video and its metadata are written to private temp
+        files listed under `pending_files` and nothing is moved into place or
+        indexed: the caller promotes only the winning attempt with
+        `promote_attempt()` and drops the others with `discard_attempt()`, so
+        a speculative duplicate of the same item never clobbers the winner's
+        output, even in a process worker that cannot see `cancel`.
+        """
+        provider = (provider or self.provider).lower()
+        self._ensure_overlay()
+        title = v.get("title") or v.get("script", {}).get("headline") or "Untitled"
+        lang = (v.get("lang") or "en").lower()
+        tone = "news"
+        preset = self.preset_map.get(f"{lang}|{tone}", self.style)
+        audio_url = v.get("audio_url")
+        
+        # Use existing ID if available to ensure consistency
+        article_id = v.get("id") or self._hash_id(title, audio_url or title)
+        base = f"{article_id}_{lang}_{tone}"
+        os.makedirs(self.output_base, exist_ok=True)
+        meta_path = os.path.join(self.output_base, f"{base}.json")
+        audio_path = v.get("audio_path")
+        duration = self._audio_duration_seconds(audio_path)
+        mp4_path = os.path.join(self.output_base, f"{base}.mp4")
+        render_path = os.path.join(self.output_base, f"{base}.{attempt}.tmp.mp4") if attempt else mp4_path
+        rendered = False
+        if provider == "did":
+            rendered = self._render_via_did(audio_path, render_path, cancel)
+        elif provider == "heygen":
+            rendered = self._render_via_heygen(audio_url, render_path, cancel)
+        elif provider == "local":
+            src_img = self.sadtalker_source_image or self.overlay_image_path
+            rendered = self._render_via_local(src_img, audio_path, render_path, cancel, attempt)
+        elif provider == "ffmpeg":
+            rendered = self._render_static_video(audio_path, render_path, duration, cancel)
+        if render_path != mp4_path and (not rendered or _cancelled(cancel)) and os.path.exists(render_path):
+            os.remove(render_path)
+        if _cancelled(cancel):
+            # Lost the race: leave the winner's metadata alone
+            return {"title": title, "lang": lang, "status": "cancelled", "attempt": attempt}
+        meta_target = os.path.join(self.output_base, f"{base}.{attempt}.tmp.json") if attempt else meta_path
+        meta = {
+            "title": title,
+            "lang": lang,
+            "tone": tone,
+            "style_preset": preset,
+            "audio_url": audio_url,
+            "audio_path": audio_path,
+            "output": {
+                "format": ("mp4" if rendered else "json"),
+                "resolution": self.resolution,
+                "duration_seconds": duration,
+                "status": ("rendered" if rendered else "stub"),
+            },
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "category": category,
+        }
+        try:
+            with open(meta_target, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            if not attempt:
+                self.media.record(meta_path, "avatar", self.retention_days)
+        except Exception as e:
+            self.log.warning("avatar_write_meta_failed", file=meta_target, error=str(e))
+        if rendered and not attempt:
+            self.media.record(mp4_path, "avatar", self.retention_days, duration)
+        video_url = f"/data/avatar/{os.path.basename(mp4_path) if rendered else os.path.basename(meta_path)}"
+        out = {
+            "title": title,
+            "lang": lang,
+            "style": preset,
+            "video_url": video_url,
+            "metadata_path": meta_path,
+            "metadata": {
                 "generated_at": datetime.now(timezone.utc).isoformat(),
                 "category": category,
-            }
-            try:
-                with open(meta_path, "w", encoding="utf-8") as f:
-                    json.dump(meta, f, ensure_ascii=False, indent=2)
-            except Exception as e:
-                self.log.warning("avatar_write_meta_failed", file=meta_path, error=str(e))
-            video_url = f"/data/avatar/{os.path.basename(mp4_path) if rendered else os.path.basename(meta_path)}"
-            outputs.append({
-                "title": title,
-                "lang": lang,
-                "style": preset,
-                "video_url": video_url,
+            },
+        }
+        if attempt:
+            out["attempt"] = attempt
+            out["pending_files"] = {
+                "video": render_path if rendered else None,
+                "meta": meta_target,
+                "video_path": mp4_path,
                 "metadata_path": meta_path,
-                "metadata": {
-                    "generated_at": datetime.now(timezone.utc).isoformat(),
-                    "category": category,
-                },
-            })
+                "duration_seconds": duration,
+                "retention_days": self.retention_days,
+                "index": self.media.path,
+            }
+        return out
+
+    def render(self, voice_items: List[Dict[str, Any]], category: str = "general") -> List[Dict[str, Any]]:
+        run = StageLogger(source="pipeline", category=category, meta={"stage": "avatar", "style": self.style})
+        run.start("avatar")
+        self._ensure_overlay()
+
+        outputs: List[Dict[str, Any]] = []
+        for v in voice_items:
+            outputs.append(self.render_item(v, category=category))
         run.complete("avatar", meta={"count": len(outputs)})
         run.end_run("completed")
         self.log.info("avatar_rendered", count=len(outputs))
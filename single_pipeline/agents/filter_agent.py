@@ -5,6 +5,9 @@ from datetime import datetime, timezone
 
 from ..logging_utils import PipelineLogger
 from ..rag_client import RAGClient
+from ..filter_cascade import FilterCascade
+from ..tag_cache import TagCache
+from ..priority import EngagementLookup, PriorityScorer
 try:
     from uniguru_client import UniguruClient
 except Exception:
@@ -17,7 +20,7 @@ except Exception:
 
 
 class FilterAgent:
-    def __init__(self):
+    def __init__(self, engagement_lookup: Optional[EngagementLookup] = None):
         self.rag = RAGClient()
         provider_choice = os.getenv("UNIGURU_PROVIDER", "").lower()
         if provider_choice == "local" and UniguruLocalAdapter:
@@ -31,6 +34,13 @@ class FilterAgent:
             self.lang_threshold = float(os.getenv("LANG_DOMINANCE_THRESHOLD", "0.3"))
         except Exception:
             self.lang_threshold = 0.3
+        # Cheap rejection rules run before tagging/embedding work
+        self.cascade = FilterCascade(seen_hashes=lambda h: h in self.rag.cache_by_hash)
+        self.last_stats: Dict[str, Any] = {}
+        # Memoized tagging shared by local and remote Uniguru
+        self.tag_cache = TagCache()
+        self.scorer = PriorityScorer(engagement_lookup=engagement_lookup)
+        self.begin_batch()
 
     def _basic_language_detect(self, text: str) -> str:
         # Lightweight heuristic for common Indic scripts + English
@@ -85,100 +95,144 @@ class FilterAgent:
         timestamp = it.get("timestamp")
         return {**it, "title": title, "body": body, "timestamp": timestamp}
 
-    def filter_items(self, items: List[Dict[str, Any]], logger: Optional[PipelineLogger] = None) -> List[Dict[str, Any]]:
-        filtered: List[Dict[str, Any]] = []
-        for it in items:
-            valid_it = self._validate_item(it, logger)
-            if not valid_it:
-                # If we were processing raw inputs that needed a status return, we would return rejected item.
-                # However, FilterAgent usually takes raw feed items and outputs clean items.
-                # The contract says we should have an id and status.
-                # Since we can't even generate an ID without title/body, we skip/reject completely 
-                # OR we generate a placeholder ID if possible to track the rejection.
-                # But without title/body, we can't guarantee uniqueness.
-                # For now, we'll log rejection and skip adding to filtered list (filtering IS the rejection).
-                continue
-            
-            it = valid_it
-            title = it.get("title", "Untitled")
-            body = it.get("body", "")
-            timestamp = it.get("timestamp")
+    def begin_batch(self) -> None:
+        """Reset per-batch cascade state and counters."""
+        self.cascade.reset()
+        self.tag_cache.reset_stats()
+        self._batch_counts = {"input": 0, "output": 0}
+        self._expensive = {"tagged": 0, "rag": 0}
+
+    def end_batch(self, logger: Optional[PipelineLogger] = None) -> Dict[str, Any]:
+        """Persist the tag cache and publish batch stats to `last_stats`."""
+        self.tag_cache.flush()
+        self.last_stats = {
+            **self._batch_counts,
+            "rules": self.cascade.stats(),
+            "expensive": dict(self._expensive),
+            "tag_cache": self.tag_cache.stats(),
+        }
+        if logger:
+            logger.info("filter_items_count", count=self._batch_counts["output"])
+            logger.info("filter_cascade_stats", **self.last_stats)
+        return self.last_stats
+
+    def filter_item(self, it: Dict[str, Any], logger: Optional[PipelineLogger] = None) -> Optional[Dict[str, Any]]:
+        """Filter a single raw item; returns None when it is rejected.
+
+        Call `begin_batch()` first so in-batch dedup and counters are scoped.
+        """
+        self._batch_counts["input"] += 1
+        valid_it = self._validate_item(it, logger)
+        if not valid_it:
+            # If we were processing raw inputs that needed a status return, we would return rejected item.
+            # However, FilterAgent usually takes raw feed items and outputs clean items.
+            # The contract says we should have an id and status.
+            # Since we can't even generate an ID without title/body, we skip/reject completely 
+            # OR we generate a placeholder ID if possible to track the rejection.
+            # But without title/body, we can't guarantee uniqueness.
+            # For now, we'll log rejection and skip adding to filtered list (filtering IS the rejection).
+            return None
+        
+        it = valid_it
+        passed, rule, reason = self.cascade.evaluate(it)
+        if not passed:
+            if logger:
+                logger.info("filter_cascade_rejected", rule=rule, reason=reason)
+            return None
 
-            # Language detection
-            lang = self._basic_language_detect(body)
+        title = it.get("title", "Untitled")
+        body = it.get("body", "")
+        timestamp = it.get("timestamp")
 
-            # ID generation (hash of title+body)
-            raw_id_str = f"{title}{body}"
-            id_val = hashlib.md5(raw_id_str.encode("utf-8")).hexdigest()
+        # Language detection
+        lang = self._basic_language_detect(body)
 
-            dedup_key = id_val
-            try:
-                # Use RAG to assign a semantic group key if possible
-                dedup_key = self.rag.assign_group_key(
-                    title=title,
-                    body=body,
-                    published_at_iso=timestamp,
-                    category=None
-                )
-            except Exception:
-                pass
-
-            # Optional: tag category/tone/audience via Uniguru if available
-            tags: Dict[str, Any] = {"category": None, "tone": "neutral", "audience": "general"}
-            if self.uniguru:
-                try:
-                    tags = self.uniguru.tag_text(title=title, body=body, language=lang)
-                except Exception as e:
-                    if logger:
-                        logger.warning("uniguru_tagging_failed", error=str(e))
-                    tags = {"category": None, "tone": "neutral", "audience": "general"}
-            
-            tone = tags.get("tone") or "neutral"
+        # ID generation (hash of title+body)
+        raw_id_str = f"{title}{body}"
+        id_val = hashlib.md5(raw_id_str.encode("utf-8")).hexdigest()
 
-            # Initial RAG-based dedup/context check
-            dedup_flag = False
+        # Optional: tag category/tone/audience via Uniguru if available
+        tags: Dict[str, Any] = {"category": None, "tone": "neutral", "audience": "general"}
+        if self.uniguru:
+            misses = self.tag_cache.misses
             try:
-                dedup_flag = self.rag.is_duplicate(title, body)
+                tags = self.tag_cache.tag(self.uniguru, title, body, lang)
             except Exception as e:
                 if logger:
-                    logger.warning("rag_dedup_failed", error=str(e))
-                dedup_flag = False
-
-            # Schema-compliant object
-            # Note: 'body' is preserved for ScriptGen but is not part of the final contract schema
-            item = {
-                "id": id_val,
-                "script": {
-                    "text": "",
-                    "headline": title,
-                    "bullets": []
-                },
-                "tone": tone,
-                "language": lang,
-                "priority_score": 0.5,
-                "trend_score": 0.5,
-                "audio_path": None,
-                "video_path": None,
-                "stage_status": {
-                    "fetch": "success",
-                    "filter": "success",
-                    "script": "pending",
-                    "voice": "pending",
-                    "avatar": "pending"
-                },
-                "timestamps": {
-                    "fetched_at": timestamp,
-                    "processed_at": datetime.now(timezone.utc).isoformat(),
-                    "completed_at": None
-                },
-                # Internal fields
-                "body": body,
-                "dedup_flag": dedup_flag,
-                "dedup_key": dedup_key,
-                "raw": it.get("raw", {})
-            }
-            filtered.append(item)
+                    logger.warning("uniguru_tagging_failed", error=str(e))
+                tags = {"category": None, "tone": "neutral", "audience": "general"}
+            # Only count calls that reached the tagger; cache hits cost nothing
+            self._expensive["tagged"] += self.tag_cache.misses - misses
 
-        if logger:
-            logger.info("filter_items_count", count=len(filtered))
-        return filtered
\ No newline at end of file
+        tone = tags.get("tone") or "neutral"
+
+        # Embedding-backed RAG work runs last, only on survivors
+        self._expensive["rag"] += 1
+        dedup_key = id_val
+        try:
+            # Use RAG to assign a semantic group key if possible
+            dedup_key = self.rag.assign_group_key(
+                title=title,
+                body=body,
+                published_at_iso=timestamp,
+                category=None
+            )
+        except Exception:
+            pass
+
+        # Initial RAG-based dedup/context check
+        dedup_flag = False
+        try:
+            dedup_flag = self.rag.is_duplicate(title, body)
+        except Exception as e:
+            if logger:
+                logger.warning("rag_dedup_failed", error=str(e))
+            dedup_flag = False
+
+        # Schema-compliant object
+        # Note: 'body' is preserved for ScriptGen but is not part of the final contract schema
+        item = {
+            "id": id_val,
+            "script": {
+                "text": "",
+                "headline": title,
+                "bullets": []
+            },
+            "tone": tone,
+            "language": lang,
+            "priority_score": 0.5,
+            "trend_score": 0.5,
+            "audio_path": None,
+            "video_path": None,
+            "stage_status": {
+                "fetch": "success",
+                "filter": "success",
+                "script": "pending",
+                "voice": "pending",
+                "avatar": "pending"
+            },
+            "timestamps": {
+                "fetched_at": timestamp,
+                "processed_at": datetime.now(timezone.utc).isoformat(),
+                "completed_at": None
+            },
+            # Internal fields
+            "body": body,
+            "dedup_flag": dedup_flag,
+            "dedup_key": dedup_key,
+            "raw": it.get("raw", {})
+        }
+        self._batch_counts["output"] += 1
+        return item
+
+    def filter_items(self, items: List[Dict[str, Any]], logger: Optional[PipelineLogger] = None) -> List[Dict[str, Any]]:
+        filtered: List[Dict[str, Any]] = []
+        self.begin_batch()
+        for it in items:
+            item = self.filter_item(it, logger)
+            if item is not None:
+                filtered.append(item)
+        # Replace the 0.5 placeholders now that group sizes for the batch are known
+        self.scorer.score(filtered)
+        self.end_batch(logger)
+        return filtered
@@ -4,6 +4,21 @@ from datetime import datetime, timezone
 from ..logging_utils import PipelineLogger, StageLogger
 
 
+# Fixed narration wording; the voice stage caches the audio of these phrases (see tts_phrases)
+TONE_PREFIXES = {
+    "formal": "In today’s update,",
+    "casual": "Quick take:",
+    "neutral": "Here’s what happened:",
+}
+STYLE_PHRASES = {
+    "formal": ("In today’s bulletin:", "Key details:"),
+    "kids": ("Story time!", "In simple words:"),
+    "youth": ("Fast update:",),
+    "devotional": ("With grace and calm,", "Reflection:"),
+}
+TEMPLATE_PHRASES = tuple(TONE_PREFIXES.values()) + tuple(p for ps in STYLE_PHRASES.values() for p in ps)
+
+
 class ScriptGenAgent:
     """Lightweight script generator.
 
@@ -24,11 +39,7 @@ class ScriptGenAgent:
         return title.strip()[:140]
 
     def _conversational(self, title: str, body: str, tone: Optional[str], audience: Optional[str]) -> str:
-        tone_map = {
-            "formal": "In today’s update,",
-            "casual": "Quick take:",
-            "neutral": "Here’s what happened:",
-        }
+        tone_map = TONE_PREFIXES
         t_key = (tone or "neutral").lower()
         if t_key not in tone_map:
              self.log.warning("unknown_tone_fallback", tone=tone, fallback="neutral")
@@ -40,62 +51,68 @@ class ScriptGenAgent:
     def _style_variant(self, title: str, body: str, style: str) -> str:
         s = style.lower()
         if s == "formal":
-            return f"In today’s bulletin: {title.strip()}. Key details: {body.strip()[:400]}"
+            opener, details = STYLE_PHRASES["formal"]
+            return f"{opener} {title.strip()}. {details} {body.strip()[:400]}"
         if s == "kids":
-            return f"Story time! {title.strip()}. In simple words: {body.strip()[:300]}"
+            opener, details = STYLE_PHRASES["kids"]
+            return f"{opener} {title.strip()}. {details} {body.strip()[:300]}"
         if s == "youth":
-            return f"Fast update: {title.strip()} — {body.strip()[:320]}"
+            return f"{STYLE_PHRASES['youth'][0]} {title.strip()} — {body.strip()[:320]}"
         if s == "devotional":
-            return f"With grace and calm, {title.strip()}. Reflection: {body.strip()[:350]}"
+            opener, details = STYLE_PHRASES["devotional"]
+            return f"{opener} {title.strip()}. {details} {body.strip()[:350]}"
         return f"{title.strip()} — {body.strip()[:400]}"
 
+    def generate_item(self, it: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the script for a single filtered item."""
+        # Extract fields from new schema + body
+        title = it.get("title") or it.get("script", {}).get("headline") or "Untitled"
+        body = it.get("body") or ""
+        tone = it.get("tone")
+        lang = it.get("language") or "en"
+        
+        # Generate script components
+        try:
+            bullets = self._bullets(body)
+            headline = self._headline(title)
+            text = self._conversational(title, body, tone, "general")
+            status = "success"
+            
+            # Check for empty script (failure mode)
+            if not text.strip():
+                status = "failed"
+                # We might still want to pass it through as failed?
+                # Or maybe "rejected" if content was empty.
+        except Exception as e:
+            self.log.error("script_gen_failed", error=str(e))
+            status = "failed"
+            text = ""
+            headline = ""
+            bullets = []
+        
+        # Update item
+        new_item = it.copy()
+        new_item["script"] = {
+            "text": text,
+            "headline": headline,
+            "bullets": bullets
+        }
+        # Update status and timestamps
+        if "stage_status" not in new_item:
+            new_item["stage_status"] = {}
+        new_item["stage_status"]["script"] = status
+        
+        if "timestamps" not in new_item:
+            new_item["timestamps"] = {}
+        new_item["timestamps"]["processed_at"] = datetime.now(timezone.utc).isoformat()
+        return new_item
+
     def generate(self, filtered_items: List[Dict[str, Any]], category: str = "general") -> List[Dict[str, Any]]:
         run = StageLogger(source="pipeline", category=category, meta={"stage": "script_gen"})
         run.start("summarize")
         scripts: List[Dict[str, Any]] = []
         for it in filtered_items:
-            # Extract fields from new schema + body
-            title = it.get("title") or it.get("script", {}).get("headline") or "Untitled"
-            body = it.get("body") or ""
-            tone = it.get("tone")
-            lang = it.get("language") or "en"
-            
-            # Generate script components
-            try:
-                bullets = self._bullets(body)
-                headline = self._headline(title)
-                text = self._conversational(title, body, tone, "general")
-                status = "success"
-                
-                # Check for empty script (failure mode)
-                if not text.strip():
-                    status = "failed"
-                    # We might still want to pass it through as failed?
-                    # Or maybe "rejected" if content was empty.
-            except Exception as e:
-                self.log.error("script_gen_failed", error=str(e))
-                status = "failed"
-                text = ""
-                headline = ""
-                bullets = []
-            
-            # Update item
-            new_item = it.copy()
-            new_item["script"] = {
-                "text": text,
-                "headline": headline,
-                "bullets": bullets
-            }
-            # Update status and timestamps
-            if "stage_status" not in new_item:
-                new_item["stage_status"] = {}
-            new_item["stage_status"]["script"] = status
-            
-            if "timestamps" not in new_item:
-                new_item["timestamps"] = {}
-            new_item["timestamps"]["processed_at"] = datetime.now(timezone.utc).isoformat()
-            
-            scripts.append(new_item)
+            scripts.append(self.generate_item(it))
             
         run.complete("summarize", meta={"count": len(scripts)})
         run.end_run("completed")
@@ -1,12 +1,19 @@
 import os
-import time
 import wave
-import struct
+import threading
+import sys
+import math
+from array import array
 import hashlib
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 
 from ..logging_utils import PipelineLogger, StageLogger
+from ..tts_cache import TTSCache, wav_duration
+from ..audio_codec import StreamEncoder, audio_codec, convert_pcm, delivery_ext, encode_file, join_pcm, read_pcm
+from ..tts_phrases import phrase_cache_enabled, split_template
+from ..media_janitor import MediaIndex, ensure_janitor, media_index_for
 try:
     import pyttsx3  # type: ignore
 except Exception:
@@ -17,6 +24,49 @@ try:
 except ImportError:
     pythoncom = None
 
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+_AMPLITUDE = 0.25  # fraction of max to avoid clipping
+_SUSTAIN = 0.8
+
+
+@lru_cache(maxsize=512)
+def _tone_pcm(harmonics, n_frames: int, sample_rate: int) -> bytes:
+    """Little-endian int16 PCM of `sum(gain * sin(2*pi*freq*t))` under an attack/release envelope.
+
+    Vectorized with NumPy when installed; the pure-Python path computes the
+    same samples one by one. Memoized: stub words map to a small set of
+    tones, so short items (e.g. sentence chunks) reuse earlier buffers.
+    """
+    if n_frames <= 0:
+        return b""
+    if np is not None:
+        i = np.arange(n_frames, dtype=np.float64)
+        t = i / sample_rate
+        attack = np.minimum(1.0, i / (sample_rate * 0.02))
+        release = np.maximum(0.2, 1.0 - (i / n_frames))
+        a = _AMPLITUDE * attack * _SUSTAIN * release
+        sample_f = np.zeros(n_frames, dtype=np.float64)
+        for freq, gain in harmonics:
+            sample_f += gain * np.sin(2 * np.pi * freq * t)
+        return np.clip(a * 32767 * sample_f, -32767, 32767).astype("<i2").tobytes()
+    out = array("h", bytes(2 * n_frames))
+    for i in range(n_frames):
+        t = float(i) / sample_rate
+        attack = min(1.0, i / (sample_rate * 0.02))
+        release = max(0.2, 1.0 - (i / n_frames))
+        a = _AMPLITUDE * attack * _SUSTAIN * release
+        sample_f = 0.0
+        for freq, gain in harmonics:
+            sample_f += gain * math.sin(2 * math.pi * freq * t)
+        out[i] = int(max(-32767, min(32767, a * 32767 * sample_f)))
+    if sys.byteorder == "big":
+        out.byteswap()
+    return out.tobytes()
+
 
 
 class TTSAgentStub:
@@ -33,6 +83,7 @@ class TTSAgentStub:
         output_base: Optional[str] = None,
         retention_days: int = 7,
         voice_map: Optional[Dict[str, str]] = None,
+        media: Optional[MediaIndex] = None,
     ):
         self.voice = voice
         self.log = logger or PipelineLogger(component="tts_stub")
@@ -51,90 +102,266 @@ class TTSAgentStub:
         self.rate = int(os.getenv("TTS_RATE", "150"))
         self.sample_rate = int(os.getenv("TTS_SAMPLE_RATE", "44100"))
         self.voice_name = os.getenv("TTS_VOICE_NAME")
+        self.cache = TTSCache(self.output_base, logger=self.log)
+        # Delivery codec; the WAV stays as the renderers' intermediate with its own (shorter) retention
+        self.codec = audio_codec()
+        default_wav_days = retention_days if self.codec == "wav" else 1
+        self.wav_retention_days = float(os.getenv("TTS_WAV_RETENTION_DAYS", str(default_wav_days)))
+        self._codec_warned = False
+        # Template phrases ("Here’s what happened:") are synthesized once per voice/rate and spliced in
+        self.phrase_cache = phrase_cache_enabled() and self.cache.enabled
+        self.crossfade_ms = float(os.getenv("TTS_PHRASE_CROSSFADE_MS", "15"))
+        # Retention runs in the background janitor, off the request path
+        self.media = media or media_index_for(self.output_base)
+        ensure_janitor(self.media)
+        # pyttsx3 engines live per thread (see _pyttsx3_engine)
+        self._local = threading.local()
+
+    def _effective_provider(self) -> str:
+        return "pyttsx3" if (self.provider == "pyttsx3" and pyttsx3) else "stub"
 
     def _hash_id(self, title: str, body: str) -> str:
         h = hashlib.sha256((title + "|" + body).encode("utf-8", errors="ignore")).hexdigest()
         return f"article_{h[:12]}"
 
-    def _cleanup_old(self) -> None:
-        try:
-            os.makedirs(self.output_base, exist_ok=True)
-            cutoff = time.time() - (self.retention_days * 24 * 3600)
-            for fname in os.listdir(self.output_base):
-                fpath = os.path.join(self.output_base, fname)
-                try:
-                    if os.path.isfile(fpath) and os.path.getmtime(fpath) < cutoff:
-                        os.remove(fpath)
-                    elif os.path.isfile(fpath) and fname.lower().endswith(".wav"):
-                        try:
-                            with wave.open(fpath, "rb") as wf:
-                                frames = wf.getnframes()
-                                rate = wf.getframerate() or 16000
-                                dur = float(frames) / float(rate)
-                                if dur <= 1.5:
-                                    os.remove(fpath)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
-    def _write_wav(self, path: str, duration_seconds: float = 2.0, sample_rate: int = 16000, text: Optional[str] = None) -> None:
-        # 16kHz mono PCM, generate a multi-tone envelope to sound more like voice
-        import math
+    def _write_wav(
+        self,
+        path: str,
+        duration_seconds: float = 2.0,
+        sample_rate: int = 16000,
+        text: Optional[str] = None,
+        sink: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        # 16-bit mono PCM, generate a multi-tone envelope to sound more like voice.
+        # `sink` receives each chunk as it is generated (streaming encode).
         if text:
             words = [w for w in (text or "").split() if w]
         else:
             words = []
-        n_samples = int(duration_seconds * sample_rate)
         base_freq = 220.0
-        amplitude = 0.25  # fraction of max to avoid clipping
+        chunks: List[bytes] = []
+        if words:
+            # Generate a short tone per word with a brief pause to avoid "single beep"
+            tone_len = max(0.25, min(0.6, 0.35))
+            pause_len = 0.08
+            frames_tone = int(tone_len * sample_rate)
+            silence = bytes(2 * int(pause_len * sample_rate))
+            tones: Dict[float, bytes] = {}
+            for w in words:
+                w_hash = (sum(ord(c) for c in w) % 80) - 40
+                freq = max(140.0, min(360.0, base_freq + float(w_hash)))
+                if freq not in tones:
+                    tones[freq] = _tone_pcm(((freq, 1.0), (freq * 2.0, 0.3)), frames_tone, sample_rate)
+                chunks.append(tones[freq])
+                chunks.append(silence)
+                if sink:
+                    sink(tones[freq])
+                    sink(silence)
+        else:
+            # sum a few harmonics
+            harmonics = ((base_freq, 1.0), (base_freq * 2.0, 0.5), (base_freq * 3.0, 0.25))
+            chunks.append(_tone_pcm(harmonics, int(duration_seconds * sample_rate), sample_rate))
+            if sink:
+                sink(chunks[-1])
         with wave.open(path, "w") as wf:
             wf.setnchannels(1)
             wf.setsampwidth(2)  # 16-bit
             wf.setframerate(sample_rate)
-            if words:
-                # Generate a short tone per word with a brief pause to avoid "single beep"
-                tone_len = max(0.25, min(0.6, 0.35))
-                pause_len = 0.08
-                for w in words:
-                    w_hash = (sum(ord(c) for c in w) % 80) - 40
-                    freq = max(140.0, min(360.0, base_freq + float(w_hash)))
-                    frames_tone = int(tone_len * sample_rate)
-                    for i in range(frames_tone):
-                        t = float(i) / sample_rate
-                        attack = min(1.0, i / (sample_rate * 0.02))
-                        sustain = 0.8
-                        release = max(0.2, 1.0 - (i / frames_tone))
-                        a = amplitude * attack * sustain * release
-                        sample_f = (
-                            math.sin(2 * math.pi * freq * t)
-                            + 0.3 * math.sin(2 * math.pi * (freq * 2.0) * t)
-                        )
-                        sample = int(max(-32767, min(32767, a * 32767 * sample_f)))
-                        wf.writeframes(struct.pack("<h", sample))
-                    # brief pause
-                    frames_pause = int(pause_len * sample_rate)
-                    silence = struct.pack("<h", 0)
-                    for _ in range(frames_pause):
-                        wf.writeframes(silence)
+            wf.writeframes(b"".join(chunks))
+
+    def _pyttsx3_engine(self) -> Any:
+        """This thread's pyttsx3 engine; COM init and voice lookup happen once per thread."""
+        eng = getattr(self._local, "engine", None)
+        if eng is not None:
+            return eng
+        if pythoncom and not getattr(self._local, "com", False):
+            pythoncom.CoInitialize()
+            self._local.com = True
+        eng = pyttsx3.init()
+        try:
+            voices = eng.getProperty("voices") or []
+            target = None
+            if self.voice_name:
+                for v in voices:
+                    if self.voice_name.lower() in (v.name or "").lower():
+                        target = v.id
+                        break
+            if not target:
+                preferred = ["Zira", "Jenny", "David", "Mark", "Neural"]
+                for name in preferred:
+                    for v in voices:
+                        if name.lower() in (v.name or "").lower():
+                            target = v.id
+                            break
+                    if target:
+                        break
+            if target:
+                eng.setProperty("voice", target)
+        except Exception:
+            pass
+        self._local.engine = eng
+        return eng
+
+    def warm(self) -> None:
+        """Initialize this thread's provider engine ahead of the first item."""
+        if self._effective_provider() == "pyttsx3":
+            try:
+                self._pyttsx3_engine()
+            except Exception as e:
+                self.log.warning("tts_engine_init_failed", provider="pyttsx3", error=str(e))
+
+    def release_engine(self) -> None:
+        """Drop this thread's engine (and COM apartment); call from the thread that used it."""
+        eng = getattr(self._local, "engine", None)
+        self._local.engine = None
+        if eng is not None:
+            try:
+                eng.stop()
+            except Exception:
+                pass
+        if getattr(self._local, "com", False):
+            self._local.com = False
+            try:
+                pythoncom.CoUninitialize()
+            except Exception:
+                pass
+
+    def _render_audio(
+        self,
+        narration: str,
+        audio_path: str,
+        rate: Optional[int] = None,
+        encoder: Optional[StreamEncoder] = None,
+    ) -> Optional[str]:
+        """Write narration audio to `audio_path`; returns the provider that produced it.
+
+        Stub audio is also streamed to `encoder` while it is generated.
+        """
+        sink = encoder.write if encoder is not None else None
+        try:
+            if self.provider == "pyttsx3" and pyttsx3:
+                try:
+                    eng = self._pyttsx3_engine()
+                    eng.setProperty("rate", rate or self.rate)
+                    eng.save_to_file(narration, audio_path)
+                    eng.runAndWait()
+                    self.log.info("tts_provider_used", provider="pyttsx3", file=audio_path)
+                    return "pyttsx3"
+                except Exception as e:
+                    self.log.warning("tts_pyttsx3_failed", error=str(e))
+                    # A broken engine is rebuilt on the next item
+                    self.release_engine()
+                    self._write_wav(audio_path, duration_seconds=self._duration_for_text(narration), sample_rate=self.sample_rate, text=narration, sink=sink)
+                    return "stub"
             else:
-                for i in range(n_samples):
-                    t = float(i) / sample_rate
-                    # simple ADSR-like envelope
-                    attack = min(1.0, i / (sample_rate * 0.02))
-                    sustain = 0.8
-                    release = max(0.2, 1.0 - (i / n_samples))
-                    a = amplitude * attack * sustain * release
-                    # sum a few harmonics
-                    sample_f = (
-                        math.sin(2 * math.pi * base_freq * t)
-                        + 0.5 * math.sin(2 * math.pi * (base_freq * 2.0) * t)
-                        + 0.25 * math.sin(2 * math.pi * (base_freq * 3.0) * t)
-                    )
-                    sample = int(max(-32767, min(32767, a * 32767 * sample_f)))
-                    wf.writeframes(struct.pack("<h", sample))
+                if self.provider == "pyttsx3" and not pyttsx3:
+                    self.log.warning("tts_provider_unavailable", provider="pyttsx3")
+                self._write_wav(audio_path, duration_seconds=self._duration_for_text(narration), sample_rate=self.sample_rate, text=narration, sink=sink)
+                return "stub"
+        except Exception as e:
+            self.log.warning("tts_write_wav_failed", file=audio_path, error=str(e))
+        return None
+
+    def _phrase_audio(self, phrase: str, voice: str, rate: int) -> Tuple[Optional[str], Optional[str]]:
+        """Cached `(path, provider)` for a fixed template phrase, synthesizing it on first use."""
+        key = self.cache.make_key(phrase, voice, rate, self.sample_rate, self._effective_provider(), self.voice_name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.media.touch(cached["path"])
+            return cached["path"], cached.get("provider")
+        phrase_dir = os.path.join(self.output_base, "phrases")
+        os.makedirs(phrase_dir, exist_ok=True)
+        path = os.path.join(phrase_dir, f"phrase_{key[:16]}.wav")
+        provider = self._render_audio(phrase, path, rate)
+        if not provider:
+            return None, None
+        if provider == self._effective_provider():
+            self.cache.put(key, path, provider)
+        # No duration: phrases are short by design and must not look like placeholder beeps to the janitor
+        self.media.record(path, "tts", self.retention_days)
+        return path, provider
+
+    def _render_segmented(
+        self,
+        narration: str,
+        audio_path: str,
+        rate: int,
+        voice: str,
+        encoder: Optional[StreamEncoder] = None,
+    ) -> Optional[str]:
+        """Render templated narration from cached phrase audio plus synthesis of the variable text only.
+
+        Segments are joined with a TTS_PHRASE_CROSSFADE_MS crossfade (default
+        15). Returns the provider, or None when the narration has no template
+        phrase or a segment failed, so the caller synthesizes the whole text.
+        """
+        segments = split_template(narration)
+        if len(segments) < 2 or not any(is_template for _, is_template in segments):
+            return None
+        tmp_path = f"{audio_path}.{os.getpid()}.{threading.get_ident()}.seg.wav"
+        parts: List[bytes] = []
+        layout = None
+        provider = self._effective_provider()
+        try:
+            for text, is_template in segments:
+                if is_template:
+                    path, seg_provider = self._phrase_audio(text, voice, rate)
+                else:
+                    path, seg_provider = tmp_path, self._render_audio(text, tmp_path, rate)
+                if not path or not seg_provider:
+                    return None
+                if seg_provider != provider:
+                    provider = seg_provider
+                src, frames = read_pcm(path)
+                layout = layout or src
+                frames = convert_pcm(frames, src, layout)
+                if frames is None:
+                    return None
+                parts.append(frames)
+        except Exception as e:
+            self.log.warning("tts_phrase_splice_failed", file=audio_path, error=str(e))
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        pcm = join_pcm(parts, layout, int(layout[2] * self.crossfade_ms / 1000))
+        with wave.open(audio_path, "w") as wf:
+            wf.setnchannels(layout[0])
+            wf.setsampwidth(layout[1])
+            wf.setframerate(layout[2])
+            wf.writeframes(pcm)
+        if encoder is not None:
+            encoder.write(pcm)
+        self.log.info("tts_phrase_spliced", file=audio_path, segments=len(segments),
+                      template=sum(1 for _, is_template in segments if is_template))
+        return provider
+
+    def _delivery_path(self, audio_path: str) -> str:
+        return os.path.splitext(audio_path)[0] + delivery_ext(self.codec)
+
+    def _open_encoder(self, audio_path: str) -> Optional[StreamEncoder]:
+        # pyttsx3 writes its own file, so only stub audio can be encoded as it is generated
+        if self.codec == "wav" or self._effective_provider() != "stub":
+            return None
+        return StreamEncoder.open(self._delivery_path(audio_path), self.codec, self.sample_rate)
+
+    def _deliver(self, audio_path: str, encoder: Optional[StreamEncoder] = None) -> Tuple[str, str]:
+        """Compressed copy of `audio_path` for clients as `(path, format)`; the WAV itself when unavailable."""
+        if self.codec == "wav":
+            return audio_path, "wav"
+        out = self._delivery_path(audio_path)
+        if encoder is not None:
+            ok = encoder.close(self.log)
+        elif os.path.isfile(out) and os.path.getmtime(out) >= os.path.getmtime(audio_path):
+            ok = True
+        else:
+            ok = encode_file(audio_path, out, self.codec, self.log)
+        if ok:
+            return out, self.codec
+        if not self._codec_warned:
+            self._codec_warned = True
+            self.log.warning("tts_codec_unavailable", codec=self.codec, fallback="wav")
+        return audio_path, "wav"
 
     def _duration_for_text(self, text: str) -> float:
         try:
@@ -144,106 +371,156 @@ class TTSAgentStub:
         except Exception:
             return 6.0
 
+    def _target(self, s: Dict[str, Any], rate: Optional[int] = None, voice: Optional[str] = None) -> Dict[str, Any]:
+        """Resolved settings, deterministic audio path and cache key for a script item."""
+        rate = int(rate or self.rate)
+        title = s.get("title") or "Untitled"
+        lang = (s.get("lang") or "en").lower()
+        narration = (s.get("variants", {}).get("narration") or title)
+        tone = (s.get("tone") or "news").lower()
+        voice = self.voice_map.get(f"{lang}|{tone}", voice or self.voice)
+        # Create deterministic file name
+        article_id = self._hash_id(title, narration)
+        fname = f"{article_id}_{lang}_{tone}.wav"
+        os.makedirs(self.output_base, exist_ok=True)
+        return {
+            "rate": rate,
+            "title": title,
+            "lang": lang,
+            "narration": narration,
+            "tone": tone,
+            "voice": voice,
+            "article_id": article_id,
+            "fname": fname,
+            "audio_path": os.path.join(self.output_base, fname),
+            "key": self.cache.make_key(narration, voice, rate, self.sample_rate, self._effective_provider(), self.voice_name),
+        }
+
+    def adopt_audio(
+        self,
+        s: Dict[str, Any],
+        src_path: str,
+        provider: str,
+        rate: Optional[int] = None,
+        voice: Optional[str] = None,
+    ) -> str:
+        """Install audio assembled elsewhere (e.g. sentence chunks) as the item's narration.
+
+        The file is moved to the item's deterministic path and cached, so a
+        later `synthesize_item` with the same settings is a cache hit.
+        """
+        t = self._target(s, rate, voice)
+        os.replace(src_path, t["audio_path"])
+        entry = self.cache.put(t["key"], t["audio_path"], provider)
+        self.media.record(t["audio_path"], "tts", self.retention_days if self.codec == "wav" else self.wav_retention_days,
+                          (entry or {}).get("duration_seconds") or wav_duration(t["audio_path"]))
+        return t["audio_path"]
+
+    def _media_url(self, path: str) -> str:
+        # Cache hits may live in a subdirectory (e.g. phrases/), so keep the path below output_base
+        return "/data/tts/" + os.path.relpath(path, self.output_base).replace(os.sep, "/")
+
+    def synthesize_item(
+        self,
+        s: Dict[str, Any],
+        category: str = "general",
+        rate: Optional[int] = None,
+        voice: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Synthesize narration audio for a single script item.
+
+        `rate` and `voice` (the fallback when `lang|tone` is not in the voice
+        map) override the agent's defaults for this item only, so one agent
+        and its engines can serve requests with different settings.
+        """
+        t = self._target(s, rate, voice)
+        rate, title, lang, narration, tone, voice = t["rate"], t["title"], t["lang"], t["narration"], t["tone"], t["voice"]
+        article_id, audio_path, key = t["article_id"], t["audio_path"], t["key"]
+        cached = self.cache.get(key)
+        if cached is not None:
+            audio_path = cached["path"]
+            provider = cached.get("provider") or self._effective_provider()
+            duration = cached.get("duration_seconds")
+            # Keep reused audio inside the retention window
+            self.media.touch(audio_path)
+            self.log.info("tts_cache_hit", file=audio_path, article_id=article_id)
+            delivery_path, delivery_format = self._deliver(audio_path)
+            if delivery_path != audio_path:
+                self.media.record(delivery_path, "tts", self.retention_days, duration)
+        else:
+            encoder = self._open_encoder(audio_path)
+            provider = self._render_segmented(narration, audio_path, rate, voice, encoder) if self.phrase_cache else None
+            if provider is None:
+                provider = self._render_audio(narration, audio_path, rate, encoder=encoder)
+            entry = self.cache.put(key, audio_path, provider) if provider == self._effective_provider() else None
+            duration = (entry or {}).get("duration_seconds")
+            delivery_path, delivery_format = audio_path, "wav"
+            if provider:
+                if duration is None:
+                    duration = wav_duration(audio_path)
+                delivery_path, delivery_format = self._deliver(audio_path, encoder)
+                if delivery_path != audio_path:
+                    self.media.record(audio_path, "tts", self.wav_retention_days, duration)
+                    self.media.record(delivery_path, "tts", self.retention_days, duration)
+                else:
+                    self.media.record(audio_path, "tts", self.retention_days, duration)
+            elif encoder is not None:
+                encoder.abort()
+
+        # Serve via FastAPI static mount at /data/tts; the WAV stays the renderers' input
+        audio_url = self._media_url(audio_path)
+        delivery_url = self._media_url(delivery_path)
+
+        # Verify file generation
+        if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
+            return {
+                "id": article_id,
+                "title": title,
+                "lang": lang,
+                "voice": voice,
+                "audio_url": audio_url,
+                "audio_path": audio_path,
+                "delivery_url": delivery_url,
+                "delivery_path": delivery_path,
+                "status": "success",
+                "metadata": {
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "category": category,
+                    "format": "wav",
+                    "delivery_format": delivery_format,
+                    "delivery_bytes": os.path.getsize(delivery_path) if os.path.exists(delivery_path) else None,
+                    "sample_rate": 16000,
+                    "channels": 1,
+                    "provider": provider or "stub",
+                    "duration_seconds": duration,
+                    "cache": "hit" if cached is not None else "miss",
+                    "narration_text": narration,
+                },
+            }
+        else:
+            self.log.error("tts_generation_failed_no_file", file=audio_path)
+            return {
+                "title": title,
+                "lang": lang,
+                "voice": voice,
+                "audio_url": None,
+                "audio_path": None,
+                "status": "failed",
+                "error": "generation_failed_no_file",
+                "metadata": {
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "category": category,
+                    "narration_text": narration,
+                },
+            }
+
     def synthesize(self, scripts: List[Dict[str, Any]], category: str = "general") -> List[Dict[str, Any]]:
         run = StageLogger(source="pipeline", category=category, meta={"stage": "voice", "voice": self.voice})
         run.start("voice")
-        self._cleanup_old()
         outputs: List[Dict[str, Any]] = []
         for s in scripts:
-            title = s.get("title") or "Untitled"
-            lang = (s.get("lang") or "en").lower()
-            narration = (s.get("variants", {}).get("narration") or title)
-            tone = (s.get("tone") or "news").lower()
-            voice = self.voice_map.get(f"{lang}|{tone}", self.voice)
-            # Create deterministic file name
-            article_id = self._hash_id(title, narration)
-            fname = f"{article_id}_{lang}_{tone}.wav"
-            os.makedirs(self.output_base, exist_ok=True)
-            audio_path = os.path.join(self.output_base, fname)
-            try:
-                if self.provider == "pyttsx3" and pyttsx3:
-                    try:
-                        if pythoncom:
-                            pythoncom.CoInitialize()
-                        eng = pyttsx3.init()
-                        try:
-                            voices = eng.getProperty("voices") or []
-                            target = None
-                            if self.voice_name:
-                                for v in voices:
-                                    if self.voice_name.lower() in (v.name or "").lower():
-                                        target = v.id
-                                        break
-                            if not target:
-                                preferred = ["Zira", "Jenny", "David", "Mark", "Neural"]
-                                for name in preferred:
-                                    for v in voices:
-                                        if name.lower() in (v.name or "").lower():
-                                            target = v.id
-                                            break
-                                    if target:
-                                        break
-                            if target:
-                                eng.setProperty("voice", target)
-                        except Exception:
-                            pass
-                        eng.setProperty("rate", self.rate)
-                        eng.save_to_file(narration, audio_path)
-                        eng.runAndWait()
-                        self.log.info("tts_provider_used", provider="pyttsx3", file=audio_path)
-                    except Exception as e:
-                        self.log.warning("tts_pyttsx3_failed", error=str(e))
-                        self._write_wav(audio_path, duration_seconds=self._duration_for_text(narration), sample_rate=self.sample_rate, text=narration)
-                    finally:
-                        if pythoncom:
-                            pythoncom.CoUninitialize()
-                else:
-                    if self.provider == "pyttsx3" and not pyttsx3:
-                        self.log.warning("tts_provider_unavailable", provider="pyttsx3")
-                    self._write_wav(audio_path, duration_seconds=self._duration_for_text(narration), sample_rate=self.sample_rate, text=narration)
-            except Exception as e:
-                self.log.warning("tts_write_wav_failed", file=audio_path, error=str(e))
-            
-            # Serve via FastAPI static mount at /data/tts
-            audio_url = f"/data/tts/{fname}"
-
-            # Verify file generation
-            if os.path.exists(audio_path) and os.path.getsize(audio_path) > 0:
-                outputs.append({
-                    "id": article_id,
-                    "title": title,
-                    "lang": lang,
-                    "voice": voice,
-                    "audio_url": audio_url,
-                    "audio_path": audio_path,
-                    "status": "success",
-                    "metadata": {
-                        "generated_at": datetime.now(timezone.utc).isoformat(),
-                        "category": category,
-                        "format": "wav",
-                        "sample_rate": 16000,
-                        "channels": 1,
-                        "provider": ("pyttsx3" if (self.provider == "pyttsx3" and pyttsx3) else "stub"),
-                        "narration_text": narration,
-                    },
-                })
-            else:
-                self.log.error("tts_generation_failed_no_file", file=audio_path)
-                outputs.append({
-                    "title": title,
-                    "lang": lang,
-                    "voice": voice,
-                    "audio_url": None,
-                    "audio_path": None,
-                    "status": "failed",
-                    "error": "generation_failed_no_file",
-                    "metadata": {
-                        "generated_at": datetime.now(timezone.utc).isoformat(),
-                        "category": category,
-                        "narration_text": narration,
-                    },
-                })
-        run.complete("voice", meta={"count": len(outputs)})
+            outputs.append(self.synthesize_item(s, category=category))
+        run.complete("voice", meta={"count": len(outputs), "cache": self.cache.stats()})
         run.end_run("completed")
-        self.log.info("tts_generated", count=len(outputs))
+        self.log.info("tts_generated", count=len(outputs), cache=self.cache.stats())
         return outputs
@@ -0,0 +1,205 @@
+import os
+import sys
+import shutil
+import subprocess
+import wave
+import warnings
+from array import array
+from typing import List, Optional, Tuple
+
+from .logging_utils import PipelineLogger
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # type: ignore
+except ImportError:  # removed in Python 3.13
+    audioop = None
+
+# (channels, sample width in bytes, frame rate)
+PcmLayout = Tuple[int, int, int]
+
+
+# codec -> (file extension, ffmpeg encoder args)
+CODECS = {
+    "opus": (".ogg", ["-c:a", "libopus", "-application", "voip"]),
+    "flac": (".flac", ["-c:a", "flac", "-compression_level", "8"]),
+}
+
+
+def audio_codec() -> str:
+    """Delivery codec for narration audio: `wav` (default), `opus` or `flac` (TTS_AUDIO_CODEC)."""
+    codec = (os.getenv("TTS_AUDIO_CODEC") or "wav").lower()
+    return codec if codec in CODECS else "wav"
+
+
+def delivery_ext(codec: str) -> str:
+    if codec == "opus" and (os.getenv("TTS_OPUS_CONTAINER") or "ogg").lower() == "webm":
+        return ".webm"
+    return CODECS[codec][0] if codec in CODECS else ".wav"
+
+
+def _ffmpeg() -> Optional[str]:
+    return shutil.which("ffmpeg") or shutil.which("ffmpeg.exe")
+
+
+def _encoder_args(codec: str) -> List[str]:
+    args = list(CODECS[codec][1])
+    if codec == "opus":
+        # 32 kbit/s mono Opus is transparent for speech and ~20x smaller than 44.1 kHz PCM
+        args += ["-b:a", os.getenv("TTS_OPUS_BITRATE", "32k")]
+    return args
+
+
+def _tmp_path(out_path: str) -> str:
+    # Keep the real extension last so ffmpeg picks the container from it
+    base, ext = os.path.splitext(out_path)
+    return f"{base}.tmp{ext}"
+
+
+class StreamEncoder:
+    """Encodes 16-bit mono PCM with ffmpeg while it is being synthesized.
+
+    `write()` feeds chunks to ffmpeg's stdin as they are produced, so the
+    compressed file is finished when synthesis is. Output goes to a temp
+    file that replaces `out_path` only on success. Use `open()`, which
+    returns None when ffmpeg is not installed.
+    """
+
+    def __init__(self, proc: subprocess.Popen, out_path: str, tmp_path: str):
+        self.proc = proc
+        self.out_path = out_path
+        self.tmp_path = tmp_path
+        self.failed = False
+
+    @classmethod
+    def open(cls, out_path: str, codec: str, sample_rate: int) -> Optional["StreamEncoder"]:
+        exe = _ffmpeg()
+        if not exe or codec not in CODECS:
+            return None
+        tmp_path = _tmp_path(out_path)
+        cmd = [exe, "-y", "-loglevel", "error", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+               *_encoder_args(codec), tmp_path]
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError:
+            return None
+        return cls(proc, out_path, tmp_path)
+
+    def write(self, pcm: bytes) -> None:
+        if self.failed:
+            return
+        try:
+            self.proc.stdin.write(pcm)
+        except (BrokenPipeError, OSError, ValueError):
+            self.failed = True
+
+    def close(self, logger: Optional[PipelineLogger] = None) -> bool:
+        """Finish encoding; True when `out_path` now holds the encoded audio."""
+        err = b""
+        try:
+            # communicate() flushes and closes stdin, which ends ffmpeg's input
+            _, err = self.proc.communicate(timeout=120)
+        except (BrokenPipeError, OSError, ValueError):
+            self.failed = True
+            self.proc.wait()
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            _, err = self.proc.communicate()
+            self.failed = True
+        ok = not self.failed and self.proc.returncode == 0 and os.path.isfile(self.tmp_path)
+        if ok:
+            os.replace(self.tmp_path, self.out_path)
+        else:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+            if logger:
+                logger.warning("tts_encode_failed", file=self.out_path, returncode=self.proc.returncode,
+                               error=(err or b"").decode("utf-8", "ignore")[-300:])
+        return ok
+
+    def abort(self) -> None:
+        self.failed = True
+        self.close()
+
+
+def encode_file(wav_path: str, out_path: str, codec: str, logger: Optional[PipelineLogger] = None) -> bool:
+    """Encode an existing WAV (e.g. written by pyttsx3) to `out_path`."""
+    exe = _ffmpeg()
+    if not exe or codec not in CODECS or not os.path.isfile(wav_path):
+        return False
+    tmp_path = _tmp_path(out_path)
+    cmd = [exe, "-y", "-loglevel", "error", "-i", wav_path, "-ac", "1", *_encoder_args(codec), tmp_path]
+    try:
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=300)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        if logger:
+            logger.warning("tts_encode_failed", file=out_path, error=str(e))
+        return False
+    if res.returncode == 0 and os.path.isfile(tmp_path):
+        os.replace(tmp_path, out_path)
+        return True
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    if logger:
+        logger.warning("tts_encode_failed", file=out_path, returncode=res.returncode,
+                       error=(res.stderr or b"").decode("utf-8", "ignore")[-300:])
+    return False
+
+
+def read_pcm(path: str) -> Tuple[PcmLayout, bytes]:
+    with wave.open(path, "rb") as wf:
+        return (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()), wf.readframes(wf.getnframes())
+
+
+def convert_pcm(frames: bytes, src: PcmLayout, dst: PcmLayout) -> Optional[bytes]:
+    """Convert PCM between layouts; None when it cannot (no audioop, >2 channels)."""
+    if src == dst:
+        return frames
+    if audioop is None:
+        return None
+    ch, sw, rate = src
+    if sw != dst[1]:
+        frames, sw = audioop.lin2lin(frames, sw, dst[1]), dst[1]
+    if ch == 2 and dst[0] == 1:
+        frames, ch = audioop.tomono(frames, sw, 0.5, 0.5), 1
+    elif ch == 1 and dst[0] == 2:
+        frames, ch = audioop.tostereo(frames, sw, 1, 1), 2
+    if ch != dst[0]:
+        return None
+    if rate != dst[2]:
+        frames = audioop.ratecv(frames, sw, ch, rate, dst[2], None)[0]
+    return frames
+
+
+def join_pcm(segments: List[bytes], layout: PcmLayout, crossfade_frames: int) -> bytes:
+    """Concatenate PCM segments, overlapping neighbours with a linear crossfade.
+
+    Only the overlap is touched sample by sample, so joining costs
+    O(crossfade) per seam. 16-bit audio only; other widths are concatenated.
+    """
+    channels, sampwidth, _ = layout
+    if sampwidth != 2 or crossfade_frames <= 0:
+        return b"".join(segments)
+    frame_bytes = channels * sampwidth
+    out = bytearray()
+    for seg in segments:
+        if not seg:
+            continue
+        n = min(crossfade_frames, len(out) // frame_bytes, len(seg) // frame_bytes)
+        if n <= 0:
+            out += seg
+            continue
+        tail = array("h", bytes(out[-n * frame_bytes:]))
+        head = array("h", seg[: n * frame_bytes])
+        if sys.byteorder == "big":
+            tail.byteswap()
+            head.byteswap()
+        for i in range(n * channels):
+            w = (i // channels + 1) / (n + 1)
+            tail[i] = int(max(-32768, min(32767, tail[i] * (1.0 - w) + head[i] * w)))
+        if sys.byteorder == "big":
+            tail.byteswap()
+        out[-n * frame_bytes:] = tail.tobytes()
+        out += seg[n * frame_bytes:]
+    return bytes(out)
@@ -0,0 +1,166 @@
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .logging_utils import PipelineLogger
+
+
+def autoscale_enabled() -> bool:
+    return os.getenv("ORCH_AUTOSCALE", "0").lower() in ("1", "true", "yes")
+
+
+def parse_bounds(raw: Optional[str]) -> Dict[str, Tuple[int, int]]:
+    """Parse `HI-NEWS=1:4,EN-KIDS=1:1` into `{bucket: (min, max)}`."""
+    out: Dict[str, Tuple[int, int]] = {}
+    for part in (raw or "").split(","):
+        if "=" not in part or ":" not in part:
+            continue
+        k, v = part.split("=", 1)
+        lo, hi = v.split(":", 1)
+        try:
+            lo_i, hi_i = max(1, int(lo)), max(1, int(hi))
+        except ValueError:
+            continue
+        out[k.strip()] = (min(lo_i, hi_i), hi_i)
+    return out
+
+
+def allocate(
+    budget: int,
+    backlog: Dict[str, int],
+    latency: Dict[str, float],
+    bounds: Dict[str, Tuple[int, int]],
+    order: List[str],
+) -> Dict[str, int]:
+    """Split `budget` worker slots across buckets as per-bucket caps.
+
+    Caps are upper bounds on concurrency, not reservations, so every bucket
+    keeps at least one (or its minimum) and nothing is starved. The slots of
+    the budget not taken by busy buckets' base caps go one at a time to the
+    bucket with the most estimated work per slot (backlog x per-item
+    latency), never above its maximum or its backlog.
+    """
+    names = list(order) + sorted(b for b in set(backlog) | set(bounds) if b not in order)
+    known = [v for v in latency.values() if v > 0]
+    default_latency = sum(known) / len(known) if known else 1.0
+
+    def _bounds(b: str) -> Tuple[int, int]:
+        lo, hi = bounds.get(b, (1, budget))
+        hi = max(1, hi)
+        return max(1, min(lo, hi)), hi
+
+    caps = {b: _bounds(b)[0] for b in names}
+    active = [b for b in names if backlog.get(b, 0) > 0]
+    remaining = budget - sum(caps[b] for b in active)
+    demand = {b: backlog.get(b, 0) * (latency.get(b) or default_latency) for b in active}
+    while remaining > 0:
+        candidates = [b for b in active if caps[b] < _bounds(b)[1] and caps[b] < backlog.get(b, 0)]
+        if not candidates:
+            break
+        best = max(candidates, key=lambda b: (demand[b] / caps[b], -names.index(b)))
+        caps[best] += 1
+        remaining -= 1
+    return caps
+
+
+class _Target:
+    def __init__(self, name: str, budget: int, backlog_fn: Callable[[], Dict[str, int]],
+                 apply_fn: Callable[[Dict[str, int]], None]):
+        self.name = name
+        self.budget = max(1, int(budget))
+        self.backlog_fn = backlog_fn
+        self.apply_fn = apply_fn
+        self.latency: Dict[str, float] = {}
+        self.caps: Dict[str, int] = {}
+
+
+class Autoscaler:
+    """Reallocates per-bucket concurrency caps from backlog and latency.
+
+    Each target (the shards scheduler, or one pipelined stage) has a worker
+    budget, a backlog source and a cap setter. Every ORCH_AUTOSCALE_INTERVAL
+    seconds (default 2) the budget is re-split with `allocate()` within
+    ORCH_AUTOSCALE_BOUNDS (`bucket=min:max`, default `1:budget`). Per-item
+    latency is an EWMA fed by `observe()`. Cap changes are logged as
+    `autoscale_decision`.
+    """
+
+    def __init__(
+        self,
+        order: List[str],
+        bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+        interval: Optional[float] = None,
+        logger: Optional[PipelineLogger] = None,
+    ):
+        self.order = list(order)
+        self.bounds = dict(bounds if bounds is not None else parse_bounds(os.getenv("ORCH_AUTOSCALE_BOUNDS")))
+        self.interval = float(interval or os.getenv("ORCH_AUTOSCALE_INTERVAL", "2"))
+        self.log = logger or PipelineLogger(component="autoscaler")
+        self._targets: Dict[str, _Target] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.decisions = 0
+
+    def add_target(self, name: str, budget: int, backlog_fn: Callable[[], Dict[str, int]],
+                   apply_fn: Callable[[Dict[str, int]], None]) -> None:
+        with self._lock:
+            self._targets[name] = _Target(name, budget, backlog_fn, apply_fn)
+
+    def observe(self, target: str, bucket: str, seconds: float) -> None:
+        """Record one item's processing time for `bucket` in `target`."""
+        with self._lock:
+            t = self._targets.get(target)
+            if t is None:
+                return
+            prev = t.latency.get(bucket)
+            t.latency[bucket] = seconds if prev is None else 0.7 * prev + 0.3 * seconds
+
+    def tick(self) -> Dict[str, Dict[str, int]]:
+        """Recompute and apply caps for every target; returns the new caps."""
+        with self._lock:
+            targets = list(self._targets.values())
+        out: Dict[str, Dict[str, int]] = {}
+        for t in targets:
+            try:
+                backlog = t.backlog_fn()
+            except Exception as e:
+                self.log.warning("autoscale_backlog_failed", target=t.name, error=str(e))
+                continue
+            with self._lock:
+                latency = dict(t.latency)
+            caps = allocate(t.budget, backlog, latency, self.bounds, self.order)
+            out[t.name] = caps
+            if caps == t.caps:
+                continue
+            t.apply_fn(caps)
+            self.decisions += 1
+            self.log.info(
+                "autoscale_decision",
+                target=t.name,
+                budget=t.budget,
+                caps=caps,
+                previous=t.caps,
+                backlog={b: n for b, n in backlog.items() if n},
+                latency_ms={b: int(s * 1000) for b, s in latency.items()},
+            )
+            t.caps = caps
+        return out
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.tick()
+
+    def start(self) -> "Autoscaler":
+        self.tick()
+        self._thread = threading.Thread(target=self._loop, name="autoscaler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, object]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            caps = {t.name: dict(t.caps) for t in self._targets.values()}
+        return {"decisions": self.decisions, "caps": caps, "interval": self.interval}
@@ -1,15 +1,24 @@
 import os
 import json
-import math
 import time
-from typing import Any, Dict, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import random
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
-from .agents.script_gen_agent import ScriptGenAgent
-from .agents.tts_agent_stub import TTSAgentStub
-from .agents.avatar_agent_stub import AvatarAgentStub
 from .logging_utils import StageLogger, PipelineLogger
 from .trace_utils import TraceLogger
+from .stage_executor import PipelinedExecutor, StageSpec
+from .bucket_scheduler import BucketScheduler
+from .streaming import JsonArraySink, iter_json_items
+from .memory_stats import MemoryMonitor
+from .run_state import RunStateStore, incremental_enabled
+from .priority import DeadlinePolicy, EngagementLookup, PriorityScorer, priority_of
+from .stage_backends import StageBackends
+from .autoscaler import Autoscaler, autoscale_enabled
+from .speculation import Speculator, speculation_enabled
+from .agents.avatar_agent_stub import discard_attempt, promote_attempt
 
 
 # Routing configuration (from user specification)
@@ -49,17 +58,6 @@ def _data_root() -> str:
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "data"))
 
 
-def _read_json_list(path: str) -> List[Dict[str, Any]]:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, list):
-            return data
-        return data.get("items") or []
-    except Exception:
-        return []
-
-
 def _write_json(path: str, payload: Any) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
@@ -86,168 +84,671 @@ def _route_bucket(lang: str, tone: str) -> str:
     return ROUTING_TABLE.get(key, DEFAULT_BUCKET)
 
 
-def _split_into_shards(items: List[Dict[str, Any]], shards: int) -> List[List[Dict[str, Any]]]:
-    if shards <= 1 or len(items) == 0:
-        return [items]
-    chunk = max(1, math.ceil(len(items) / shards))
-    return [items[i : i + chunk] for i in range(0, len(items), chunk)]
+def _voice_for_bucket(bucket: str) -> str:
+    # Simple voice routing by bucket family
+    if bucket.startswith("HI-"):
+        return "hi-IN-AaravNeural"
+    if bucket.startswith("TA-"):
+        return "ta-IN-PriyaNeural"
+    if bucket.startswith("BN-"):
+        return "bn-IN-NabanitaNeural"
+    if bucket.startswith("EN-KIDS"):
+        return "en-US-Kids-1"
+    return "en-US-Neural-1"
+
+
+def _style_for_bucket(bucket: str) -> str:
+    if bucket.endswith("NEWS"):
+        return "news-anchor"
+    return "youth-vlogger" if bucket.endswith("YOUTH") else "kids-host"
+
+
+def _script_ok(s: Any) -> bool:
+    return isinstance(s, dict) and (s.get("stage_status") or {}).get("script") != "failed"
+
+
+def _voice_ok(v: Any) -> bool:
+    return isinstance(v, dict) and v.get("status") == "success" and bool(v.get("audio_path"))
+
+
+def _avatar_ok(a: Any) -> bool:
+    return isinstance(a, dict) and a.get("status") != "cancelled"
+
+
+_CARRIED_KEYS = ("priority_score", "trend_score", "dedup_key", "admitted_at")
+
+
+def _carry_scores(src: Dict[str, Any], out: Any) -> Any:
+    # TTS/avatar outputs are new dicts; keep scheduling fields for later stages
+    if isinstance(out, dict):
+        for k in _CARRIED_KEYS:
+            if k in src and k not in out:
+                out[k] = src[k]
+    return out
+
+
+def _backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # Full jitter keeps retries of many failing items from synchronizing
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+def _prepend(first: Dict[str, Any], rest: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield first
+    yield from rest
+
+
+def _merge_bucket_result(by_bucket: Dict[str, Dict[str, Any]], res: Dict[str, Any]) -> None:
+    """Fold one batch result into its bucket's running totals."""
+    b = res["bucket"]
+    agg = by_bucket.setdefault(b, {"bucket": b, "counts": {}, "failed": {}, "files": {}, "batch_status": {}})
+    for key in ("counts", "failed"):
+        for k, v in (res.get(key) or {}).items():
+            agg[key][k] = agg[key].get(k, 0) + int(v or 0)
+    agg["files"].update(res.get("files") or {})
+    status = res.get("status") or "failed"
+    agg["batch_status"][status] = agg["batch_status"].get(status, 0) + 1
+    if res.get("error") and "error" not in agg:
+        agg["error"] = res["error"]
+
+
+def _finish_bucket_result(agg: Dict[str, Any]) -> Dict[str, Any]:
+    seen = agg["batch_status"]
+    if set(seen) == {"success"}:
+        agg["status"] = "success"
+    elif set(seen) == {"failed"}:
+        agg["status"] = "failed"
+    else:
+        agg["status"] = "degraded"
+    return agg
+
+
+def _parse_stage_workers(raw: Optional[str], defaults: Dict[str, int]) -> Dict[str, int]:
+    """Parse `scripts=2,voice=4,avatar=2` style overrides."""
+    out = dict(defaults)
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.split("=", 1)
+        try:
+            out[k.strip()] = max(1, int(v))
+        except ValueError:
+            continue
+    return out
+
+
+DEFAULT_BUCKET_CAPS: Dict[str, int] = {
+    "EN-NEWS": 2,
+    "HI-NEWS": 1,
+    "HI-YOUTH": 1,
+    "EN-KIDS": 1,
+    "TA-NEWS": 1,
+    "BN-NEWS": 1,
+}
+
+
+def max_workers_from_env() -> int:
+    """Global worker budget: ORCH_MAX_WORKERS, default min(4, cores)."""
+    return int(os.getenv("ORCH_MAX_WORKERS") or min(4, os.cpu_count() or 4))
+
+
+def bucket_caps_from_env() -> Dict[str, int]:
+    """Per-bucket concurrency caps with ORCH_BUCKET_CAPS overrides."""
+    return _parse_stage_workers(os.getenv("ORCH_BUCKET_CAPS"), DEFAULT_BUCKET_CAPS)
+
+
+def stage_workers_from_env() -> Dict[str, int]:
+    """Pipelined-mode pool sizes with ORCH_STAGE_WORKERS overrides."""
+    cores = os.cpu_count() or 4
+    return _parse_stage_workers(os.getenv("ORCH_STAGE_WORKERS"), {"scripts": 2, "voice": min(4, cores), "avatar": 2})
 
 
 class BucketOrchestrator:
-    def __init__(self, registry: str = "single", category: str = "general"):
+    def __init__(
+        self,
+        registry: str = "single",
+        category: str = "general",
+        mode: Optional[str] = None,
+        incremental: Optional[bool] = None,
+        engagement_lookup: Optional[EngagementLookup] = None,
+    ):
         self.registry = registry
         self.category = category
-        cores = os.cpu_count() or 4
-        self.max_global_workers = min(4, cores)
-        self.per_bucket_max = {
-            "EN-NEWS": 2,
-            "HI-NEWS": 1,
-            "HI-YOUTH": 1,
-            "EN-KIDS": 1,
-            "TA-NEWS": 1,
-            "BN-NEWS": 1,
-        }
+        self.max_global_workers = max_workers_from_env()
+        # Static caps; with autoscaling they are only the starting point
+        self.per_bucket_max = bucket_caps_from_env()
+        # Opt-in: reallocate the worker budget across buckets from backlog and latency (ORCH_AUTOSCALE=1)
+        self.autoscale = autoscale_enabled()
+        self.autoscaler: Optional[Autoscaler] = None
+        # "shards" runs script→voice→avatar per shard; "pipelined" overlaps stages per item
+        self.mode = (mode or os.getenv("ORCH_MODE") or "shards").lower()
+        self.stage_workers = stage_workers_from_env()
+        self.stage_queue_size = int(os.getenv("ORCH_STAGE_QUEUE_SIZE", "16"))
+        # Items per batch pulled by a shards-mode worker from the scheduler
+        self.batch_size = max(1, int(os.getenv("ORCH_BATCH_SIZE", "2")))
+        # Per-item retry budget (retries after the first attempt) and backoff bounds
+        self.item_retries = max(0, int(os.getenv("ORCH_ITEM_RETRIES", "2")))
+        self.retry_base_seconds = float(os.getenv("ORCH_RETRY_BASE_SECONDS", "0.5"))
+        self.retry_max_seconds = float(os.getenv("ORCH_RETRY_MAX_SECONDS", "8"))
+        self._sinks: Optional[Dict[Tuple[str, str], JsonArraySink]] = None
+        self._sinks_lock = threading.Lock()
         self.log = PipelineLogger(component="bucket_orchestrator")
         self.stage_logger = StageLogger(source="pipeline", category=category, meta={"registry": registry})
         self.traces = TraceLogger(retention_days=7)
+        # Incremental mode: skip stages already done for unchanged inputs (PIPELINE_INCREMENTAL)
+        if incremental is None:
+            incremental = incremental_enabled()
+        self.run_state: Optional[RunStateStore] = RunStateStore(logger=self.log) if incremental else None
+        self.skipped: Dict[str, int] = {}
+        # Optional per-bucket freshness deadlines (ORCH_BUCKET_DEADLINES)
+        self.deadlines = DeadlinePolicy()
+        # Engagement aggregates for priority scoring (e.g. server.db.get_engagement_stats)
+        self.engagement_lookup = engagement_lookup
+        self.degraded = 0
+        # Where each stage's per-item work runs: threads, processes or inline (ORCH_STAGE_BACKENDS)
+        self.backends = StageBackends()
+        self.avatar_provider = (os.getenv("AVATAR_PROVIDER") or "ffmpeg").lower()
+        # Opt-in: race a duplicate render against stragglers (ORCH_SPECULATIVE=1); the inline backend serializes, so skip it there
+        self.speculator: Optional[Speculator] = None
+        self.speculative_provider = (os.getenv("ORCH_SPECULATIVE_PROVIDER") or "").lower() or None
+        # The SadTalker server renders one job at a time, so a same-provider duplicate only queues behind the straggler
+        same_server = (
+            self.avatar_provider == "local"
+            and bool(os.getenv("SADTALKER_SERVER_URL"))
+            and self.speculative_provider in (None, "local")
+        )
+        if speculation_enabled() and self.backends.backends.get("avatar") != "inline" and not same_server:
+            self.speculator = Speculator("avatar", logger=self.log)
+        # Items admitted but not finished; input is read and scored one window at a time
+        self.max_inflight = max(1, int(os.getenv("ORCH_MAX_INFLIGHT", "128")))
+        self._inflight_fn: Optional[Callable[[], int]] = None
 
     def _write_stage_outputs(self, bucket: str, suffix: str, payload: Any) -> str:
         root = _output_root()
         os.makedirs(root, exist_ok=True)
         path = os.path.join(root, f"{self.registry}_{bucket}_{suffix}.json")
-        _write_json(path, payload)
+        if self._sinks is None:
+            _write_json(path, payload)
+            return path
+        # Several batches of one bucket append to the same per-bucket file
+        with self._sinks_lock:
+            sink = self._sinks.get((bucket, suffix))
+            if sink is None:
+                sink = self._sinks[(bucket, suffix)] = JsonArraySink(path)
+        for it in payload if isinstance(payload, list) else [payload]:
+            sink.write(it)
         return path
 
-    def _retry(self, fn, stage: str, payload: Dict[str, Any]):
-        delay = 1.0
-        for attempt in range(3):
+    def _retry(self, fn, stage: str, payload: Dict[str, Any], ok: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Run one item through `fn` with its own retry budget.
+
+        Retries use exponential backoff with full jitter (ORCH_RETRY_BASE_SECONDS,
+        capped at ORCH_RETRY_MAX_SECONDS). An item that exhausts its budget is
+        dead-lettered on its own and None is returned, so the rest of the batch
+        is unaffected.
+        """
+        attempts = self.item_retries + 1
+        error_type, error_message = "", ""
+        for attempt in range(attempts):
             try:
-                return fn()
+                out = fn()
+                if ok is None or ok(out):
+                    return out
+                error_type = "ItemFailed"
+                error_message = str((out or {}).get("error") or "status=failed")
             except Exception as e:
-                if attempt == 2:
-                    _record_dead_letter(stage, type(e).__name__, str(e), payload)
-                    raise
-                time.sleep(delay)
-                delay *= 2
+                error_type, error_message = type(e).__name__, str(e)
+            if attempt + 1 < attempts:
+                time.sleep(_backoff_delay(attempt, self.retry_base_seconds, self.retry_max_seconds))
+        _record_dead_letter(stage, error_type, error_message, {**payload, "attempts": attempts})
+        self.log.warning("item_dead_lettered", stage=stage, bucket=payload.get("bucket"), error=error_message, attempts=attempts)
+        return None
+
+    def _run_one(
+        self,
+        stage: str,
+        bucket: str,
+        it: Dict[str, Any],
+        fn: Callable[[Dict[str, Any]], Any],
+        ok: Optional[Callable[[Any], bool]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Run one item through a stage with retries; reuse stored output when incremental."""
+        payload = {"bucket": bucket, "id": it.get("id"), "title": it.get("title"), "item": it}
+
+        def _attempt(x: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            return self._retry(lambda: fn(x), stage, payload, ok)
+
+        if self.run_state is None:
+            return _attempt(it)
+        out, skipped = self.run_state.run_item(stage, it, _attempt, params, ok=lambda o: o is not None)
+        if skipped:
+            with self._sinks_lock:
+                self.skipped[stage] = self.skipped.get(stage, 0) + 1
+        return out
+
+    def _run_items(
+        self,
+        stage: str,
+        bucket: str,
+        items: List[Dict[str, Any]],
+        fn: Callable[[Dict[str, Any]], Any],
+        ok: Optional[Callable[[Any], bool]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Apply `fn` per item; returns (successful outputs, failed count)."""
+        outputs: List[Dict[str, Any]] = []
+        failed = 0
+        for it in items:
+            out = self._run_one(stage, bucket, it, fn, ok, params)
+            if out is None:
+                failed += 1
+            else:
+                outputs.append(out)
+        return outputs, failed
+
+    def _observe(self, target: str, bucket: str, seconds: float) -> None:
+        if self.autoscaler:
+            self.autoscaler.observe(target, bucket, seconds)
+
+    def _stop_autoscaler(self) -> Optional[Dict[str, Any]]:
+        scaler, self.autoscaler = self.autoscaler, None
+        return scaler.stop() if scaler else None
+
+    def _generate(self, it: Dict[str, Any]) -> Dict[str, Any]:
+        return self.backends.call("scripts", {}, it, self.category)
+
+    def _synthesize(self, voice: str, s: Dict[str, Any]) -> Dict[str, Any]:
+        return _carry_scores(s, self.backends.call("voice", {"voice": voice}, s, self.category))
+
+    def _render(self, bucket: str, style: str, v: Dict[str, Any]) -> Dict[str, Any]:
+        """Render one item; fall back to a static render if it would miss its deadline."""
+        if self.deadlines.enabled and self.avatar_provider != "ffmpeg" and self.deadlines.should_degrade(bucket, v):
+            out = _carry_scores(v, self.backends.call("avatar", {"style": style, "provider": "ffmpeg"}, v, self.category))
+            out["stage_status"] = {**(out.get("stage_status") or {}), "avatar": "degraded"}
+            out["degraded_reason"] = "deadline"
+            self.log.warning("avatar_deadline_degraded", bucket=bucket, title=v.get("title"), status="degraded",
+                             estimate_seconds=round(self.deadlines.estimate(bucket), 2))
+            with self._sinks_lock:
+                self.degraded += 1
+            return out
+        started = time.time()
+        if self.speculator is None:
+            out = self.backends.call("avatar", {"style": style}, v, self.category)
+        else:
+            out = self._render_speculative(bucket, style, v)
+        elapsed = time.time() - started
+        self.deadlines.observe(bucket, elapsed)
+        if self.speculator is not None:
+            self.speculator.latency.observe(elapsed)
+        return _carry_scores(v, out)
+
+    def _render_speculative(self, bucket: str, style: str, v: Dict[str, Any]) -> Dict[str, Any]:
+        """Render with a speculative duplicate if the first attempt straggles.
+
+        The duplicate uses ORCH_SPECULATIVE_PROVIDER when set (e.g. a cheaper
+        `ffmpeg` render); if that one wins the item is marked degraded.
+        """
+        fallback = self.speculative_provider
+        fallback = fallback if fallback and fallback != self.avatar_provider else None
+
+        def _primary(cancel: threading.Event, tag: str) -> Dict[str, Any]:
+            return self.backends.call("avatar", {"style": style, "attempt": tag}, v, self.category, cancel=cancel)
+
+        def _backup(cancel: threading.Event, tag: str) -> Dict[str, Any]:
+            cfg = {"style": style, "attempt": tag}
+            if fallback:
+                cfg["provider"] = fallback
+            out = self.backends.call("avatar", cfg, v, self.category, cancel=cancel)
+            if fallback and isinstance(out, dict) and out.get("status") != "cancelled":
+                out["stage_status"] = {**(out.get("stage_status") or {}), "avatar": "degraded"}
+                out["degraded_reason"] = "straggler"
+            return out
+
+        out = self.speculator.run(_primary, _backup, ok=_avatar_ok, label={"bucket": bucket, "title": v.get("title")},
+                                  discard=discard_attempt)
+        # Attempts render to temp files; only the winner's are moved into place
+        out = promote_attempt(out)
+        if isinstance(out, dict) and out.get("degraded_reason") == "straggler":
+            with self._sinks_lock:
+                self.degraded += 1
+        return out
 
     def _process_bucket(self, bucket: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        failed: Dict[str, int] = {}
+
         # Generate scripts
         self.stage_logger.start("summarize")
-        agent_scripts = ScriptGenAgent(logger=self.log)
         self.traces.log("ScriptGenAgent", input_payload={"bucket": bucket, "items_count": len(items)}, status="running")
-        scripts = self._retry(
-            lambda: agent_scripts.generate(items, category=self.category),
-            "scripts",
-            {"bucket": bucket, "count": len(items)},
-        )
+        scripts, failed["scripts"] = self._run_items("scripts", bucket, items, self._generate, ok=_script_ok)
         scripts_path = self._write_stage_outputs(bucket, "scripts", scripts)
-        self.stage_logger.complete("summarize", meta={"bucket": bucket, "count": len(scripts), "file": scripts_path})
+        self.stage_logger.complete("summarize", meta={"bucket": bucket, "count": len(scripts), "failed": failed["scripts"], "file": scripts_path})
         self.traces.log("ScriptGenAgent", input_payload={"bucket": bucket}, output_payload={"scripts_count": len(scripts), "file": scripts_path}, status="success")
 
         # Synthesize voice
         self.stage_logger.start("voice")
-        # Simple voice routing by bucket family
-        if bucket.startswith("HI-"):
-            voice = "hi-IN-AaravNeural"
-        elif bucket.startswith("TA-"):
-            voice = "ta-IN-PriyaNeural"
-        elif bucket.startswith("BN-"):
-            voice = "bn-IN-NabanitaNeural"
-        elif bucket.startswith("EN-KIDS"):
-            voice = "en-US-Kids-1"
-        else:
-            voice = "en-US-Neural-1"
-        agent_tts = TTSAgentStub(voice=voice, logger=self.log)
+        voice = _voice_for_bucket(bucket)
         self.traces.log("TTSAgent", input_payload={"bucket": bucket, "voice": voice, "scripts_count": len(scripts)}, status="running")
-        voice_items = self._retry(
-            lambda: agent_tts.synthesize(scripts, category=self.category),
+        voice_items, failed["voice"] = self._run_items(
             "voice",
-            {"bucket": bucket, "count": len(scripts)},
+            bucket,
+            scripts,
+            lambda s: self._synthesize(voice, s),
+            ok=_voice_ok,
+            params={"voice": voice, "category": self.category},
         )
         voice_path = self._write_stage_outputs(bucket, "voice", voice_items)
-        self.stage_logger.complete("voice", meta={"bucket": bucket, "count": len(voice_items), "file": voice_path})
+        self.stage_logger.complete("voice", meta={"bucket": bucket, "count": len(voice_items), "failed": failed["voice"], "file": voice_path})
         self.traces.log("TTSAgent", input_payload={"bucket": bucket}, output_payload={"voice_count": len(voice_items), "file": voice_path}, status="success")
 
-        # Filter valid voice items for avatar rendering
-        valid_voice_items = [v for v in voice_items if v.get("stage_status", {}).get("voice") == "success" and v.get("audio_path")]
-
-        # Render avatar
+        # Render avatar (only items whose voice succeeded reach this point)
         self.stage_logger.start("avatar")
-        style = (
-            "news-anchor"
-            if bucket.endswith("NEWS")
-            else ("youth-vlogger" if bucket.endswith("YOUTH") else "kids-host")
-        )
-        agent_avatar = AvatarAgentStub(style=style, logger=self.log)
-        self.traces.log("AvatarAgent", input_payload={"bucket": bucket, "style": style, "voice_count": len(valid_voice_items)}, status="running")
-        videos = self._retry(
-            lambda: agent_avatar.render(valid_voice_items, category=self.category),
+        style = _style_for_bucket(bucket)
+        self.traces.log("AvatarAgent", input_payload={"bucket": bucket, "style": style, "voice_count": len(voice_items)}, status="running")
+        videos, failed["avatar"] = self._run_items(
             "avatar",
-            {"bucket": bucket, "count": len(valid_voice_items)},
+            bucket,
+            voice_items,
+            lambda v: self._render(bucket, style, v),
+            params={"style": style, "category": self.category},
         )
         avatar_path = self._write_stage_outputs(bucket, "avatar", videos)
-        self.stage_logger.complete("avatar", meta={"bucket": bucket, "count": len(videos), "file": avatar_path})
+        self.stage_logger.complete("avatar", meta={"bucket": bucket, "count": len(videos), "failed": failed["avatar"], "file": avatar_path})
         self.traces.log("AvatarAgent", input_payload={"bucket": bucket}, output_payload={"videos_count": len(videos), "file": avatar_path}, status="success")
 
+        n_failed = sum(failed.values())
+        if n_failed and not videos:
+            status = "failed"
+        elif n_failed:
+            status = "degraded"
+        else:
+            status = "success"
         return {
             "bucket": bucket,
+            "status": status,
             "counts": {"items": len(items), "scripts": len(scripts), "voice": len(voice_items), "avatar": len(videos)},
+            "failed": failed,
             "files": {"scripts": scripts_path, "voice": voice_path, "avatar": avatar_path},
         }
 
+    def run_pipelined(self, routed: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run script → voice → avatar as overlapping stages with per-stage pools.
+
+        Bucket limits (`per_bucket_max`) become per-stage concurrency caps
+        (reallocated per stage by the autoscaler when enabled), and each item
+        moves on as soon as its current stage finishes. `routed`
+        yields `(bucket, item)` and is consumed only as fast as the in-flight
+        window (ORCH_MAX_INFLIGHT) drains.
+        """
+        sinks: Dict[Tuple[str, str], JsonArraySink] = {}
+        sinks_lock = threading.Lock()
+
+        def _sink(bucket: str, suffix: str, item: Dict[str, Any]) -> None:
+            key = (bucket, suffix)
+            with sinks_lock:
+                if key not in sinks:
+                    path = os.path.join(_output_root(), f"{self.registry}_{bucket}_{suffix}.json")
+                    sinks[key] = JsonArraySink(path)
+            sinks[key].write(item)
+
+        def _scripts(bucket: str, it: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            out = self._run_one("scripts", bucket, it, self._generate, ok=_script_ok)
+            if out is not None:
+                _sink(bucket, "scripts", out)
+            return out
+
+        def _voice(bucket: str, s: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            voice = _voice_for_bucket(bucket)
+            out = self._run_one(
+                "voice",
+                bucket,
+                s,
+                lambda x: self._synthesize(voice, x),
+                ok=_voice_ok,
+                params={"voice": voice, "category": self.category},
+            )
+            if out is not None:
+                _sink(bucket, "voice", out)
+            return out
+
+        def _avatar(bucket: str, v: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            style = _style_for_bucket(bucket)
+            out = self._run_one(
+                "avatar",
+                bucket,
+                v,
+                lambda x: self._render(bucket, style, x),
+                params={"style": style, "category": self.category},
+            )
+            if out is not None:
+                _sink(bucket, "avatar", out)
+            return out
+
+        def _timed(stage: str, fn: Callable[[str, Dict[str, Any]], Any]) -> Callable[[str, Dict[str, Any]], Any]:
+            def _wrapped(bucket: str, it: Dict[str, Any]) -> Any:
+                started = time.time()
+                try:
+                    return fn(bucket, it)
+                finally:
+                    self._observe(stage, bucket, time.time() - started)
+            return _wrapped
+
+        caps = dict(self.per_bucket_max)
+        stages = [
+            StageSpec("scripts", _timed("scripts", _scripts), self.stage_workers.get("scripts", 1), self.stage_queue_size, caps),
+            StageSpec("voice", _timed("voice", _voice), self.stage_workers.get("voice", 1), self.stage_queue_size, caps),
+            StageSpec("avatar", _timed("avatar", _avatar), self.stage_workers.get("avatar", 1), self.stage_queue_size, caps),
+        ]
+        # Highest priority_score first across buckets, so breaking stories reach video first
+        executor = PipelinedExecutor(stages, order=PRIORITY_ORDER, logger=self.log, priority=priority_of,
+                                     max_inflight=self.max_inflight)
+        self._inflight_fn = executor.inflight
+        if self.autoscale:
+            # Each stage splits its own worker pool across buckets
+            self.autoscaler = Autoscaler(PRIORITY_ORDER, logger=self.log)
+            for spec, q in zip(stages, executor.queues):
+                self.autoscaler.add_target(spec.name, spec.workers, q.depth, q.set_caps)
+        self.stage_logger.start("bucket_orchestration")
+        executor.start()
+        if self.autoscaler:
+            self.autoscaler.start()
+        received: Dict[str, int] = {}
+        try:
+            for b, it in routed:
+                received[b] = received.get(b, 0) + 1
+                executor.submit(b, it)
+            stats = executor.close_and_wait()
+        finally:
+            autoscale = self._stop_autoscaler()
+        for sink in sinks.values():
+            sink.close()
+
+        results = []
+        for b, n_items in received.items():
+            counts = {"items": n_items}
+            files = {}
+            for suffix in ("scripts", "voice", "avatar"):
+                sink = sinks.get((b, suffix))
+                counts[suffix] = sink.count if sink else 0
+                files[suffix] = sink.path if sink else None
+            failed = {stage: stats["failed"].get(b, {}).get(stage, 0) for stage in ("scripts", "voice", "avatar")}
+            n_failed = sum(failed.values())
+            # Same rule as a shards batch: any loss degrades, no videos at all fails
+            if n_failed and not counts["avatar"]:
+                status = "failed"
+            elif n_failed:
+                status = "degraded"
+            else:
+                status = "success"
+            results.append({"bucket": b, "status": status, "counts": counts, "failed": failed, "files": files})
+        success_count = sum(1 for r in results if r["status"] != "failed")
+        self.traces.log("PipelinedExecutor", input_payload={"buckets": len(received)}, output_payload=stats,
+                        status="success" if success_count else "failed")
+        self.stage_logger.complete("bucket_orchestration", meta={"mode": "pipelined", "buckets_total": len(received),
+                                                                 "buckets_success": success_count, **stats})
+        self.stage_logger.end_run("completed")
+        return {
+            "success": success_count > 0,
+            "mode": "pipelined",
+            "buckets_total": len(received),
+            "buckets_success": success_count,
+            "results": results,
+            "stages": stats["stages"],
+            "elapsed_seconds": stats["elapsed_seconds"],
+            "peak_inflight": stats["peak_inflight"],
+            "autoscale": autoscale,
+            "speculation": dict(self.speculator.stats) if self.speculator else None,
+            "skipped": dict(self.skipped),
+            "degraded": self.degraded,
+        }
+
+    def _routed_items(self, items: Iterator[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Score, sort and route items one window at a time.
+
+        Priority order therefore holds within each window of ORCH_MAX_INFLIGHT
+        items (and across buckets in pipelined mode), not across the whole file.
+        """
+        scorer = PriorityScorer(engagement_lookup=self.engagement_lookup)
+        while True:
+            window = list(islice(items, self.max_inflight))
+            if not window:
+                return
+            # Fresh scores (engagement moves after filtering), highest priority first
+            scorer.score(window)
+            window.sort(key=priority_of, reverse=True)
+            for it in window:
+                lang = (it.get("language") or "en").lower()
+                tone = (it.get("tone") or "news").lower()
+                # Pulled only as the in-flight window drains, so this is the item's admission time
+                yield _route_bucket(lang, tone), DeadlinePolicy.admit(it)
+
     def run(self) -> Dict[str, Any]:
         filtered_path = os.path.join(_output_root(), f"{self.registry}_filtered.json")
-        items = _read_json_list(filtered_path)
-        if not items:
+        items = iter_json_items(filtered_path)
+        first = next(items, None)
+        if first is None:
             return {"success": False, "message": "No filtered items found", "file": filtered_path}
-
-        # Route items to buckets
-        buckets: Dict[str, List[Dict[str, Any]]] = {}
-        for it in items:
-            lang = (it.get("language") or "en").lower()
-            tone = (it.get("tone") or "news").lower()
-            b = _route_bucket(lang, tone)
-            buckets.setdefault(b, []).append(it)
-
-        # Prepare shard tasks according to per-bucket limits and priority order
-        tasks = []
-        for b in PRIORITY_ORDER:
-            b_items = buckets.get(b, [])
-            if not b_items:
-                continue
-            shards = self.per_bucket_max.get(b, 1)
-            for shard_items in _split_into_shards(b_items, shards):
-                tasks.append((b, shard_items))
-
-        results = []
-        self.stage_logger.start("bucket_orchestration")
-        with ThreadPoolExecutor(max_workers=self.max_global_workers) as ex:
-            future_to_bucket = {ex.submit(self._process_bucket, b, shard_items): b for (b, shard_items) in tasks}
-            for fut in as_completed(future_to_bucket):
-                bucket = future_to_bucket[fut]
+        routed = self._routed_items(_prepend(first, items))
+        self.deadlines = DeadlinePolicy()
+        monitor = MemoryMonitor(
+            logger=self.log,
+            gauge=lambda: {"inflight": self._inflight_fn() if self._inflight_fn else 0},
+        ).start()
+
+        try:
+            if self.mode == "pipelined":
+                out = self.run_pipelined(routed)
+            else:
+                out = self.run_shards(routed)
+        except BaseException:
+            # Interrupted or crashed: drop queued process work instead of draining it
+            self.backends.shutdown(wait=False, cancel_futures=True)
+            monitor.stop()
+            raise
+        finally:
+            self._inflight_fn = None
+        self.backends.shutdown(wait=True)
+        out["backends"] = self.backends.describe()
+        out["memory"] = dict(monitor.stop(), max_inflight=self.max_inflight)
+        self.log.info("orchestrator_memory", mode=self.mode, **out["memory"])
+        return out
+
+    def run_shards(self, routed: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Run script → voice → avatar per batch pulled from the bucket scheduler.
+
+        A feeder thread streams `(bucket, item)` pairs into the scheduler,
+        blocking while ORCH_MAX_INFLIGHT items are queued or being processed.
+        """
+        # Workers pull small batches; a worker whose home bucket is empty or
+        # at its cap steals from the others in PRIORITY_ORDER-weighted turns
+        scheduler = BucketScheduler(
+            {},
+            PRIORITY_ORDER,
+            caps=self.per_bucket_max,
+            batch_size=self.batch_size,
+            closed=False,
+            max_inflight=self.max_inflight,
+        )
+        self._inflight_fn = scheduler.inflight
+        routed = iter(routed)
+        received: Dict[str, int] = {}
+
+        def _admit(pairs: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+            for b, it in pairs:
+                received[b] = received.get(b, 0) + 1
+                scheduler.put(b, it)
+
+        # Prime the first window so home buckets reflect the actual mix
+        _admit(islice(routed, self.max_inflight))
+        workers = max(1, min(self.max_global_workers, scheduler.inflight()))
+        homes = scheduler.home_buckets(workers)
+        if self.autoscale:
+            self.autoscaler = Autoscaler(PRIORITY_ORDER, logger=self.log)
+            self.autoscaler.add_target("shards", workers, scheduler.backlog, scheduler.set_caps)
+
+        def _feed() -> None:
+            try:
+                _admit(routed)
+            except Exception as e:
+                self.log.error("orchestrator_source_failed", error=str(e))
+            finally:
+                scheduler.close()
+
+        # Per-bucket totals instead of one result per batch, so results stay small
+        by_bucket: Dict[str, Dict[str, Any]] = {}
+        results_lock = threading.Lock()
+
+        def _worker(home: Optional[str]) -> None:
+            while True:
+                got = scheduler.next_batch(home)
+                if got is None:
+                    return
+                bucket, batch = got
+                started = time.time()
                 try:
-                    res = fut.result()
-                    res["status"] = "success"
-                    results.append(res)
+                    res = self._process_bucket(bucket, batch)
                 except Exception as e:
                     # Capture failure in results
                     self.log.error("bucket_task_failed", bucket=bucket, error=str(e))
-                    results.append({
-                        "bucket": bucket,
-                        "status": "failed",
-                        "error": str(e)
-                    })
-                    continue
-        
+                    res = {"bucket": bucket, "status": "failed", "error": str(e), "counts": {"items": len(batch)}}
+                finally:
+                    self._observe("shards", bucket, (time.time() - started) / max(1, len(batch)))
+                    scheduler.done(bucket, len(batch))
+                with results_lock:
+                    _merge_bucket_result(by_bucket, res)
+
+        self.stage_logger.start("bucket_orchestration")
+        self._sinks = {}
+        feeder = threading.Thread(target=_feed, name="orchestrator-feed", daemon=True)
+        if self.autoscaler:
+            self.autoscaler.start()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                futures = [ex.submit(_worker, home) for home in homes]
+                feeder.start()
+                for fut in futures:
+                    fut.result()
+            feeder.join()
+        finally:
+            autoscale = self._stop_autoscaler()
+            for sink in self._sinks.values():
+                sink.close()
+            self._sinks = None
+
+        results = [_finish_bucket_result(r) for r in by_bucket.values()]
         # Determine overall success
         success_count = sum(1 for r in results if r.get("status") != "failed")
         overall_success = (success_count > 0)
-        
-        self.stage_logger.complete("bucket_orchestration", meta={"buckets_total": len(tasks), "buckets_success": success_count})
+
+        self.stage_logger.complete("bucket_orchestration", meta={"buckets_total": len(results), "buckets_success": success_count, **scheduler.stats})
         self.stage_logger.end_run("completed")
         return {
-            "success": overall_success, 
-            "buckets_total": len(tasks),
+            "success": overall_success,
+            "buckets_total": len(results),
             "buckets_success": success_count,
-            "results": results
-        }
\ No newline at end of file
+            "results": results,
+            "scheduler": dict(scheduler.stats, batch_size=self.batch_size, workers=workers),
+            "autoscale": autoscale,
+            "speculation": dict(self.speculator.stats) if self.speculator else None,
+            "skipped": dict(self.skipped),
+            "degraded": self.degraded,
+        }
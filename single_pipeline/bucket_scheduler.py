@@ -0,0 +1,150 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+def priority_weights(order: List[str]) -> Dict[str, int]:
+    """Earlier buckets in PRIORITY_ORDER get proportionally more turns."""
+    n = len(order)
+    return {b: n - i for i, b in enumerate(order)}
+
+
+class BucketScheduler:
+    """Dynamic batch scheduler over per-bucket queues.
+
+    Workers call `next_batch(home)` to pull a small batch. A worker serves its
+    home bucket first; when that bucket is empty or at its concurrency cap it
+    steals from the other buckets, chosen by smooth weighted round-robin over
+    PRIORITY_ORDER weights. Stragglers therefore only hold one small batch
+    instead of a fixed shard, and quiet buckets do not pin a worker.
+
+    For streaming input, create it with `closed=False`, feed items with
+    `put()` and call `close()` at end of input. With `max_inflight`, `put()`
+    blocks while that many items are queued or being processed, so memory
+    is bounded by the window rather than the input size.
+    """
+
+    def __init__(
+        self,
+        buckets: Dict[str, List[Dict[str, Any]]],
+        order: List[str],
+        caps: Optional[Dict[str, int]] = None,
+        batch_size: int = 4,
+        weights: Optional[Dict[str, int]] = None,
+        closed: bool = True,
+        max_inflight: Optional[int] = None,
+    ):
+        self.order = list(order) + sorted(b for b in buckets if b not in order)
+        self.caps = dict(caps or {})
+        self.batch_size = max(1, int(batch_size))
+        self.weights = dict(weights or priority_weights(self.order))
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = {b: deque(buckets.get(b) or []) for b in self.order}
+        self._inflight: Dict[str, int] = {b: 0 for b in self.order}
+        self._credit: Dict[str, int] = {b: 0 for b in self.order}
+        self._cv = threading.Condition()
+        self._closed = closed
+        self.max_inflight = max(1, int(max_inflight)) if max_inflight else None
+        self._admitted = sum(len(q) for q in self._queues.values())
+        self.stats = {"batches": 0, "steals": 0, "peak_inflight": self._admitted}
+
+    def _eligible(self, b: str) -> bool:
+        return bool(self._queues.get(b)) and self._inflight.get(b, 0) < self.caps.get(b, 1 << 30)
+
+    def _weighted_pick(self, candidates: List[str]) -> str:
+        # Smooth weighted round-robin (deterministic, no starvation)
+        total = 0
+        for b in candidates:
+            w = max(1, self.weights.get(b, 1))
+            self._credit[b] = self._credit.get(b, 0) + w
+            total += w
+        best = max(candidates, key=lambda b: (self._credit[b], -self.order.index(b)))
+        self._credit[best] -= total
+        return best
+
+    def put(self, bucket: str, item: Dict[str, Any]) -> None:
+        """Add one item; blocks while the in-flight window is full."""
+        with self._cv:
+            while self.max_inflight is not None and self._admitted >= self.max_inflight:
+                self._cv.wait()
+            if bucket not in self._queues:
+                self.order.append(bucket)
+                self._queues[bucket] = deque()
+                self._inflight[bucket] = 0
+                self._credit[bucket] = 0
+                self.weights.setdefault(bucket, 1)
+            self._queues[bucket].append(item)
+            self._admitted += 1
+            self.stats["peak_inflight"] = max(self.stats["peak_inflight"], self._admitted)
+            self._cv.notify_all()
+
+    def close(self) -> None:
+        """Signal end of input; `next_batch` returns None once drained."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+
+    def set_caps(self, caps: Dict[str, int]) -> None:
+        """Replace per-bucket caps (e.g. from the autoscaler); waiters re-check at once."""
+        with self._cv:
+            self.caps = dict(caps)
+            self._cv.notify_all()
+
+    def inflight(self) -> int:
+        """Items queued or handed out but not yet reported done."""
+        with self._cv:
+            return self._admitted
+
+    def home_buckets(self, workers: int) -> List[Optional[str]]:
+        """Assign each worker a home bucket, busiest-priority buckets first."""
+        active = [b for b in self.order if self._queues.get(b)]
+        if not active:
+            return [None] * workers
+        return [active[i % len(active)] for i in range(workers)]
+
+    def _take(self, home: Optional[str]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        # Caller holds self._cv
+        if home and self._eligible(home):
+            bucket = home
+        else:
+            candidates = [b for b in self.order if self._eligible(b)]
+            if not candidates:
+                return None
+            bucket = self._weighted_pick(candidates)
+            if home and bucket != home:
+                self.stats["steals"] += 1
+        q = self._queues[bucket]
+        batch = [q.popleft() for _ in range(min(self.batch_size, len(q)))]
+        self._inflight[bucket] += 1
+        self.stats["batches"] += 1
+        return bucket, batch
+
+    def next_batch(self, home: Optional[str] = None) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Return (bucket, items) or None once input is closed and every queue is drained.
+
+        Blocks while work remains but every non-empty bucket is at its cap,
+        and while streaming input is still open.
+        """
+        with self._cv:
+            while True:
+                got = self._take(home)
+                if got is not None:
+                    return got
+                if self._closed and not any(self._queues.values()):
+                    return None
+                self._cv.wait()
+
+    def try_next_batch(self, home: Optional[str] = None) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """Non-blocking `next_batch`: None when nothing is eligible right now."""
+        with self._cv:
+            return self._take(home)
+
+    def done(self, bucket: str, items: int = 0) -> None:
+        """Release a batch slot of `bucket`; `items` frees that much of the in-flight window."""
+        with self._cv:
+            self._inflight[bucket] = max(0, self._inflight.get(bucket, 0) - 1)
+            self._admitted = max(0, self._admitted - max(0, int(items)))
+            self._cv.notify_all()
+
+    def backlog(self) -> Dict[str, int]:
+        with self._cv:
+            return {b: len(q) for b, q in self._queues.items()}
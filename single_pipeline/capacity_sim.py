@@ -0,0 +1,467 @@
+import os
+import json
+import math
+import heapq
+import random
+import sqlite3
+import itertools
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bucket_orchestrator import (
+    PRIORITY_ORDER,
+    _parse_stage_workers,
+    _route_bucket,
+    bucket_caps_from_env,
+    max_workers_from_env,
+    stage_workers_from_env,
+)
+from .bucket_scheduler import BucketScheduler
+from .stage_executor import BucketQueue
+from .priority import priority_of
+
+
+SIM_STAGES = ("scripts", "voice", "avatar")
+# pipeline_stage_events stage names written by BucketOrchestrator
+_EVENT_STAGES = {"summarize": "scripts", "voice": "voice", "avatar": "avatar"}
+# trace stage -> (sim stage, input count key)
+_TRACE_STAGES = {
+    "ScriptGenAgent": ("scripts", "items_count"),
+    "TTSAgent": ("voice", "scripts_count"),
+    "AvatarAgent": ("avatar", "voice_count"),
+}
+# Used only when nothing was measured or configured for a stage
+DEFAULT_SECONDS = {"scripts": 0.5, "voice": 2.0, "avatar": 30.0}
+
+
+def _app_db_path() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "data", "app.db"))
+
+
+def _traces_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "data", "traces"))
+
+
+def _pct(sorted_vals: List[float], q: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, max(0, int(math.ceil(q / 100.0 * len(sorted_vals))) - 1))
+    return round(sorted_vals[idx], 3)
+
+
+class LatencyModel:
+    """Per-stage service-time distributions for the simulator.
+
+    Empirical samples (per bucket when known, else per stage) are resampled;
+    stages without samples use a parametric spec:
+    `{"avatar": {"dist": "lognormal", "median": 30, "sigma": 0.6}}`
+    with `fixed` (seconds), `exponential` (mean), `lognormal` (median, sigma)
+    or `uniform` (low, high).
+    """
+
+    def __init__(self, parametric: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.samples: Dict[Tuple[str, Optional[str]], List[float]] = {}
+        self.parametric = dict(parametric or {})
+
+    def add(self, stage: str, seconds: float, bucket: Optional[str] = None) -> None:
+        if seconds < 0:
+            return
+        self.samples.setdefault((stage, None), []).append(float(seconds))
+        if bucket:
+            self.samples.setdefault((stage, bucket), []).append(float(seconds))
+
+    def sample(self, stage: str, bucket: Optional[str], rng: random.Random) -> float:
+        vals = self.samples.get((stage, bucket)) or self.samples.get((stage, None))
+        if vals:
+            return rng.choice(vals)
+        spec = self.parametric.get(stage)
+        if not spec:
+            return DEFAULT_SECONDS.get(stage, 1.0)
+        dist = str(spec.get("dist") or "fixed").lower()
+        if dist == "exponential":
+            return rng.expovariate(1.0 / max(1e-9, float(spec.get("mean", 1.0))))
+        if dist == "lognormal":
+            return rng.lognormvariate(math.log(max(1e-9, float(spec.get("median", 1.0)))), float(spec.get("sigma", 0.5)))
+        if dist == "uniform":
+            return rng.uniform(float(spec.get("low", 0.0)), float(spec.get("high", 1.0)))
+        return float(spec.get("seconds", spec.get("mean", 1.0)))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for stage in SIM_STAGES:
+            vals = sorted(self.samples.get((stage, None)) or [])
+            if vals:
+                out[stage] = {"source": "measured", "n": len(vals), "p50": _pct(vals, 50), "p95": _pct(vals, 95)}
+            else:
+                out[stage] = {"source": "parametric" if stage in self.parametric else "default",
+                              **(self.parametric.get(stage) or {"seconds": DEFAULT_SECONDS.get(stage)})}
+        return out
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> "LatencyModel":
+        """Stage -> parametric dict, or stage -> list of sample seconds."""
+        model = cls({k: v for k, v in spec.items() if isinstance(v, dict)})
+        for stage, vals in spec.items():
+            if isinstance(vals, list):
+                for v in vals:
+                    model.add(stage, float(v))
+        return model
+
+    @classmethod
+    def from_stage_events(cls, db_path: Optional[str] = None, since_hours: Optional[float] = None) -> "LatencyModel":
+        """Per-item latency = stage duration / items in the stage's batch."""
+        model = cls()
+        path = db_path or _app_db_path()
+        if not os.path.isfile(path):
+            return model
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT stage, duration_ms, meta, ended_at FROM pipeline_stage_events "
+                "WHERE status='completed' AND duration_ms IS NOT NULL"
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        finally:
+            conn.close()
+        cutoff = None
+        if since_hours:
+            cutoff = datetime.now().astimezone().timestamp() - float(since_hours) * 3600
+        for stage, dur_ms, meta_raw, ended_at in rows:
+            sim_stage = _EVENT_STAGES.get(stage)
+            if not sim_stage:
+                continue
+            try:
+                meta = json.loads(meta_raw) if meta_raw else {}
+            except Exception:
+                meta = {}
+            count = int(meta.get("count") or 0)
+            if count <= 0:
+                continue
+            if cutoff and ended_at:
+                try:
+                    if datetime.fromisoformat(str(ended_at)).timestamp() < cutoff:
+                        continue
+                except ValueError:
+                    pass
+            model.add(sim_stage, dur_ms / 1000.0 / count, meta.get("bucket"))
+        return model
+
+    @classmethod
+    def from_traces(cls, root: Optional[str] = None) -> "LatencyModel":
+        """Pair `running`/`success` trace entries per bucket (1 s timestamp resolution)."""
+        model = cls()
+        root = root or _traces_root()
+        for trace_stage, (sim_stage, count_key) in _TRACE_STAGES.items():
+            path = os.path.join(root, f"{trace_stage}.jsonl")
+            if not os.path.isfile(path):
+                continue
+            open_runs: Dict[str, List[Tuple[float, int]]] = {}
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        ts = datetime.fromisoformat(str(entry["ts"]).replace("Z", "+00:00")).timestamp()
+                    except Exception:
+                        continue
+                    bucket = (entry.get("input") or {}).get("bucket") or ""
+                    if entry.get("status") == "running":
+                        count = int((entry.get("input") or {}).get(count_key) or 0)
+                        open_runs.setdefault(bucket, []).append((ts, count))
+                    elif entry.get("status") == "success" and open_runs.get(bucket):
+                        started, count = open_runs[bucket].pop(0)
+                        if count > 0:
+                            model.add(sim_stage, (ts - started) / count, bucket or None)
+        return model
+
+
+class ArrivalModel:
+    """Items arriving as a Poisson stream and/or an initial burst.
+
+    `mix` maps `(language, tone)` to a weight; items are routed with the
+    orchestrator's own table, so unmapped pairs land in the default bucket.
+    """
+
+    def __init__(self, rate_per_minute: float = 0.0, mix: Optional[Dict[Tuple[str, str], float]] = None, burst: int = 0):
+        self.rate_per_minute = max(0.0, float(rate_per_minute))
+        self.mix = dict(mix or {("en", "news"): 1.0})
+        self.burst = max(0, int(burst))
+
+    @staticmethod
+    def parse_mix(raw: Optional[str]) -> Dict[Tuple[str, str], float]:
+        """Parse `en:news=0.5,hi:news=0.3,en:kids=0.2`."""
+        out: Dict[Tuple[str, str], float] = {}
+        for part in (raw or "").split(","):
+            if "=" not in part or ":" not in part.split("=", 1)[0]:
+                continue
+            key, w = part.split("=", 1)
+            lang, tone = key.split(":", 1)
+            try:
+                out[(lang.strip().lower(), tone.strip().lower())] = float(w)
+            except ValueError:
+                continue
+        return out
+
+    @classmethod
+    def from_items(cls, path: str, rate_per_minute: float = 0.0, burst: bool = True) -> "ArrivalModel":
+        """Take the language/tone mix (and optionally a burst of the same size) from an items file."""
+        from .streaming import iter_json_items
+        mix: Dict[Tuple[str, str], float] = {}
+        n = 0
+        for it in iter_json_items(path):
+            key = ((it.get("language") or "en").lower(), (it.get("tone") or "news").lower())
+            mix[key] = mix.get(key, 0.0) + 1.0
+            n += 1
+        return cls(rate_per_minute, mix or None, n if burst else 0)
+
+    def generate(self, duration_seconds: float, rng: random.Random) -> List[Tuple[float, Dict[str, Any]]]:
+        keys = list(self.mix)
+        weights = [self.mix[k] for k in keys]
+        out: List[Tuple[float, Dict[str, Any]]] = []
+        seq = itertools.count()
+
+        def _item(t: float) -> Tuple[float, Dict[str, Any]]:
+            lang, tone = rng.choices(keys, weights)[0]
+            return t, {"id": f"sim{next(seq)}", "language": lang, "tone": tone, "priority_score": round(rng.random(), 4)}
+
+        for _ in range(self.burst):
+            out.append(_item(0.0))
+        if self.rate_per_minute > 0:
+            t = 0.0
+            rate = self.rate_per_minute / 60.0
+            while True:
+                t += rng.expovariate(rate)
+                if t > duration_seconds:
+                    break
+                out.append(_item(t))
+        return out
+
+
+class _DepthTracker:
+    """Time-weighted mean and max of per-bucket queue depth."""
+
+    def __init__(self):
+        self.area: Dict[str, float] = {}
+        self.max: Dict[str, int] = {}
+        self._last_t = 0.0
+        self._last: Dict[str, int] = {}
+
+    def update(self, t: float, depths: Dict[str, int]) -> None:
+        dt = max(0.0, t - self._last_t)
+        for b, d in self._last.items():
+            self.area[b] = self.area.get(b, 0.0) + d * dt
+        for b, d in depths.items():
+            self.max[b] = max(self.max.get(b, 0), d)
+        self._last, self._last_t = dict(depths), t
+
+    def mean(self, bucket: str, horizon: float) -> float:
+        return round(self.area.get(bucket, 0.0) / horizon, 3) if horizon > 0 else 0.0
+
+
+class CapacitySimulator:
+    """Discrete-event model of BucketOrchestrator for offline capacity planning.
+
+    Items are routed with `_route_bucket` and scheduled by the orchestrator's
+    own BucketScheduler (shards mode) or BucketQueue per stage (pipelined
+    mode), driven through their non-blocking entry points on a simulated
+    clock. Defaults come from the same env as the orchestrator
+    (ORCH_MAX_WORKERS, ORCH_BUCKET_CAPS, ORCH_STAGE_WORKERS, ORCH_BATCH_SIZE).
+
+    Not modelled: retries, autoscaling, speculation, deadlines and queue
+    size limits.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel,
+        mode: str = "shards",
+        workers: Optional[int] = None,
+        caps: Optional[Dict[str, int]] = None,
+        stage_workers: Optional[Dict[str, int]] = None,
+        batch_size: Optional[int] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.mode = mode
+        self.workers = int(workers or max_workers_from_env())
+        self.caps = dict(caps if caps is not None else bucket_caps_from_env())
+        self.stage_workers = dict(stage_workers or stage_workers_from_env())
+        self.batch_size = max(1, int(batch_size or os.getenv("ORCH_BATCH_SIZE", "2")))
+        self.rng = random.Random(seed)
+
+    def run(self, arrivals: List[Tuple[float, Dict[str, Any]]]) -> Dict[str, Any]:
+        events: List[Tuple[float, int, str, Any]] = []
+        seq = itertools.count()
+        for t, it in arrivals:
+            bucket = _route_bucket((it.get("language") or "en").lower(), (it.get("tone") or "news").lower())
+            heapq.heappush(events, (t, next(seq), "arrive", (bucket, {**it, "_bucket": bucket, "_arrived": t})))
+        ttv: Dict[str, List[float]] = {}
+        arrived: Dict[str, int] = {}
+        depth = _DepthTracker()
+        busy = {"seconds": 0.0}
+
+        def _finish(t: float, rec: Dict[str, Any]) -> None:
+            ttv.setdefault(rec["_bucket"], []).append(t - rec["_arrived"])
+
+        if self.mode == "pipelined":
+            step, dispatch, depths = self._pipelined(events, seq, _finish, busy)
+        else:
+            step, dispatch, depths = self._shards(events, seq, arrivals, _finish, busy)
+
+        now = 0.0
+        while events:
+            now, _, kind, payload = heapq.heappop(events)
+            if kind == "arrive":
+                arrived[payload[0]] = arrived.get(payload[0], 0) + 1
+            step(now, kind, payload)
+            # Apply every event at this instant before handing out work, like a primed window
+            if events and events[0][0] == now:
+                continue
+            depth.update(now, depths())
+            dispatch(now)
+            depth.update(now, depths())
+
+        capacity = self.workers if self.mode != "pipelined" else sum(self.stage_workers.get(s, 1) for s in SIM_STAGES)
+        completed = sum(len(v) for v in ttv.values())
+        buckets: Dict[str, Dict[str, Any]] = {}
+        for b in sorted(arrived, key=lambda x: PRIORITY_ORDER.index(x) if x in PRIORITY_ORDER else len(PRIORITY_ORDER)):
+            vals = sorted(ttv.get(b) or [])
+            buckets[b] = {
+                "items": arrived[b],
+                "completed": len(vals),
+                "ttv_p50": _pct(vals, 50),
+                "ttv_p95": _pct(vals, 95),
+                "ttv_p99": _pct(vals, 99),
+                "queue_max": depth.max.get(b, 0),
+                "queue_mean": depth.mean(b, now),
+            }
+        return {
+            "mode": self.mode,
+            "items": sum(arrived.values()),
+            "completed": completed,
+            "makespan_seconds": round(now, 3),
+            "throughput_per_hour": round(completed / now * 3600.0, 2) if now > 0 else None,
+            "utilization": round(busy["seconds"] / (capacity * now), 3) if now > 0 else None,
+            "buckets": buckets,
+            "config": {
+                "workers": self.workers,
+                "caps": self.caps,
+                "stage_workers": self.stage_workers,
+                "batch_size": self.batch_size,
+            },
+            "latency": self.latency.summary(),
+        }
+
+    def _shards(self, events, seq, arrivals, finish, busy):
+        sched = BucketScheduler({}, PRIORITY_ORDER, caps=self.caps, batch_size=self.batch_size, closed=False)
+        # Same home assignment as run_shards: present buckets in priority order
+        present = {_route_bucket((it.get("language") or "en").lower(), (it.get("tone") or "news").lower()) for _, it in arrivals}
+        active = [b for b in PRIORITY_ORDER if b in present] + sorted(b for b in present if b not in PRIORITY_ORDER)
+        homes = [active[i % len(active)] if active else None for i in range(self.workers)]
+        idle = list(range(self.workers))
+
+        def _dispatch(now: float) -> None:
+            for w in list(idle):
+                got = sched.try_next_batch(homes[w])
+                if got is None:
+                    continue
+                bucket, batch = got
+                idle.remove(w)
+                # _process_bucket runs each stage over the whole batch, then writes outputs
+                dur = sum(self.latency.sample(s, bucket, self.rng) for s in SIM_STAGES for _ in batch)
+                busy["seconds"] += dur
+                heapq.heappush(events, (now + dur, next(seq), "batch_done", (w, bucket, batch)))
+
+        def step(now: float, kind: str, payload: Any) -> None:
+            if kind == "arrive":
+                bucket, rec = payload
+                sched.put(bucket, rec)
+            else:
+                w, bucket, batch = payload
+                sched.done(bucket, len(batch))
+                for rec in batch:
+                    finish(now, rec)
+                idle.append(w)
+
+        return step, _dispatch, sched.backlog
+
+    def _pipelined(self, events, seq, finish, busy):
+        queues = [BucketQueue(1 << 30, self.caps, PRIORITY_ORDER, priority_of) for _ in SIM_STAGES]
+        idle = [self.stage_workers.get(s, 1) for s in SIM_STAGES]
+
+        def _dispatch(now: float, si: int) -> None:
+            while idle[si] > 0:
+                got = queues[si].try_get()
+                if got is None:
+                    return
+                bucket, rec = got
+                idle[si] -= 1
+                dur = self.latency.sample(SIM_STAGES[si], bucket, self.rng)
+                busy["seconds"] += dur
+                heapq.heappush(events, (now + dur, next(seq), "stage_done", (si, bucket, rec)))
+
+        def step(now: float, kind: str, payload: Any) -> None:
+            if kind == "arrive":
+                bucket, rec = payload
+                queues[0].put(bucket, rec)
+                return
+            si, bucket, rec = payload
+            queues[si].task_done(bucket)
+            idle[si] += 1
+            if si + 1 < len(SIM_STAGES):
+                queues[si + 1].put(bucket, rec)
+            else:
+                finish(now, rec)
+
+        def dispatch(now: float) -> None:
+            # Downstream first so freed items move on before new ones enter
+            for si in reversed(range(len(SIM_STAGES))):
+                _dispatch(now, si)
+
+        def depths() -> Dict[str, int]:
+            out: Dict[str, int] = {}
+            for q in queues:
+                for b, n in q.depth().items():
+                    out[b] = out.get(b, 0) + n
+            return out
+
+        return step, dispatch, depths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate BucketOrchestrator throughput and time-to-video")
+    parser.add_argument("--mode", choices=["shards", "pipelined"], default=os.getenv("ORCH_MODE") or "shards")
+    parser.add_argument("--workers", type=int, default=None, help="Global workers (shards mode)")
+    parser.add_argument("--caps", default=None, help="Per-bucket caps, e.g. HI-NEWS=2,EN-NEWS=3")
+    parser.add_argument("--stage-workers", default=None, help="Pipelined pools, e.g. scripts=2,voice=4,avatar=6")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--latency", default="events",
+                        help="'events' (pipeline_stage_events), 'traces', or a JSON spec file")
+    parser.add_argument("--since-hours", type=float, default=None, help="Only use stage events this recent")
+    parser.add_argument("--rate", type=float, default=0.0, help="Poisson arrivals per minute")
+    parser.add_argument("--mix", default=None, help="Language:tone weights, e.g. en:news=0.5,hi:news=0.5")
+    parser.add_argument("--burst", type=int, default=0, help="Items present at t=0")
+    parser.add_argument("--from-items", default=None, help="Take the mix (and a burst) from a filtered items file")
+    parser.add_argument("--duration", type=float, default=3600.0, help="Arrival window in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.latency == "events":
+        model = LatencyModel.from_stage_events(since_hours=args.since_hours)
+    elif args.latency == "traces":
+        model = LatencyModel.from_traces()
+    else:
+        with open(args.latency, "r", encoding="utf-8") as f:
+            model = LatencyModel.from_spec(json.load(f))
+    if args.from_items:
+        arrivals_model = ArrivalModel.from_items(args.from_items, rate_per_minute=args.rate)
+    else:
+        arrivals_model = ArrivalModel(args.rate, ArrivalModel.parse_mix(args.mix) or None, args.burst)
+    caps = _parse_stage_workers(args.caps, bucket_caps_from_env()) if args.caps else None
+    stage_workers = _parse_stage_workers(args.stage_workers, stage_workers_from_env()) if args.stage_workers else None
+    sim = CapacitySimulator(model, mode=args.mode, workers=args.workers, caps=caps, stage_workers=stage_workers,
+                            batch_size=args.batch_size, seed=args.seed)
+    report = sim.run(arrivals_model.generate(args.duration, sim.rng))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -5,10 +5,13 @@ from typing import Any, Dict, List, Optional
 from .fetcher_hub import FetcherHub
 from .agents.filter_agent import FilterAgent
 from .agents.script_gen_agent import ScriptGenAgent
-from .agents.tts_agent_stub import TTSAgentStub
+from .tts_pool import TTSPool
 from .agents.avatar_agent_stub import AvatarAgentStub
 from .logging_utils import StageLogger, PipelineLogger
 from .bucket_orchestrator import BucketOrchestrator
+from .streaming import run_streaming
+from .run_state import RunStateStore, incremental_enabled
+from .priority import EngagementLookup
 
 
 def _output_root() -> str:
@@ -59,33 +62,62 @@ async def run_fetch_async(registry: str = "single", category: str = "general") -
     return res
 
 
-def run_filter(registry: str = "single", category: str = "general") -> Dict[str, Any]:
+def server_engagement_lookup() -> Optional[EngagementLookup]:
+    """Engagement aggregates from the server DB for priority scoring, when the server package is available."""
+    try:
+        from server.db import get_engagement_stats
+    except Exception:
+        return None
+    return get_engagement_stats
+
+
+def run_filter(
+    registry: str = "single",
+    category: str = "general",
+    engagement_lookup: Optional[EngagementLookup] = None,
+) -> Dict[str, Any]:
     log = PipelineLogger(component="cli_filter")
     run = StageLogger(source="pipeline", category=category, meta={"registry": registry})
     run.start("filter")
 
     items_path = _safe_join(_output_root(), f"{_sanitize_identifier(registry)}_items.json")
     items = _read_items(items_path)
-    agent = FilterAgent()
+    agent = FilterAgent(engagement_lookup=engagement_lookup)
     filtered = agent.filter_items(items, logger=log)
     out_path = _write_json(registry, "filtered", filtered)
-    run.complete("filter", meta={"count": len(filtered), "file": out_path})
+    run.complete("filter", meta={"count": len(filtered), "file": out_path, "cascade": agent.last_stats})
     run.end_run("completed")
-    return {"count": len(filtered), "output_file": out_path}
+    return {"count": len(filtered), "output_file": out_path, "cascade": agent.last_stats}
+
+
+def _incremental_store(incremental: Optional[bool], log: PipelineLogger) -> Optional[RunStateStore]:
+    on = incremental_enabled() if incremental is None else incremental
+    return RunStateStore(logger=log) if on else None
 
 
-def run_scripts(registry: str = "single", category: str = "general") -> Dict[str, Any]:
+def run_scripts(registry: str = "single", category: str = "general", incremental: Optional[bool] = None) -> Dict[str, Any]:
     log = PipelineLogger(component="cli_scripts")
     run = StageLogger(source="pipeline", category=category, meta={"registry": registry})
     run.start("summarize")
     filtered_path = _safe_join(_output_root(), f"{_sanitize_identifier(registry)}_filtered.json")
     items = _read_items(filtered_path)
     agent = ScriptGenAgent(logger=log)
-    scripts = agent.generate(items, category=category)
+    store = _incremental_store(incremental, log)
+    counts = None
+    if store:
+        scripts, counts = store.run_items(
+            "scripts", items, agent.generate_item,
+            ok=lambda s: (s.get("stage_status") or {}).get("script") != "failed",
+        )
+    else:
+        scripts = agent.generate(items, category=category)
     out_path = _write_json(registry, "scripts", scripts)
-    run.complete("summarize", meta={"count": len(scripts), "file": out_path})
+    run.complete("summarize", meta={"count": len(scripts), "file": out_path, "incremental": counts})
     run.end_run("completed")
-    return {"count": len(scripts), "output_file": out_path}
+    out = {"count": len(scripts), "output_file": out_path}
+    if counts is not None:
+        out["incremental"] = counts
+    return out
 
 
 def run_voice(
@@ -93,6 +125,7 @@ def run_voice(
     category: str = "general",
     voice: str = "en-US-Neural-1",
     limit: Optional[int] = None,
+    incremental: Optional[bool] = None,
 ) -> Dict[str, Any]:
     log = PipelineLogger(component="cli_voice")
     run = StageLogger(source="pipeline", category=category, meta={"registry": registry})
@@ -101,12 +134,24 @@ def run_voice(
     scripts = _read_items(scripts_path)
     if isinstance(limit, int) and limit > 0:
         scripts = scripts[:limit]
-    agent = TTSAgentStub(voice=voice, logger=log)
-    voice_items = agent.synthesize(scripts, category=category)
+    store = _incremental_store(incremental, log)
+    counts = None
+    with TTSPool(voice=voice, logger=log) as pool:
+        if store:
+            voice_items, counts = store.run_items(
+                "voice", scripts, lambda s: pool.synthesize_item(s, category=category),
+                params={"voice": voice, "category": category},
+                ok=lambda v: v.get("status") == "success",
+            )
+        else:
+            voice_items = pool.synthesize(scripts, category=category)
     out_path = _write_json(_sanitize_identifier(registry), "voice", voice_items)
-    run.complete("voice", meta={"count": len(voice_items), "file": out_path})
+    run.complete("voice", meta={"count": len(voice_items), "file": out_path, "incremental": counts})
     run.end_run("completed")
-    return {"count": len(voice_items), "output_file": out_path}
+    out = {"count": len(voice_items), "output_file": out_path}
+    if counts is not None:
+        out["incremental"] = counts
+    return out
 
 
 def run_avatar(
@@ -114,6 +159,7 @@ def run_avatar(
     category: str = "general",
     style: str = "news-anchor",
     limit: Optional[int] = None,
+    incremental: Optional[bool] = None,
 ) -> Dict[str, Any]:
     log = PipelineLogger(component="cli_avatar")
     run = StageLogger(source="pipeline", category=category, meta={"registry": registry})
@@ -123,11 +169,45 @@ def run_avatar(
     if isinstance(limit, int) and limit > 0:
         voice_items = voice_items[:limit]
     agent = AvatarAgentStub(style=style, logger=log)
-    videos = agent.render(voice_items, category=category)
+    store = _incremental_store(incremental, log)
+    counts = None
+    if store:
+        videos, counts = store.run_items(
+            "avatar", voice_items, lambda v: agent.render_item(v, category=category),
+            params={"style": style, "category": category},
+        )
+    else:
+        videos = agent.render(voice_items, category=category)
     out_path = _write_json(registry, "avatar", videos)
-    run.complete("avatar", meta={"count": len(videos), "file": out_path})
+    run.complete("avatar", meta={"count": len(videos), "file": out_path, "incremental": counts})
     run.end_run("completed")
-    return {"count": len(videos), "output_file": out_path}
+    out = {"count": len(videos), "output_file": out_path}
+    if counts is not None:
+        out["incremental"] = counts
+    return out
+
+
+def run_stream(
+    registry: str = "single",
+    category: str = "general",
+    voice: str = "en-US-Neural-1",
+    style: str = "news-anchor",
+    limit: Optional[int] = None,
+    buffer_size: Optional[int] = None,
+    write_sinks: bool = True,
+    engagement_lookup: Optional[EngagementLookup] = None,
+) -> Dict[str, Any]:
+    """Streaming mode: items flow through filter/scripts/voice/avatar one at a time."""
+    return run_streaming(
+        registry=registry,
+        category=category,
+        voice=voice,
+        style=style,
+        limit=limit,
+        buffer_size=buffer_size,
+        write_sinks=write_sinks,
+        engagement_lookup=engagement_lookup,
+    )
 
 
 if __name__ == "__main__":
@@ -152,42 +232,74 @@ if __name__ == "__main__":
     scr = sub.add_parser("scripts", help="Generate scripts from filtered items")
     scr.add_argument("--registry", default="single")
     scr.add_argument("--category", default="general")
+    scr.add_argument("--incremental", action="store_true", default=None, help="Skip items already scripted with unchanged inputs")
 
     vce = sub.add_parser("voice", help="Generate TTS voice from scripts")
     vce.add_argument("--registry", default="single")
     vce.add_argument("--category", default="general")
     vce.add_argument("--voice", default="en-US-Neural-1")
     vce.add_argument("--limit", type=int, default=None)
+    vce.add_argument("--incremental", action="store_true", default=None, help="Skip items already voiced with unchanged inputs")
 
     av = sub.add_parser("avatar", help="Render avatar videos from voice")
     av.add_argument("--registry", default="single")
     av.add_argument("--category", default="general")
     av.add_argument("--style", default="news-anchor")
     av.add_argument("--limit", type=int, default=None)
+    av.add_argument("--incremental", action="store_true", default=None, help="Skip items already rendered with unchanged inputs")
 
     bkt = sub.add_parser("buckets", help="Run bucketed orchestration across stages")
     bkt.add_argument("--registry", default="single")
     bkt.add_argument("--category", default="general")
+    bkt.add_argument("--mode", choices=["shards", "pipelined"], default=None)
+    bkt.add_argument("--incremental", action="store_true", default=None, help="Resume: skip item stages already done")
+
+    stm = sub.add_parser("stream", help="Stream items one at a time through filter→scripts→voice→avatar")
+    stm.add_argument("--registry", default="single")
+    stm.add_argument("--category", default="general")
+    stm.add_argument("--voice", default="en-US-Neural-1")
+    stm.add_argument("--style", default="news-anchor")
+    stm.add_argument("--limit", type=int, default=None)
+    stm.add_argument("--buffer-size", type=int, default=None)
+    stm.add_argument("--no-sinks", action="store_true", help="Do not write per-stage JSON files")
 
     args = parser.parse_args()
     if args.cmd == "fetch":
         out = run_fetch(registry=args.registry, category=args.category)
         print(json.dumps(out, ensure_ascii=False))
     elif args.cmd == "filter":
-        out = run_filter(registry=args.registry, category=args.category)
+        out = run_filter(registry=args.registry, category=args.category, engagement_lookup=server_engagement_lookup())
         print(json.dumps(out, ensure_ascii=False))
     elif args.cmd == "scripts":
-        out = run_scripts(registry=args.registry, category=args.category)
+        out = run_scripts(registry=args.registry, category=args.category, incremental=args.incremental)
         print(json.dumps(out, ensure_ascii=False))
     elif args.cmd == "voice":
-        out = run_voice(registry=args.registry, category=args.category, voice=args.voice, limit=args.limit)
+        out = run_voice(registry=args.registry, category=args.category, voice=args.voice, limit=args.limit, incremental=args.incremental)
         print(json.dumps(out, ensure_ascii=False))
     elif args.cmd == "avatar":
-        out = run_avatar(registry=args.registry, category=args.category, style=args.style, limit=args.limit)
+        out = run_avatar(registry=args.registry, category=args.category, style=args.style, limit=args.limit, incremental=args.incremental)
         print(json.dumps(out, ensure_ascii=False))
     elif args.cmd == "buckets":
-        orch = BucketOrchestrator(registry=args.registry, category=args.category)
+        orch = BucketOrchestrator(
+            registry=args.registry,
+            category=args.category,
+            mode=args.mode,
+            incremental=args.incremental,
+            engagement_lookup=server_engagement_lookup(),
+        )
         out = orch.run()
         print(json.dumps(out, ensure_ascii=False))
+    elif args.cmd == "stream":
+        out = run_stream(
+            registry=args.registry,
+            category=args.category,
+            voice=args.voice,
+            style=args.style,
+            limit=args.limit,
+            buffer_size=args.buffer_size,
+            write_sinks=not args.no_sinks,
+            engagement_lookup=server_engagement_lookup(),
+        )
+        print(json.dumps(out, ensure_ascii=False))
     else:
         parser.print_help()
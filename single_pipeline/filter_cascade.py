@@ -0,0 +1,150 @@
+import os
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+# Rule names in the order they are evaluated (cheapest first)
+DEFAULT_RULES = ["exact_hash", "source_blocklist", "length", "age"]
+
+
+def _content_hash(title: str, body: str) -> str:
+    # Same hash as RAGClient._hash so cache lookups line up
+    return hashlib.sha256((title + "\n" + body).encode("utf-8")).hexdigest()
+
+
+def _parse_ts(ts: Any) -> Optional[float]:
+    if ts is None or ts == "":
+        return None
+    if isinstance(ts, (int, float)):
+        val = float(ts)
+        # Accept epoch milliseconds as well
+        return val / 1000.0 if val > 1e12 else val
+    try:
+        dt = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    except Exception:
+        return None
+
+
+def _source_names(it: Dict[str, Any]) -> List[str]:
+    src = it.get("source")
+    names: List[str] = []
+    if isinstance(src, dict):
+        for k in ("name", "agent", "url"):
+            v = src.get(k)
+            if v:
+                names.append(str(v).lower())
+    elif src:
+        names.append(str(src).lower())
+    return names
+
+
+class FilterCascade:
+    """Cost-ordered pre-filter for FilterAgent.
+
+    Runs cheap rejection rules (exact hash seen, source blocklist, length,
+    age window) before any language detection, tagging or embedding work.
+    Each rule keeps pass/reject counters so operators can see where items exit.
+
+    Configuration (env):
+    - FILTER_CASCADE_RULES: comma list of enabled rules (default: all)
+    - FILTER_SEEN_SCOPE: `batch` (default) or `cache` to also reject items
+      already present in the RAG cache from earlier runs
+    - FILTER_MIN_TITLE_CHARS / FILTER_MIN_BODY_CHARS: length floor (default 1 / 0)
+    - FILTER_MAX_AGE_HOURS: age window; 0 disables (default 0)
+    - FILTER_SOURCE_BLOCKLIST: comma list of source names/agents/url fragments
+    """
+
+    def __init__(
+        self,
+        seen_hashes: Optional[Callable[[str], bool]] = None,
+        rules: Optional[List[str]] = None,
+        min_title_chars: Optional[int] = None,
+        min_body_chars: Optional[int] = None,
+        max_age_hours: Optional[float] = None,
+        source_blocklist: Optional[List[str]] = None,
+    ):
+        env_rules = os.getenv("FILTER_CASCADE_RULES")
+        if rules is None and env_rules is not None:
+            rules = [r.strip().lower() for r in env_rules.split(",") if r.strip()]
+        enabled = set(rules if rules is not None else DEFAULT_RULES)
+        self.rules: List[str] = [r for r in DEFAULT_RULES if r in enabled]
+        self.min_title_chars = int(os.getenv("FILTER_MIN_TITLE_CHARS", "1")) if min_title_chars is None else int(min_title_chars)
+        self.min_body_chars = int(os.getenv("FILTER_MIN_BODY_CHARS", "0")) if min_body_chars is None else int(min_body_chars)
+        self.max_age_hours = float(os.getenv("FILTER_MAX_AGE_HOURS", "0")) if max_age_hours is None else float(max_age_hours)
+        if source_blocklist is None:
+            source_blocklist = [s for s in (os.getenv("FILTER_SOURCE_BLOCKLIST") or "").split(",")]
+        self.source_blocklist = [s.strip().lower() for s in source_blocklist if s and s.strip()]
+        # Not `cache` by default: FilterAgent records every survivor in the persistent RAG cache, so a
+        # rerun over the same feed would drop every story instead of keeping it with dedup_flag set
+        self.seen_scope = (os.getenv("FILTER_SEEN_SCOPE") or "batch").lower()
+        self._seen_hashes = seen_hashes
+        self._batch_hashes: Set[str] = set()
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear per-batch state and counters."""
+        self._batch_hashes = set()
+        self.counters = {name: {"pass": 0, "reject": 0} for name in self.rules}
+
+    def _check_exact_hash(self, it: Dict[str, Any], now: float) -> Optional[str]:
+        h = _content_hash(it.get("title") or "", it.get("body") or "")
+        if h in self._batch_hashes:
+            return "duplicate_in_batch"
+        if self.seen_scope == "cache" and self._seen_hashes:
+            try:
+                if self._seen_hashes(h):
+                    return "duplicate_seen"
+            except Exception:
+                pass
+        self._batch_hashes.add(h)
+        return None
+
+    def _check_source_blocklist(self, it: Dict[str, Any], now: float) -> Optional[str]:
+        if not self.source_blocklist:
+            return None
+        for name in _source_names(it):
+            for blocked in self.source_blocklist:
+                if blocked in name:
+                    return "source_blocked"
+        return None
+
+    def _check_length(self, it: Dict[str, Any], now: float) -> Optional[str]:
+        if len((it.get("title") or "").strip()) < self.min_title_chars:
+            return "title_too_short"
+        if len((it.get("body") or "").strip()) < self.min_body_chars:
+            return "body_too_short"
+        return None
+
+    def _check_age(self, it: Dict[str, Any], now: float) -> Optional[str]:
+        if self.max_age_hours <= 0:
+            return None
+        ts = _parse_ts(it.get("timestamp"))
+        if ts is None:
+            # Unknown age is not a reason to drop
+            return None
+        if now - ts > self.max_age_hours * 3600:
+            return "too_old"
+        return None
+
+    def evaluate(self, it: Dict[str, Any], now: Optional[float] = None) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Run enabled rules in cost order.
+
+        Returns (passed, rule_name, reason); rule_name/reason are set on rejection.
+        """
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        for name in self.rules:
+            check = getattr(self, f"_check_{name}")
+            reason = check(it, now)
+            if reason:
+                self.counters[name]["reject"] += 1
+                return False, name, reason
+            self.counters[name]["pass"] += 1
+        return True, None, None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(c) for name, c in self.counters.items()}
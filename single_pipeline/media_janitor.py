@@ -0,0 +1,325 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging_utils import PipelineLogger
+from .tts_cache import INDEX_NAME, LEGACY_INDEX_NAME, wav_duration
+
+
+def _data_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "data"))
+
+
+# kind -> (default directory, default retention days); each directory is seeded into the index once
+MEDIA_KINDS: Dict[str, Tuple[str, float]] = {
+    "tts": (os.path.join(_data_root(), "tts"), 7),
+    "avatar": (os.path.join(_data_root(), "avatar"), 30),
+    "trace": (os.path.join(_data_root(), "traces"), 7),
+}
+INDEX_DB_NAME = "media_index.db"
+# Files that belong to an index rather than to retention
+_KEEP_NAMES = {INDEX_NAME, f"{INDEX_NAME}-wal", f"{INDEX_NAME}-shm", f"{INDEX_NAME}-journal", LEGACY_INDEX_NAME}
+
+
+def _default_index_path() -> str:
+    return os.path.abspath(os.getenv("MEDIA_INDEX_DB") or os.path.join(_data_root(), INDEX_DB_NAME))
+
+
+class MediaIndex:
+    """SQLite index of generated media: path, kind, created, last use, size, duration.
+
+    Writers record each file once when they produce it and `touch` it when
+    they reuse it, so retention and quota decisions never list directories.
+    Each row carries its own retention (seconds after last use).
+
+    Backed by `data/media_index.db` (override with MEDIA_INDEX_DB); agents
+    writing elsewhere keep theirs beside their output directory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or _default_index_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS media (
+                path TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                created REAL NOT NULL,
+                used REAL NOT NULL,
+                retention REAL NOT NULL,
+                size INTEGER NOT NULL,
+                duration REAL
+            );
+            CREATE INDEX IF NOT EXISTS media_kind_used ON media(kind, used);
+            CREATE TABLE IF NOT EXISTS janitor_state (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def record(self, path: str, kind: str, retention_days: float, duration: Optional[float] = None) -> None:
+        """Register (or re-register, after an overwrite) a file that was just written."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media(path, kind, created, used, retention, size, duration) VALUES(?,?,?,?,?,?,?)",
+                (os.path.abspath(path), kind, now, now, float(retention_days) * 86400, size, duration),
+            )
+            self._conn.commit()
+
+    def touch(self, path: str, size: Optional[int] = None) -> bool:
+        """Mark a file as used now, restarting its retention window; False if it is not indexed.
+
+        Pass `size` for files that grow in place (append-only logs) so quotas see their real size.
+        """
+        with self._lock:
+            if size is None:
+                cur = self._conn.execute("UPDATE media SET used=? WHERE path=?", (time.time(), os.path.abspath(path)))
+            else:
+                cur = self._conn.execute(
+                    "UPDATE media SET used=?, size=? WHERE path=?", (time.time(), int(size), os.path.abspath(path))
+                )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM media WHERE kind=?", (kind,)).fetchone()[0])
+
+    def total_bytes(self, kind: str) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM media WHERE kind=?", (kind,)).fetchone()[0])
+
+    def expired(self, kind: str, now: float, limit: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, size FROM media WHERE kind=? AND used + retention < ? ORDER BY used LIMIT ?",
+                (kind, now, limit),
+            ).fetchall()
+
+    def short_audio(self, kind: str, max_seconds: float, limit: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, size FROM media WHERE kind=? AND duration IS NOT NULL AND duration <= ? LIMIT ?",
+                (kind, max_seconds, limit),
+            ).fetchall()
+
+    def over_quota(self, kind: str, quota_bytes: int, limit: int, exclude: Optional[Dict[str, int]] = None) -> List[Tuple[str, int]]:
+        """Least recently used files whose removal brings `kind` under `quota_bytes`.
+
+        `exclude` holds files already chosen for deletion; their sizes count
+        as freed.
+        """
+        exclude = exclude or {}
+        excess = self.total_bytes(kind) - sum(exclude.values()) - quota_bytes
+        if excess <= 0:
+            return []
+        out: List[Tuple[str, int]] = []
+        with self._lock:
+            cur = self._conn.execute("SELECT path, size FROM media WHERE kind=? ORDER BY used", (kind,))
+            for path, size in cur:
+                if excess <= 0 or len(out) >= limit:
+                    break
+                if path in exclude:
+                    continue
+                out.append((path, size))
+                excess -= size
+        return out
+
+    def forget(self, paths: List[str]) -> None:
+        if not paths:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM media WHERE path=?", [(p,) for p in paths])
+            self._conn.commit()
+
+    def seed(self, kind: str, root: str, retention_days: float) -> int:
+        """One-time import of files already on disk (index created after the files)."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM janitor_state WHERE key=?", (f"seeded:{kind}",)).fetchone():
+                return 0
+        rows = []
+        try:
+            names = os.listdir(root)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(root, name)
+            if name in _KEEP_NAMES or not os.path.isfile(path):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            duration = wav_duration(path) if name.lower().endswith(".wav") else None
+            rows.append((os.path.abspath(path), kind, st.st_mtime, st.st_mtime, float(retention_days) * 86400, st.st_size, duration))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO media(path, kind, created, used, retention, size, duration) VALUES(?,?,?,?,?,?,?)",
+                rows,
+            )
+            self._conn.execute("INSERT OR REPLACE INTO janitor_state(key, value) VALUES(?, ?)", (f"seeded:{kind}", time.time()))
+            self._conn.commit()
+        return len(rows)
+
+    def claim_sweep(self, interval: float) -> bool:
+        """True for at most one process per interval, so concurrent janitors do not duplicate work."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO janitor_state(key, value) VALUES('last_sweep', 0)")
+            cur = self._conn.execute(
+                "UPDATE janitor_state SET value=? WHERE key='last_sweep' AND value <= ?",
+                (now, now - interval * 0.9),
+            )
+            self._conn.commit()
+            return cur.rowcount == 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class MediaJanitor:
+    """Background retention for generated audio, video and trace files.
+
+    Every MEDIA_JANITOR_INTERVAL seconds (default 300; first pass after
+    MEDIA_JANITOR_DELAY, default 30) one process removes, using the index
+    rather than a directory scan:
+    - files unused for longer than their retention (TTS 7 days, avatar 30,
+      traces 7, or what the writing agent was configured with);
+    - TTS WAVs of at most MEDIA_MIN_AUDIO_SECONDS (default 1.5, placeholder
+      beeps);
+    - the least recently used files of a kind above its size quota
+      (MEDIA_QUOTA_MB_TTS / _AVATAR / _TRACE, 0 = unlimited).
+    Deletes happen in batches of MEDIA_JANITOR_BATCH (default 500) per kind
+    per sweep. MEDIA_JANITOR_ENABLED=0 turns retention off.
+    """
+
+    def __init__(
+        self,
+        index: Optional[MediaIndex] = None,
+        interval: Optional[float] = None,
+        batch: Optional[int] = None,
+        logger: Optional[PipelineLogger] = None,
+        kinds: Optional[Dict[str, Tuple[str, float]]] = None,
+    ):
+        self.index = index or media_index()
+        self.kinds = dict(kinds or MEDIA_KINDS)
+        self.interval = float(interval if interval is not None else os.getenv("MEDIA_JANITOR_INTERVAL", "300"))
+        self.batch = max(1, int(batch or os.getenv("MEDIA_JANITOR_BATCH", "500")))
+        self.delay = float(os.getenv("MEDIA_JANITOR_DELAY", "30"))
+        self.min_audio_seconds = float(os.getenv("MEDIA_MIN_AUDIO_SECONDS", "1.5"))
+        self.quotas = {k: int(float(os.getenv(f"MEDIA_QUOTA_MB_{k.upper()}", "0")) * 1024 * 1024) for k in self.kinds}
+        self.log = logger or PipelineLogger(component="media_janitor")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep(self) -> Dict[str, Any]:
+        """Run one retention pass over every kind; returns per-kind deleted counts and freed bytes."""
+        now = time.time()
+        report: Dict[str, Any] = {}
+        for kind, (root, retention_days) in self.kinds.items():
+            self.index.seed(kind, root, retention_days)
+            victims: Dict[str, int] = {}
+            for path, size in self.index.expired(kind, now, self.batch):
+                victims[path] = size
+            if kind == "tts" and self.min_audio_seconds > 0 and len(victims) < self.batch:
+                for path, size in self.index.short_audio(kind, self.min_audio_seconds, self.batch - len(victims)):
+                    victims.setdefault(path, size)
+            quota = self.quotas.get(kind, 0)
+            if quota > 0 and len(victims) < self.batch:
+                for path, size in self.index.over_quota(kind, quota, self.batch - len(victims), exclude=victims):
+                    victims.setdefault(path, size)
+            freed = 0
+            for path, size in victims.items():
+                try:
+                    os.remove(path)
+                    freed += size
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.log.warning("media_janitor_delete_failed", path=path, error=str(e))
+            self.index.forget(list(victims))
+            report[kind] = {"deleted": len(victims), "freed_bytes": freed}
+        if any(r["deleted"] for r in report.values()):
+            self.log.info("media_janitor_sweep", **report)
+        return report
+
+    def _loop(self) -> None:
+        # Let startup work (model loads, first renders) go first
+        if self._stop.wait(self.delay):
+            return
+        while True:
+            try:
+                if self.index.claim_sweep(self.interval):
+                    self.sweep()
+            except Exception as e:
+                self.log.warning("media_janitor_failed", error=str(e))
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self) -> "MediaJanitor":
+        self._thread = threading.Thread(target=self._loop, name="media-janitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+_indexes: Dict[str, MediaIndex] = {}
+_janitor: Optional[MediaJanitor] = None
+_singleton_lock = threading.Lock()
+
+
+def media_index(path: Optional[str] = None) -> MediaIndex:
+    """Process-wide index for `path` (default: MEDIA_INDEX_DB or data/media_index.db), shared by writers and the janitor."""
+    key = os.path.abspath(path) if path else _default_index_path()
+    with _singleton_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = MediaIndex(key)
+        return index
+
+
+def media_index_for(output_dir: str) -> MediaIndex:
+    """Index for media written under `output_dir`: the one beside it, unless MEDIA_INDEX_DB pins a single index.
+
+    For the default data/tts, data/avatar and data/traces directories this is
+    the default index the janitor sweeps.
+    """
+    if os.getenv("MEDIA_INDEX_DB"):
+        return media_index()
+    return media_index(os.path.join(os.path.dirname(os.path.abspath(output_dir)), INDEX_DB_NAME))
+
+
+def ensure_janitor(index: Optional[MediaIndex] = None) -> Optional[MediaJanitor]:
+    """Start this process's background janitor once (no-op when MEDIA_JANITOR_ENABLED=0).
+
+    The janitor seeds and sweeps the default MEDIA_KINDS directories, so it
+    only runs for the default index; writers with their own index pass it
+    here and get None.
+    """
+    global _janitor
+    if os.getenv("MEDIA_JANITOR_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    if index is not None and os.path.abspath(index.path) != _default_index_path():
+        return None
+    index = media_index()
+    with _singleton_lock:
+        if _janitor is None:
+            _janitor = MediaJanitor(index).start()
+        return _janitor
@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .logging_utils import PipelineLogger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MiB (None when unavailable)."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB (None when unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+
+
+class MemoryMonitor:
+    """Samples RSS in the background and logs it with a caller-supplied gauge.
+
+    `gauge()` returns extra fields for each sample (e.g. in-flight items), so
+    a run's memory can be read next to the window that bounds it. Samples go
+    to the pipeline log as `memory_sample` every ORCH_MEMORY_SAMPLE_SECONDS
+    (default 5; 0 disables the thread, start/end/peak are still reported).
+    """
+
+    def __init__(
+        self,
+        logger: Optional[PipelineLogger] = None,
+        interval: Optional[float] = None,
+        gauge: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
+        self.log = logger or PipelineLogger(component="memory")
+        self.interval = float(interval if interval is not None else os.getenv("ORCH_MEMORY_SAMPLE_SECONDS", "5"))
+        self.gauge = gauge
+        self.start_mb: Optional[float] = None
+        self.sampled_peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> Optional[float]:
+        rss = current_rss_mb()
+        if rss is not None and (self.sampled_peak_mb is None or rss > self.sampled_peak_mb):
+            self.sampled_peak_mb = rss
+        return rss
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = self.sample()
+            extra = {}
+            if self.gauge:
+                try:
+                    extra = self.gauge() or {}
+                except Exception:
+                    extra = {}
+            self.log.info("memory_sample", rss_mb=rss, **extra)
+
+    def start(self) -> "MemoryMonitor":
+        self.start_mb = self.sample()
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._loop, name="memory-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling and return `{rss_start_mb, rss_end_mb, rss_peak_mb, process_peak_mb}`."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        end = self.sample()
+        return {
+            "rss_start_mb": self.start_mb,
+            "rss_end_mb": end,
+            "rss_peak_mb": self.sampled_peak_mb,
+            # Lifetime high-water mark of the process, including earlier runs
+            "process_peak_mb": peak_rss_mb(),
+        }
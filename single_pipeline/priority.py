@@ -0,0 +1,177 @@
+import os
+import math
+import time
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# keys (article ids / group keys) -> {key: {"views", "quality_sum"}}, e.g. server.db.get_engagement_stats
+EngagementLookup = Callable[[List[str]], Dict[str, Dict[str, float]]]
+
+
+def _parse_kv(raw: Optional[str], cast=float) -> Dict[str, Any]:
+    """Parse `key=value,key=value` env overrides."""
+    out: Dict[str, Any] = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.split("=", 1)
+        try:
+            out[k.strip()] = cast(v)
+        except ValueError:
+            continue
+    return out
+
+
+def item_epoch(it: Dict[str, Any]) -> Optional[float]:
+    """Best-effort publish/fetch time of an item as epoch seconds."""
+    ts = (it.get("timestamps") or {}).get("fetched_at") or it.get("timestamp") or it.get("published_at")
+    if ts is None or ts == "":
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts) / (1000.0 if ts > 1e12 else 1.0)
+    try:
+        return datetime.fromisoformat(str(ts).replace("Z", "+00:00")).timestamp()
+    except Exception:
+        try:
+            return float(ts)
+        except Exception:
+            return None
+
+
+class PriorityScorer:
+    """Compute `priority_score` and `trend_score` for filtered items.
+
+    - recency: exponential decay with PRIORITY_RECENCY_HALF_LIFE_HOURS (default 6)
+    - group size: items sharing a RAG group (`dedup_key`) in the batch
+    - engagement: mean quality and volume from /api/metrics/engagement,
+      via the `engagement_lookup` the caller supplies (0 without one)
+
+    trend_score blends group size and engagement; priority_score blends
+    recency and trend using PRIORITY_WEIGHTS (default `recency=0.5,trend=0.5`).
+    A fresh story that many sources are covering therefore ranks highest.
+    """
+
+    def __init__(
+        self,
+        half_life_hours: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+        engagement_lookup: Optional[EngagementLookup] = None,
+    ):
+        self.half_life_hours = float(half_life_hours or os.getenv("PRIORITY_RECENCY_HALF_LIFE_HOURS", "6"))
+        self.weights = {"recency": 0.5, "trend": 0.5}
+        self.weights.update(weights or _parse_kv(os.getenv("PRIORITY_WEIGHTS")))
+        self.group_cap = max(2, int(os.getenv("PRIORITY_GROUP_SIZE_CAP", "8")))
+        self.engagement_lookup = engagement_lookup
+
+    def _engagement(self, keys: List[str]) -> Dict[str, Dict[str, float]]:
+        if not (self.engagement_lookup and keys):
+            return {}
+        try:
+            return self.engagement_lookup(keys) or {}
+        except Exception:
+            return {}
+
+    def recency(self, it: Dict[str, Any], now: float) -> float:
+        ts = item_epoch(it)
+        if ts is None:
+            return 0.5
+        age_h = max(0.0, (now - ts) / 3600.0)
+        return round(math.pow(0.5, age_h / self.half_life_hours), 4)
+
+    def group_size_score(self, n: int) -> float:
+        # 1 item -> 0, cap or more items -> 1, log-scaled in between
+        return round(min(1.0, math.log(max(1, n)) / math.log(self.group_cap)), 4)
+
+    @staticmethod
+    def engagement_score(stats: Optional[Dict[str, float]]) -> float:
+        if not stats:
+            return 0.0
+        views = float(stats.get("views") or 0.0)
+        quality = float(stats.get("quality_sum") or 0.0) / views if views else 0.0
+        return round(quality * min(1.0, math.log1p(views) / math.log1p(50.0)), 4)
+
+    def score(self, items: Iterable[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Set `priority_score`/`trend_score` on each item in place; returns the list."""
+        items = list(items)
+        now = now or time.time()
+        groups: Dict[str, int] = {}
+        for it in items:
+            g = it.get("dedup_key") or it.get("id")
+            if g:
+                groups[g] = groups.get(g, 0) + 1
+        keys = sorted({k for it in items for k in (it.get("dedup_key"), it.get("id")) if k})
+        engagement = self._engagement(keys)
+        w_rec = float(self.weights.get("recency", 0.5))
+        w_trend = float(self.weights.get("trend", 0.5))
+        total_w = (w_rec + w_trend) or 1.0
+        for it in items:
+            g = it.get("dedup_key") or it.get("id")
+            eng = engagement.get(it.get("dedup_key") or "") or engagement.get(it.get("id") or "")
+            trend = 0.5 * self.group_size_score(groups.get(g, 1)) + 0.5 * self.engagement_score(eng)
+            rec = self.recency(it, now)
+            it["trend_score"] = round(trend, 4)
+            it["priority_score"] = round((w_rec * rec + w_trend * trend) / total_w, 4)
+        return items
+
+
+def priority_of(it: Dict[str, Any]) -> float:
+    try:
+        return float(it.get("priority_score") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class DeadlinePolicy:
+    """Per-bucket freshness deadlines for avatar rendering.
+
+    ORCH_BUCKET_DEADLINES (`HI-NEWS=600,EN-NEWS=900`, seconds) gives each
+    bucket a deadline counted from when the item was admitted to the run
+    (`admit()` stamps `admitted_at`; items without it count from run start).
+    Render time is estimated per bucket with an EWMA of observed renders
+    (seeded by ORCH_AVATAR_EST_SECONDS). An item that would finish after its
+    deadline is rendered the cheap way instead of delaying the others.
+    """
+
+    def __init__(self, deadlines: Optional[Dict[str, float]] = None, est_seconds: Optional[float] = None):
+        self.deadlines = dict(deadlines if deadlines is not None else _parse_kv(os.getenv("ORCH_BUCKET_DEADLINES")))
+        self.default_est = float(est_seconds or os.getenv("ORCH_AVATAR_EST_SECONDS", "30"))
+        self._est: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.deadlines)
+
+    @staticmethod
+    def admit(it: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+        """Stamp the time an item enters the run; returns the item."""
+        it.setdefault("admitted_at", now or time.time())
+        return it
+
+    def deadline_at(self, bucket: str, it: Dict[str, Any]) -> Optional[float]:
+        limit = self.deadlines.get(bucket)
+        if limit is None:
+            return None
+        # Feed publish times can be hours old; freshness counts from admission
+        try:
+            admitted = float(it.get("admitted_at") or self.started_at)
+        except (TypeError, ValueError):
+            admitted = self.started_at
+        return admitted + float(limit)
+
+    def estimate(self, bucket: str) -> float:
+        with self._lock:
+            return self._est.get(bucket, self.default_est)
+
+    def observe(self, bucket: str, seconds: float) -> None:
+        with self._lock:
+            prev = self._est.get(bucket)
+            self._est[bucket] = seconds if prev is None else 0.7 * prev + 0.3 * seconds
+
+    def should_degrade(self, bucket: str, it: Dict[str, Any], now: Optional[float] = None) -> bool:
+        deadline = self.deadline_at(bucket, it)
+        if deadline is None:
+            return False
+        return (now or time.time()) + self.estimate(bucket) > deadline
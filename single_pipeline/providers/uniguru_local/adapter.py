@@ -1,4 +1,95 @@
-from typing import Any, Dict, Optional
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
+
+
+_DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(__file__), "keywords.json")
+INDIC_AUDIENCE_LANGS = ("hi", "bn", "ta")
+
+_compiled_cache: Dict[str, "KeywordMatcher"] = {}
+_compiled_lock = threading.Lock()
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """Build a prefix-trie regex so thousands of terms stay a single cheap scan."""
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def _walk(node: Dict[str, Any]) -> str:
+        end = "" in node
+        branches = [re.escape(ch) + _walk(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # Shared prefix is itself a keyword: rest is optional
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return _walk(trie)
+
+
+class KeywordMatcher:
+    """All keyword tables compiled into one word-boundary regex.
+
+    Tables map `table -> label -> [keywords]`; label order is the priority used
+    when several labels of the same table hit. A single `finditer` pass returns
+    every (table, label) hit for the text.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, List[str]]], version: str = "v1"):
+        self.tables = tables
+        self.version = version
+        self._labels_by_kw: Dict[str, List[Tuple[str, str]]] = {}
+        for table, labels in tables.items():
+            for label, kws in labels.items():
+                for kw in kws:
+                    k = str(kw).strip().lower()
+                    if k:
+                        self._labels_by_kw.setdefault(k, []).append((table, label))
+        words = sorted(self._labels_by_kw.keys())
+        self._regex: Optional[Pattern[str]] = None
+        if words:
+            # Optional plural suffix keeps "stocks"/"markets" matching like before
+            self._regex = re.compile(r"\b(" + _trie_pattern(words) + r")(?:e?s)?\b")
+
+    def hits(self, text: str) -> Dict[str, Set[str]]:
+        found: Dict[str, Set[str]] = {}
+        if not self._regex or not text:
+            return found
+        for m in self._regex.finditer(text.lower()):
+            for table, label in self._labels_by_kw.get(m.group(1), []):
+                found.setdefault(table, set()).add(label)
+        return found
+
+    def first(self, table: str, hits: Dict[str, Set[str]], default: str) -> str:
+        table_hits = hits.get(table) or set()
+        for label in (self.tables.get(table) or {}):
+            if label in table_hits:
+                return label
+        return default
+
+
+def load_keyword_matcher(path: Optional[str] = None) -> KeywordMatcher:
+    """Load and compile keyword tables once per file path."""
+    path = os.path.abspath(path or os.getenv("UNIGURU_KEYWORDS_PATH") or _DEFAULT_KEYWORDS_PATH)
+    with _compiled_lock:
+        matcher = _compiled_cache.get(path)
+        if matcher is None:
+            with open(path, "rb") as f:
+                raw = f.read()
+            tables = json.loads(raw.decode("utf-8"))
+            # Version follows the table contents so memoized tags expire on edits
+            matcher = KeywordMatcher(tables, version=hashlib.sha256(raw).hexdigest()[:12])
+            _compiled_cache[path] = matcher
+        return matcher
 
 
 class UniguruLocalAdapter:
@@ -7,48 +98,26 @@ class UniguruLocalAdapter:
     Provides `tag_text(title, body, language)` and returns a dict with
     `category`, `tone`, and `audience` keys. This is heuristic-based and
     deterministic, intended for offline/dev environments.
+
+    Keyword tables live in `keywords.json` (override with UNIGURU_KEYWORDS_PATH)
+    and are compiled into a single matcher that scans the text once.
     """
 
-    def __init__(self):
-        pass
-
-    def _classify_category(self, title: str, body: str) -> Optional[str]:
-        t = (title or "") + " " + (body or "")
-        tl = t.lower()
-        if any(k in tl for k in ["stock", "market", "earnings", "crypto", "finance"]):
-            return "finance"
-        if any(k in tl for k in ["ai", "software", "hardware", "startup", "technology", "tech"]):
-            return "tech"
-        if any(k in tl for k in ["research", "study", "scientists", "space", "biology", "science"]):
-            return "science"
-        return "general"
-
-    def _classify_tone(self, title: str, body: str) -> Optional[str]:
-        tl = ((title or "") + " " + (body or "")).lower()
-        if any(k in tl for k in ["breaking", "urgent", "official", "announced"]):
-            return "formal"
-        if any(k in tl for k in ["tips", "guide", "how to", "explained"]):
-            return "neutral"
-        if any(k in tl for k in ["meme", "lol", "funny", "trend"]):
-            return "casual"
-        return "neutral"
-
-    def _classify_audience(self, language: Optional[str], title: str, body: str) -> str:
+    def __init__(self, keywords_path: Optional[str] = None):
+        self.matcher = load_keyword_matcher(keywords_path)
+        self.version = f"local-{self.matcher.version}"
+
+    def _classify_category(self, hits: Dict[str, Set[str]]) -> Optional[str]:
+        return self.matcher.first("category", hits, "general")
+
+    def _classify_tone(self, hits: Dict[str, Set[str]]) -> Optional[str]:
+        return self.matcher.first("tone", hits, "neutral")
+
+    def _classify_audience(self, language: Optional[str], hits: Dict[str, Set[str]]) -> str:
         lang = (language or "en").lower()
-        tl = ((title or "") + " " + (body or "")).lower()
         # Simple audience routing by keywords and language
-        if lang in ("hi", "bn", "ta"):
-            if any(k in tl for k in ["school", "kids", "young", "students"]):
-                return "kids"
-            if any(k in tl for k in ["youth", "college", "campus", "festival"]):
-                return "youth"
-            return "general"
-        else:
-            if any(k in tl for k in ["kids", "children", "toy", "cartoon"]):
-                return "kids"
-            if any(k in tl for k in ["youth", "college", "sports", "gaming"]):
-                return "youth"
-            return "general"
+        table = "audience_indic" if lang in INDIC_AUDIENCE_LANGS else "audience_default"
+        return self.matcher.first(table, hits, "general")
 
     def tag_text(self, title: str, body: str, language: Optional[str] = None) -> Dict[str, Any]:
         """Return classification tags for given text.
@@ -58,7 +127,8 @@ class UniguruLocalAdapter:
         - tone: one of neutral|formal|casual
         - audience: one of general|kids|youth
         """
-        category = self._classify_category(title, body)
-        tone = self._classify_tone(title, body)
-        audience = self._classify_audience(language, title, body)
-        return {"category": category, "tone": tone, "audience": audience}
\ No newline at end of file
+        hits = self.matcher.hits((title or "") + " " + (body or ""))
+        category = self._classify_category(hits)
+        tone = self._classify_tone(hits)
+        audience = self._classify_audience(language, hits)
+        return {"category": category, "tone": tone, "audience": audience}
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .logging_utils import PipelineLogger
+
+
+# Keys that change on every run without changing what a stage produces;
+# priority/trend scores decay with wall-clock time and only steer ordering
+_VOLATILE_KEYS = {
+    "timestamps", "stage_status", "generated_at", "processed_at", "priority_score", "trend_score", "admitted_at",
+}
+# Output keys that point at artifacts on disk; a missing file forces a redo
+_ARTIFACT_KEYS = ("audio_path", "metadata_path", "video_path")
+
+
+def _data_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "data"))
+
+
+def incremental_enabled() -> bool:
+    return os.getenv("PIPELINE_INCREMENTAL", "0").lower() in ("1", "true", "yes")
+
+
+def _strip_volatile(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _strip_volatile(v) for k, v in obj.items() if k not in _VOLATILE_KEYS}
+    if isinstance(obj, list):
+        return [_strip_volatile(v) for v in obj]
+    return obj
+
+
+def stage_input_hash(stage: str, item: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of everything a stage reads: the item (minus volatile fields) and its parameters."""
+    payload = {"stage": stage, "item": _strip_volatile(item), "params": params or {}}
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Stable item identity: contract `id`, else a hash of title + body."""
+    if item.get("id"):
+        return str(item["id"])
+    title = item.get("title") or (item.get("script") or {}).get("headline") or ""
+    body = item.get("body") or ""
+    return "anon_" + hashlib.sha256((title + "\n" + body).encode("utf-8", errors="ignore")).hexdigest()[:16]
+
+
+class RunStateStore:
+    """Durable per-item, per-stage status and outputs for incremental runs.
+
+    Each finished item is committed immediately, so a crashed run resumes
+    from the last completed item. A stage is skipped when its stored status is
+    `success`, its input hash is unchanged and its artifacts still exist.
+
+    Backed by SQLite at `data/run_state.db` (override with RUN_STATE_DB).
+    """
+
+    def __init__(self, path: Optional[str] = None, logger: Optional[PipelineLogger] = None):
+        self.path = path or os.getenv("RUN_STATE_DB") or os.path.join(_data_root(), "run_state.db")
+        self.log = logger or PipelineLogger(component="run_state")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS item_stage_state (
+                item_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                output TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (item_id, stage)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def get(self, item_id: str, stage: str, input_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the stored output if the stage can be skipped, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT input_hash, status, output FROM item_stage_state WHERE item_id=? AND stage=?",
+                (item_id, stage),
+            ).fetchone()
+        if not row or row[0] != input_hash or row[1] != "success":
+            return None
+        try:
+            output = json.loads(row[2]) if row[2] else None
+        except Exception:
+            return None
+        if not isinstance(output, dict):
+            return None
+        for k in _ARTIFACT_KEYS:
+            p = output.get(k)
+            if p and not os.path.exists(p):
+                return None
+        return output
+
+    def put(self, item_id: str, stage: str, input_hash: str, status: str, output: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO item_stage_state(item_id, stage, input_hash, status, output, updated_at) VALUES(?,?,?,?,?,?)",
+                (item_id, stage, input_hash, status, json.dumps(output, ensure_ascii=False) if output is not None else None, time.time()),
+            )
+            self._conn.commit()
+
+    def status(self, item_id: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, status FROM item_stage_state WHERE item_id=?", (item_id,)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def run_item(
+        self,
+        stage: str,
+        item: Dict[str, Any],
+        fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        params: Optional[Dict[str, Any]] = None,
+        ok: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return (output, skipped). Runs `fn` only when the stored state is stale."""
+        key = item_key(item)
+        h = stage_input_hash(stage, item, params)
+        cached = self.get(key, stage, h)
+        if cached is not None:
+            return cached, True
+        out = fn(item)
+        success = out is not None and (ok(out) if ok else (out.get("status") != "failed"))
+        self.put(key, stage, h, "success" if success else "failed", out)
+        return out, False
+
+    def run_items(
+        self,
+        stage: str,
+        items: List[Dict[str, Any]],
+        fn: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+        params: Optional[Dict[str, Any]] = None,
+        ok: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        outputs: List[Dict[str, Any]] = []
+        counts = {"skipped": 0, "processed": 0}
+        for it in items:
+            out, skipped = self.run_item(stage, it, fn, params, ok)
+            counts["skipped" if skipped else "processed"] += 1
+            if out is not None:
+                outputs.append(out)
+        self.log.info("incremental_stage_done", stage=stage, **counts)
+        return outputs, counts
@@ -2,7 +2,7 @@ import os
 import time
 import json
 import threading
-from .cli import run_fetch, run_filter, run_scripts, run_voice, run_avatar
+from .cli import run_fetch, run_filter, run_scripts, run_voice, run_avatar, server_engagement_lookup
 
 def run_once(registry: str = "single", category: str = "general", voice: str = "en-US-Neural-1", style: str = "news-anchor"):
     out = {}
@@ -27,7 +27,7 @@ def run_once(registry: str = "single", category: str = "general", voice: str = "
                 pass
     except Exception:
         pass
-    out["filter"] = run_filter(registry=registry, category=category)
+    out["filter"] = run_filter(registry=registry, category=category, engagement_lookup=server_engagement_lookup())
     out["scripts"] = run_scripts(registry=registry, category=category)
     out["voice"] = run_voice(registry=registry, category=category, voice=voice)
     out["avatar"] = run_avatar(registry=registry, category=category, style=style)
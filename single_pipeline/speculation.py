@@ -0,0 +1,166 @@
+import os
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .logging_utils import PipelineLogger
+
+
+def speculation_enabled() -> bool:
+    return os.getenv("ORCH_SPECULATIVE", "0").lower() in ("1", "true", "yes")
+
+
+class LatencyWindow:
+    """Sliding window of recent per-item latencies with percentile lookup."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=max(1, int(size)))
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(float(seconds))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self._samples)
+        if not data:
+            return None
+        idx = min(len(data) - 1, max(0, int(round(q / 100.0 * (len(data) - 1)))))
+        return data[idx]
+
+
+class Speculator:
+    """Starts a duplicate of a straggling item and keeps the first good result.
+
+    An attempt counts as a straggler once it has run longer than
+    p95 x ORCH_SPECULATIVE_FACTOR (default 3) of the stage's recent
+    latencies, but never sooner than ORCH_SPECULATIVE_MIN_SECONDS (default 5)
+    and only after ORCH_SPECULATIVE_MIN_SAMPLES (default 10) observations.
+    At most ORCH_SPECULATIVE_MAX_BACKUPS (default 2) duplicates run at once,
+    so speculation only uses spare capacity. The loser's cancel event is set
+    so cooperative providers stop polling or kill their subprocess.
+
+    Attempt functions take `(cancel_event, attempt_tag)`.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        factor: Optional[float] = None,
+        min_seconds: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        max_backups: Optional[int] = None,
+        logger: Optional[PipelineLogger] = None,
+    ):
+        self.stage = stage
+        self.factor = float(factor or os.getenv("ORCH_SPECULATIVE_FACTOR", "3"))
+        self.min_seconds = float(min_seconds if min_seconds is not None else os.getenv("ORCH_SPECULATIVE_MIN_SECONDS", "5"))
+        self.min_samples = int(min_samples if min_samples is not None else os.getenv("ORCH_SPECULATIVE_MIN_SAMPLES", "10"))
+        self.latency = LatencyWindow(int(os.getenv("ORCH_SPECULATIVE_WINDOW", "200")))
+        self.log = logger or PipelineLogger(component="speculation")
+        self._backups = threading.BoundedSemaphore(max(1, int(max_backups or os.getenv("ORCH_SPECULATIVE_MAX_BACKUPS", "2"))))
+        self._stats_lock = threading.Lock()
+        self.stats = {"stragglers": 0, "backups": 0, "backup_wins": 0, "no_spare": 0}
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which an attempt is a straggler, or None while warming up."""
+        if len(self.latency) < self.min_samples:
+            return None
+        p95 = self.latency.percentile(95) or 0.0
+        return max(self.min_seconds, p95 * self.factor)
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def run(
+        self,
+        primary: Callable[[threading.Event, str], Any],
+        backup: Callable[[threading.Event, str], Any],
+        ok: Callable[[Any], bool],
+        label: Optional[Dict[str, Any]] = None,
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Run `primary`; if it straggles, race it against `backup`.
+
+        Returns the first result accepted by `ok`, else the last result (or
+        re-raises the last error) so the caller's retry handling still applies.
+        The winner is decided as each attempt finishes, and every other
+        result, including one that completes after the winner was returned,
+        is passed to `discard` so it can drop side effects such as temp files.
+        """
+        label = label or {}
+        done: "queue.Queue" = queue.Queue()
+        cancels = {"primary": threading.Event(), "backup": threading.Event()}
+        state: Dict[str, Any] = {"winner": None}
+        state_lock = threading.Lock()
+
+        def _attempt(tag: str, fn: Callable[[threading.Event, str], Any], release: bool) -> None:
+            try:
+                out, err = fn(cancels[tag], tag), None
+            except Exception as e:
+                out, err = None, e
+            try:
+                with state_lock:
+                    lost = state["winner"] is not None
+                    if not lost and err is None and ok(out):
+                        state["winner"] = tag
+                if lost and discard is not None and err is None:
+                    discard(out)
+                done.put((tag, out, err))
+            finally:
+                if release:
+                    self._backups.release()
+
+        started = threading.Thread(target=_attempt, args=("primary", primary, False), daemon=True)
+        started.start()
+        limit = self.threshold()
+        pending = 1
+        try:
+            first = done.get(timeout=limit) if limit is not None else done.get()
+        except queue.Empty:
+            first = None
+            self._count("stragglers")
+            if self._backups.acquire(blocking=False):
+                self._count("backups")
+                self.log.warning("straggler_speculating", stage=self.stage, threshold_seconds=round(limit or 0.0, 2), **label)
+                threading.Thread(target=_attempt, args=("backup", backup, True), daemon=True).start()
+                pending = 2
+            else:
+                self._count("no_spare")
+                self.log.warning("straggler_no_spare_worker", stage=self.stage, threshold_seconds=round(limit or 0.0, 2), **label)
+
+        last = first
+        failed = []
+        while True:
+            if last is None:
+                last = done.get()
+            pending -= 1
+            tag, out, err = last
+            if state["winner"] == tag:
+                other = "backup" if tag == "primary" else "primary"
+                cancels[other].set()
+                if tag == "backup":
+                    self._count("backup_wins")
+                    self.log.info("speculative_backup_won", stage=self.stage, **label)
+                if discard is not None:
+                    for o in failed:
+                        discard(o)
+                return out
+            if pending <= 0:
+                # No winner: only the last outcome goes back to the caller
+                if discard is not None:
+                    for o in failed:
+                        discard(o)
+                if err is not None:
+                    raise err
+                return out
+            if err is None:
+                failed.append(out)
+            last = None
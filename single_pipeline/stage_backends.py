@@ -0,0 +1,188 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from .agents.script_gen_agent import ScriptGenAgent
+from .agents.tts_agent_stub import TTSAgentStub
+from .agents.avatar_agent_stub import AvatarAgentStub
+from .tts_pool import TTSPool
+
+
+BACKENDS = ("threads", "processes", "inline", "pool")
+STAGE_KINDS = ("scripts", "voice", "avatar")
+
+# Warm agents, one set per process (and shared by threads within it)
+_agents: Dict[Tuple[str, str], Any] = {}
+_agents_lock = threading.Lock()
+
+
+def _agent_for(kind: str, config: Dict[str, Any]) -> Any:
+    key = (kind, str(config.get("voice") or config.get("style") or ""))
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is None:
+            if kind == "scripts":
+                agent = ScriptGenAgent()
+            elif kind == "voice":
+                agent = TTSAgentStub(voice=config.get("voice") or "en-US-Neural-1")
+            elif kind == "avatar":
+                agent = AvatarAgentStub(style=config.get("style") or "news-anchor")
+            else:
+                raise ValueError(f"unknown stage kind: {kind}")
+            _agents[key] = agent
+        return agent
+
+
+def run_stage_item(
+    kind: str,
+    config: Dict[str, Any],
+    item: Dict[str, Any],
+    category: str = "general",
+    cancel: Optional[threading.Event] = None,
+) -> Dict[str, Any]:
+    """Run one item through a stage agent. Top-level so process pools can pickle it.
+
+    `config` and `item` must be plain JSON-like dicts; agents are created on
+    first use in each worker and reused for later items. `cancel` only
+    reaches in-process backends.
+    """
+    agent = _agent_for(kind, config)
+    if kind == "scripts":
+        return agent.generate_item(item)
+    if kind == "voice":
+        return agent.synthesize_item(item, category=category)
+    return agent.render_item(item, category=category, provider=config.get("provider"),
+                             cancel=cancel, attempt=config.get("attempt"))
+
+
+def _warm_worker() -> None:
+    # Build the cheap agents up front so the first job does not pay for it
+    try:
+        _agent_for("scripts", {})
+    except Exception:
+        pass
+
+
+class _InlineExecutor(Executor):
+    """Runs work in the calling thread, one call at a time.
+
+    Useful for debugging and for providers that are not thread-safe
+    (e.g. a shared pyttsx3 engine).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+        return fut
+
+
+def parse_stage_backends(raw: Optional[str]) -> Dict[str, str]:
+    """Parse `scripts=inline,voice=processes,avatar=threads`; unknown values fall back to threads.
+
+    `pool` (a shared TTSPool) only applies to the voice stage.
+    """
+    out = {k: "threads" for k in STAGE_KINDS}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.split("=", 1)
+        k, v = k.strip(), v.strip().lower()
+        if k in out:
+            out[k] = v if v in BACKENDS and (v != "pool" or k == "voice") else "threads"
+    return out
+
+
+class StageBackends:
+    """Per-stage executor backends (threads, processes or inline).
+
+    Callers keep their own concurrency (bucket caps, stage worker threads) and
+    use `call()` to run the CPU-heavy part of an item on the stage's backend:
+    `threads` runs it on the caller's worker thread, `inline` serializes the
+    stage in this process, `processes` ships it to a process pool, and
+    `pool` (voice only) queues it on a TTSPool whose workers keep their TTS
+    engines warm and whose size is set per provider (TTS_POOL_SIZES).
+    Process pools are shared by all stages configured as `processes` and sized
+    to the core count (ORCH_PROCESS_WORKERS), so GIL-bound work such as the
+    stub WAV synthesis and script generation spreads over every core.
+
+    Configure with ORCH_STAGE_BACKENDS, e.g. `voice=processes,scripts=processes`.
+    """
+
+    def __init__(self, backends: Optional[Dict[str, str]] = None, process_workers: Optional[int] = None):
+        self.backends = dict(backends or parse_stage_backends(os.getenv("ORCH_STAGE_BACKENDS")))
+        self.process_workers = int(process_workers or os.getenv("ORCH_PROCESS_WORKERS") or (os.cpu_count() or 2))
+        self._executors: Dict[str, Executor] = {}
+        self._tts_pool: Optional[TTSPool] = None
+        self._lock = threading.Lock()
+
+    def _voice_pool(self) -> TTSPool:
+        with self._lock:
+            if self._tts_pool is None:
+                self._tts_pool = TTSPool()
+            return self._tts_pool
+
+    def _executor(self, kind: str) -> Executor:
+        backend = self.backends.get(kind, "threads")
+        with self._lock:
+            ex = self._executors.get(backend)
+            if ex is None:
+                if backend == "processes":
+                    # spawn: forking a process that already runs threads can deadlock
+                    ctx = multiprocessing.get_context(os.getenv("ORCH_MP_START_METHOD", "spawn"))
+                    ex = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=ctx, initializer=_warm_worker)
+                else:
+                    ex = _InlineExecutor()
+                self._executors[backend] = ex
+            return ex
+
+    def submit(self, kind: str, config: Dict[str, Any], item: Dict[str, Any], category: str = "general") -> Future:
+        return self._executor(kind).submit(run_stage_item, kind, dict(config), item, category)
+
+    def call(
+        self,
+        kind: str,
+        config: Dict[str, Any],
+        item: Dict[str, Any],
+        category: str = "general",
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """Run one item on the stage's backend and wait for the result.
+
+        A process-backed call cannot see `cancel`; a cancelled attempt there
+        runs to completion and its result is simply discarded by the caller.
+        """
+        backend = self.backends.get(kind, "threads")
+        if backend == "threads":
+            # Already on a worker thread; hopping to another thread pool adds nothing
+            return run_stage_item(kind, config, item, category, cancel)
+        if backend == "pool":
+            return self._voice_pool().synthesize_item(item, category=category, voice=config.get("voice"))
+        if backend == "inline":
+            return self._executor(kind).submit(run_stage_item, kind, dict(config), item, category, cancel).result()
+        return self.submit(kind, config, item, category).result()
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Stop the pools; a later call() lazily starts fresh ones."""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors = {}
+            tts_pool, self._tts_pool = self._tts_pool, None
+        if tts_pool is not None:
+            tts_pool.close()
+        for ex in executors:
+            ex.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def describe(self) -> Dict[str, Any]:
+        out = {"backends": dict(self.backends), "process_workers": self.process_workers}
+        if self.backends.get("voice") == "pool":
+            out["tts_pool_workers"] = self._tts_pool.size if self._tts_pool else None
+        return out
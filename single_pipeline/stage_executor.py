@@ -0,0 +1,267 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .logging_utils import PipelineLogger
+
+
+StageFn = Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class StageSpec:
+    """Configuration for one stage of a PipelinedExecutor.
+
+    - fn(bucket, item) returns the item for the next stage, or None to drop it
+    - workers: size of this stage's worker pool
+    - queue_size: bound on the stage's input queue (backpressure upstream)
+    - bucket_caps: max items of a bucket in flight in this stage at once
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: StageFn,
+        workers: int = 1,
+        queue_size: int = 16,
+        bucket_caps: Optional[Dict[str, int]] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.bucket_caps = dict(bucket_caps or {})
+
+
+class BucketQueue:
+    """Bounded multi-bucket queue with per-bucket in-flight caps.
+
+    `get()` hands out the next item from the first bucket (in `order`) that
+    has work and is below its cap; buckets not listed in `order` come last.
+    With a `priority` function, the highest-priority eligible item across
+    buckets goes first instead (ties keep bucket order, then FIFO).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        caps: Optional[Dict[str, int]] = None,
+        order: Optional[List[str]] = None,
+        priority: Optional[Callable[[Dict[str, Any]], float]] = None,
+    ):
+        self.maxsize = maxsize
+        self.caps = dict(caps or {})
+        self.order = list(order or [])
+        self.priority = priority
+        self._items: Dict[str, List[Tuple[float, int, Dict[str, Any]]]] = {}
+        self._seq = itertools.count()
+        self._inflight: Dict[str, int] = {}
+        self._size = 0
+        self._closed = False
+        self._cv = threading.Condition()
+
+    def put(self, bucket: str, item: Dict[str, Any]) -> None:
+        with self._cv:
+            while self._size >= self.maxsize and not self._closed:
+                self._cv.wait()
+            prio = -float(self.priority(item)) if self.priority else 0.0
+            heapq.heappush(self._items.setdefault(bucket, []), (prio, next(self._seq), item))
+            self._size += 1
+            self._cv.notify_all()
+
+    def _pick(self) -> Optional[str]:
+        ordered = self.order + sorted(b for b in self._items if b not in self.order)
+        best: Optional[str] = None
+        for b in ordered:
+            if self._items.get(b) and self._inflight.get(b, 0) < self.caps.get(b, 1 << 30):
+                if not self.priority:
+                    return b
+                if best is None or self._items[b][0][0] < self._items[best][0][0]:
+                    best = b
+        return best
+
+    def _take(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        # Caller holds self._cv
+        b = self._pick()
+        if b is None:
+            return None
+        item = heapq.heappop(self._items[b])[2]
+        self._size -= 1
+        self._inflight[b] = self._inflight.get(b, 0) + 1
+        self._cv.notify_all()
+        return b, item
+
+    def get(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Block until an eligible item exists; None once closed and drained."""
+        with self._cv:
+            while True:
+                got = self._take()
+                if got is not None:
+                    return got
+                if self._closed and self._size == 0:
+                    return None
+                self._cv.wait()
+
+    def try_get(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Non-blocking `get`: None when no bucket has eligible work right now."""
+        with self._cv:
+            return self._take()
+
+    def task_done(self, bucket: str) -> None:
+        with self._cv:
+            self._inflight[bucket] = max(0, self._inflight.get(bucket, 0) - 1)
+            self._cv.notify_all()
+
+    def set_caps(self, caps: Dict[str, int]) -> None:
+        with self._cv:
+            self.caps = dict(caps)
+            self._cv.notify_all()
+
+    def close(self) -> None:
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+
+    def depth(self) -> Dict[str, int]:
+        with self._cv:
+            return {b: len(q) for b, q in self._items.items() if q}
+
+
+class PipelinedExecutor:
+    """Stage-pipelined executor: each stage has its own worker pool and queue.
+
+    Items move to the next stage as soon as they finish the current one, so
+    CPU-bound and I/O-bound stages overlap and the makespan approaches that of
+    the slowest stage instead of the sum of all stages.
+
+    With `max_inflight`, `submit()` blocks while that many items are inside
+    the pipeline (queued or being worked on in any stage), so memory stays
+    bounded by the window however large the input is.
+    """
+
+    def __init__(
+        self,
+        stages: List[StageSpec],
+        order: Optional[List[str]] = None,
+        logger: Optional[PipelineLogger] = None,
+        on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        priority: Optional[Callable[[Dict[str, Any]], float]] = None,
+        max_inflight: Optional[int] = None,
+    ):
+        if not stages:
+            raise ValueError("PipelinedExecutor needs at least one stage")
+        self.stages = stages
+        self.log = logger or PipelineLogger(component="stage_executor")
+        self.on_result = on_result
+        self.queues = [BucketQueue(s.queue_size, s.bucket_caps, order, priority) for s in stages]
+        self.stats: Dict[str, Dict[str, Any]] = {
+            s.name: {"in": 0, "out": 0, "dropped": 0, "errors": 0, "busy_ms": 0} for s in stages
+        }
+        # bucket -> stage -> items dropped there (fn returned None or raised)
+        self.failed: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._threads: List[List[threading.Thread]] = []
+        self._alive = [0] * len(stages)
+        self._alive_lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self.max_inflight = max(1, int(max_inflight)) if max_inflight else None
+        self._inflight = 0
+        self._peak_inflight = 0
+        self._window = threading.Condition()
+
+    def inflight(self) -> int:
+        with self._window:
+            return self._inflight
+
+    def _release(self) -> None:
+        with self._window:
+            self._inflight -= 1
+            self._window.notify_all()
+
+    def _count(self, stage: str, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[stage][key] += n
+
+    def _worker(self, idx: int) -> None:
+        spec = self.stages[idx]
+        q = self.queues[idx]
+        nxt = self.queues[idx + 1] if idx + 1 < len(self.queues) else None
+        try:
+            while True:
+                got = q.get()
+                if got is None:
+                    return
+                bucket, item = got
+                self._count(spec.name, "in")
+                started = time.time()
+                try:
+                    out = spec.fn(bucket, item)
+                except Exception as e:
+                    out = None
+                    self._count(spec.name, "errors")
+                    self.log.error("stage_item_failed", stage=spec.name, bucket=bucket, error=str(e))
+                finally:
+                    self._count(spec.name, "busy_ms", int((time.time() - started) * 1000))
+                    q.task_done(bucket)
+                if out is None:
+                    self._count(spec.name, "dropped")
+                    with self._stats_lock:
+                        per_stage = self.failed.setdefault(bucket, {})
+                        per_stage[spec.name] = per_stage.get(spec.name, 0) + 1
+                    self._release()
+                    continue
+                self._count(spec.name, "out")
+                if nxt is not None:
+                    nxt.put(bucket, out)
+                    continue
+                if self.on_result:
+                    try:
+                        self.on_result(bucket, out)
+                    except Exception as e:
+                        self.log.warning("stage_on_result_failed", bucket=bucket, error=str(e))
+                self._release()
+        finally:
+            with self._alive_lock:
+                self._alive[idx] -= 1
+                last = self._alive[idx] == 0
+            # Last worker out closes the downstream queue so it can drain
+            if last and nxt is not None:
+                nxt.close()
+
+    def start(self) -> None:
+        self._started_at = time.time()
+        for idx, spec in enumerate(self.stages):
+            self._alive[idx] = spec.workers
+            pool = []
+            for n in range(spec.workers):
+                t = threading.Thread(target=self._worker, args=(idx,), name=f"{spec.name}-{n}", daemon=True)
+                t.start()
+                pool.append(t)
+            self._threads.append(pool)
+
+    def submit(self, bucket: str, item: Dict[str, Any]) -> None:
+        """Enqueue an item for the first stage; blocks while that queue or the in-flight window is full."""
+        with self._window:
+            while self.max_inflight is not None and self._inflight >= self.max_inflight:
+                self._window.wait()
+            self._inflight += 1
+            self._peak_inflight = max(self._peak_inflight, self._inflight)
+        self.queues[0].put(bucket, item)
+
+    def close_and_wait(self) -> Dict[str, Any]:
+        """Signal end of input, wait for every stage to drain and return stats.
+
+        `failed` maps bucket -> stage -> number of items dropped in that stage.
+        """
+        self.queues[0].close()
+        for pool in self._threads:
+            for t in pool:
+                t.join()
+        elapsed = time.time() - (self._started_at or time.time())
+        return {
+            "stages": {k: dict(v) for k, v in self.stats.items()},
+            "failed": {b: dict(v) for b, v in self.failed.items()},
+            "elapsed_seconds": round(elapsed, 3),
+            "peak_inflight": self._peak_inflight,
+        }
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .agents.filter_agent import FilterAgent
+from .agents.script_gen_agent import ScriptGenAgent
+from .agents.tts_agent_stub import TTSAgentStub
+from .agents.avatar_agent_stub import AvatarAgentStub
+from .logging_utils import StageLogger, PipelineLogger
+from .priority import EngagementLookup
+
+
+STREAM_STAGES = ["filter", "scripts", "voice", "avatar"]
+
+_END = object()
+
+
+def _output_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "output"))
+
+
+def _sanitize_identifier(s: str) -> str:
+    import re as _re
+    cleaned = _re.sub(r"[^a-zA-Z0-9_-]", "", (s or "").strip())
+    return cleaned or "default"
+
+
+def iter_json_array(path: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the whole file.
+
+    Reads `chunk_size` characters at a time and decodes one element at a
+    time, so memory is bounded by the largest element rather than the file.
+    Raises ValueError on malformed input.
+    """
+    dec = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+        expect = "["  # next structural token: "[", then a value, then "," or "]"
+
+        def _fill() -> bool:
+            nonlocal buf, pos, eof
+            more = f.read(chunk_size)
+            buf, pos = buf[pos:] + more, 0
+            eof = not more
+            return bool(more)
+
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos >= len(buf):
+                if not _fill():
+                    raise ValueError("unexpected end of JSON array")
+                continue
+            ch = buf[pos]
+            if expect == "[":
+                if ch != "[":
+                    raise ValueError("expected a JSON array")
+                pos, expect = pos + 1, "first"
+            elif expect in ("first", "value"):
+                if ch == "]" and expect == "first":
+                    return
+                try:
+                    value, end = dec.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not _fill() and eof:
+                        raise ValueError("malformed JSON array element")
+                    continue
+                # A value ending at the buffer edge (e.g. a number) may continue in the next chunk
+                if end >= len(buf) and not eof:
+                    _fill()
+                    continue
+                yield value
+                pos, expect = end, "sep"
+                if pos > chunk_size:
+                    buf, pos = buf[pos:], 0
+            else:
+                if ch == "]":
+                    return
+                if ch != ",":
+                    raise ValueError("expected ',' or ']' in JSON array")
+                pos, expect = pos + 1, "value"
+
+
+def iter_json_items(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield items from a `*_items.json` style file (list or {"items": [...]}).
+
+    Top-level lists are streamed element by element; the `{"items": [...]}`
+    form is small in practice and is loaded whole. A malformed file ends
+    the iteration early.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            head = f.read(64).lstrip()
+    except Exception:
+        return
+    if head.startswith("["):
+        try:
+            for it in iter_json_array(path):
+                if isinstance(it, dict):
+                    yield it
+        except (OSError, ValueError):
+            return
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return
+    items = data if isinstance(data, list) else (data.get("items") or [])
+    for it in items:
+        if isinstance(it, dict):
+            yield it
+
+
+class JsonArraySink:
+    """Append-only writer that produces a valid JSON list without buffering items."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._tmp_path = path + ".partial"
+        self._fh = open(self._tmp_path, "w", encoding="utf-8")
+        self._fh.write("[")
+        self._lock = threading.Lock()
+
+    def write(self, item: Dict[str, Any]) -> None:
+        with self._lock:
+            self._fh.write(("," if self.count else "") + "\n  " + json.dumps(item, ensure_ascii=False))
+            self._fh.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._fh.write("\n]\n" if self.count else "]\n")
+            self._fh.close()
+            os.replace(self._tmp_path, self.path)
+
+
+class _Stage(threading.Thread):
+    """One pipeline stage: pulls from `inq`, pushes results to `outq`.
+
+    `fn` returns an item, None (dropped), or a list of items.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any]], Any], inq: "queue.Queue", outq: "queue.Queue",
+                 log: PipelineLogger, sink: Optional[JsonArraySink] = None):
+        super().__init__(name=f"stream-{name}", daemon=True)
+        self.stage = name
+        self.fn = fn
+        self.inq = inq
+        self.outq = outq
+        self.log = log
+        self.sink = sink
+        self.stats = {"in": 0, "out": 0, "dropped": 0, "errors": 0, "busy_ms": 0}
+
+    def run(self) -> None:
+        while True:
+            it = self.inq.get()
+            if it is _END:
+                self.outq.put(_END)
+                return
+            self.stats["in"] += 1
+            started = time.time()
+            try:
+                res = self.fn(it)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.log.error("stream_stage_failed", stage=self.stage, error=str(e))
+                res = None
+            self.stats["busy_ms"] += int((time.time() - started) * 1000)
+            outs = res if isinstance(res, list) else ([res] if res is not None else [])
+            if not outs:
+                self.stats["dropped"] += 1
+            for out in outs:
+                self.stats["out"] += 1
+                if self.sink:
+                    self.sink.write(out)
+                self.outq.put(out)
+
+
+def run_streaming(
+    registry: str = "single",
+    category: str = "general",
+    voice: str = "en-US-Neural-1",
+    style: str = "news-anchor",
+    items: Optional[Iterable[Dict[str, Any]]] = None,
+    buffer_size: Optional[int] = None,
+    write_sinks: bool = True,
+    limit: Optional[int] = None,
+    on_output: Optional[Callable[[Dict[str, Any]], None]] = None,
+    engagement_lookup: Optional[EngagementLookup] = None,
+) -> Dict[str, Any]:
+    """Run filter -> scripts -> voice -> avatar with items flowing one at a time.
+
+    Stages run in their own threads connected by bounded queues
+    (STREAM_BUFFER_SIZE, default 4), so the first video is produced after
+    one item has passed every stage rather than after the whole batch.
+    Per-stage `{registry}_{stage}.json` files are optional sinks written
+    incrementally when `write_sinks` is set.
+    """
+    log = PipelineLogger(component="stream_pipeline")
+    run = StageLogger(source="pipeline", category=category, meta={"registry": registry, "mode": "stream"})
+    run.start("stream")
+    size = buffer_size or int(os.getenv("STREAM_BUFFER_SIZE", "4"))
+    name = _sanitize_identifier(registry)
+    if items is None:
+        items = iter_json_items(os.path.join(_output_root(), f"{name}_items.json"))
+
+    filter_agent = FilterAgent(engagement_lookup=engagement_lookup)
+    filter_agent.begin_batch()
+    script_agent = ScriptGenAgent(logger=log)
+    tts_agent = TTSAgentStub(voice=voice, logger=log)
+    avatar_agent = AvatarAgentStub(style=style, logger=log)
+
+    def _voice(s: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return tts_agent.synthesize_item(s, category=category)
+
+    def _avatar(v: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if v.get("status") != "success" or not v.get("audio_path"):
+            return None
+        return avatar_agent.render_item(v, category=category)
+
+    fns: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+        "filter": lambda it: filter_agent.filter_item(it, logger=log),
+        "scripts": script_agent.generate_item,
+        "voice": _voice,
+        "avatar": _avatar,
+    }
+    suffix = {"filter": "filtered", "scripts": "scripts", "voice": "voice", "avatar": "avatar"}
+
+    queues = [queue.Queue(maxsize=size) for _ in range(len(STREAM_STAGES) + 1)]
+    sinks: Dict[str, JsonArraySink] = {}
+    stages: List[_Stage] = []
+    for idx, stage in enumerate(STREAM_STAGES):
+        sink = None
+        if write_sinks:
+            sink = JsonArraySink(os.path.join(_output_root(), f"{name}_{suffix[stage]}.json"))
+            sinks[stage] = sink
+        stages.append(_Stage(stage, fns[stage], queues[idx], queues[idx + 1], log, sink))
+
+    started = time.time()
+    first_output_s: Optional[float] = None
+    outputs = 0
+    for st in stages:
+        st.start()
+
+    def _feed() -> None:
+        n = 0
+        try:
+            for it in items:
+                if isinstance(limit, int) and limit > 0 and n >= limit:
+                    break
+                queues[0].put(it)
+                n += 1
+        except Exception as e:
+            log.error("stream_source_failed", error=str(e))
+        finally:
+            queues[0].put(_END)
+
+    feeder = threading.Thread(target=_feed, name="stream-source", daemon=True)
+    feeder.start()
+
+    final_q = queues[-1]
+    while True:
+        out = final_q.get()
+        if out is _END:
+            break
+        outputs += 1
+        if first_output_s is None:
+            first_output_s = round(time.time() - started, 3)
+            log.info("stream_first_output", seconds=first_output_s)
+        if on_output:
+            try:
+                on_output(out)
+            except Exception as e:
+                log.warning("stream_on_output_failed", error=str(e))
+
+    feeder.join()
+    for st in stages:
+        st.join()
+    for sink in sinks.values():
+        sink.close()
+    filter_agent.end_batch(log)
+
+    summary = {
+        "mode": "stream",
+        "count": outputs,
+        "buffer_size": size,
+        "first_output_seconds": first_output_s,
+        "total_seconds": round(time.time() - started, 3),
+        "stages": {st.stage: st.stats for st in stages},
+        "files": {stage: sink.path for stage, sink in sinks.items()},
+        "cascade": filter_agent.last_stats,
+    }
+    run.complete("stream", meta={"count": outputs, "first_output_seconds": first_output_s})
+    run.end_run("completed")
+    return summary
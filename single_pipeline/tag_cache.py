@@ -0,0 +1,152 @@
+import json
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .logging_utils import PipelineLogger
+
+
+def tagger_version(tagger: Any) -> str:
+    """Best-effort version string for a tagger; changes invalidate memoized tags."""
+    v = getattr(tagger, "version", None) or os.getenv("UNIGURU_TAGGER_VERSION") or "v1"
+    return f"{type(tagger).__name__}:{v}"
+
+
+class TagCache:
+    """Persistent memo cache for Uniguru tagging results.
+
+    Keys are sha256(title + body) + language + tagger version, so the same
+    article reappearing in a feed (or a rerun of the filter stage) reuses its
+    tags instead of calling the remote service or re-running local matching.
+    Stored as JSON next to the RAG cache; bounded by TTL and entry count.
+
+    Env overrides: TAG_CACHE_ENABLED (default 1), TAG_CACHE_MAX_ENTRIES
+    (default 20000), TAG_CACHE_TTL_SECONDS (default 7 days).
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, logger: Optional[PipelineLogger] = None):
+        self.logger = logger or PipelineLogger(component="tag_cache")
+        self.enabled = os.getenv("TAG_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+        self.max_entries = int(os.getenv("TAG_CACHE_MAX_ENTRIES", "20000"))
+        self.ttl_seconds = int(os.getenv("TAG_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.cache_path = cache_path or self._default_path()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _default_path(self) -> Optional[str]:
+        for root in (
+            os.path.join(os.path.dirname(__file__), "output"),
+            os.path.join(tempfile.gettempdir(), "single_pipeline_output"),
+        ):
+            try:
+                os.makedirs(root, exist_ok=True)
+                return os.path.join(root, "tag_cache.json")
+            except Exception:
+                continue
+        return None
+
+    def _load(self) -> None:
+        if not (self.enabled and self.cache_path and os.path.exists(self.cache_path)):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            data = json.loads(content) if content else {}
+            # Oldest-used first so LRU eviction order survives restarts
+            for k, v in sorted(data.items(), key=lambda kv: float(kv[1].get("used") or 0.0)):
+                self._entries[k] = v
+            self._prune(time.time())
+        except Exception as e:
+            self.logger.warning("tag_cache_load_failed", detail=str(e), path=str(self.cache_path))
+            self._entries = OrderedDict()
+
+    def _prune(self, now: float) -> None:
+        if self.ttl_seconds > 0:
+            cutoff = now - self.ttl_seconds
+            expired = [k for k, v in self._entries.items() if float(v.get("ts") or 0.0) < cutoff]
+            for k in expired:
+                del self._entries[k]
+                self._dirty = True
+        while self.max_entries > 0 and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._dirty = True
+
+    @staticmethod
+    def make_key(title: str, body: str, language: Optional[str], version: str) -> str:
+        h = hashlib.sha256(((title or "") + "\n" + (body or "")).encode("utf-8", errors="ignore")).hexdigest()
+        return f"{h}|{(language or '').lower()}|{version}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds > 0 and now - float(entry.get("ts") or 0.0) > self.ttl_seconds:
+                del self._entries[key]
+                self._dirty = True
+                return None
+            entry["used"] = now
+            self._entries.move_to_end(key)
+            self._dirty = True
+            return dict(entry.get("tags") or {})
+
+    def put(self, key: str, tags: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {"tags": dict(tags), "ts": now, "used": now}
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self._prune(now)
+
+    def tag(self, tagger: Any, title: str, body: str, language: Optional[str]) -> Dict[str, Any]:
+        """Return memoized tags, calling `tagger.tag_text` only on a miss."""
+        key = self.make_key(title, body, language, tagger_version(tagger))
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        tags = tagger.tag_text(title=title, body=body, language=language)
+        if isinstance(tags, dict):
+            self.put(key, tags)
+        return tags
+
+    def flush(self) -> None:
+        """Persist entries if anything changed since the last flush."""
+        if not (self.enabled and self.cache_path and self._dirty):
+            return
+        with self._lock:
+            try:
+                tmp_path = self.cache_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(dict(self._entries), f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_path)
+                self._dirty = False
+            except Exception as e:
+                self.logger.error("tag_cache_save_failed", detail=str(e), path=str(self.cache_path))
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+        }
@@ -2,7 +2,9 @@ import os
 import json
 import uuid
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set
+
+from .media_janitor import MediaIndex, ensure_janitor, media_index_for
 
 
 def _traces_root() -> str:
@@ -21,25 +23,15 @@ def _redact(obj: Any) -> Any:
 
 
 class TraceLogger:
-    def __init__(self, retention_days: int = 7):
+    def __init__(self, retention_days: int = 7, root: Optional[str] = None, index: Optional[MediaIndex] = None):
         self.retention_days = retention_days
-        os.makedirs(_traces_root(), exist_ok=True)
-        self._maybe_cleanup()
-
-    def _maybe_cleanup(self) -> None:
-        # Best-effort cleanup: remove files older than retention
-        cutoff = time.time() - self.retention_days * 86400
-        root = _traces_root()
-        try:
-            for name in os.listdir(root):
-                path = os.path.join(root, name)
-                try:
-                    if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
-                        os.remove(path)
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        self.root = root or _traces_root()
+        os.makedirs(self.root, exist_ok=True)
+        # Retention runs in the background janitor; each trace file is indexed on first write and
+        # touched with its new size on every append, so a live file never expires and quotas stay exact
+        self._indexed: Set[str] = set()
+        self.media = index or media_index_for(self.root)
+        ensure_janitor(self.media)
 
     def log(self, stage: str, input_payload: Optional[Dict[str, Any]] = None, output_payload: Optional[Dict[str, Any]] = None, status: str = "running") -> str:
         trace_id = str(uuid.uuid4())
@@ -51,7 +43,13 @@ class TraceLogger:
             "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "status": status,
         }
-        path = os.path.join(_traces_root(), f"{stage}.jsonl")
+        path = os.path.join(self.root, f"{stage}.jsonl")
         with open(path, "a", encoding="utf-8") as f:
             f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            size = f.tell()
+        index = self.media
+        # Re-record when the janitor removed the row (and the file) since the last append
+        if stage not in self._indexed or not index.touch(path, size):
+            self._indexed.add(stage)
+            index.record(path, "trace", self.retention_days)
         return trace_id
\ No newline at end of file
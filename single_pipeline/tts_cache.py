@@ -0,0 +1,200 @@
+import json
+import os
+import time
+import wave
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from .logging_utils import PipelineLogger
+
+
+INDEX_NAME = "tts_cache.db"
+# Earlier JSON index; imported once into a new SQLite index
+LEGACY_INDEX_NAME = "tts_cache.json"
+# Bump when the synthesized audio for the same inputs changes
+SYNTH_VERSION = "v1"
+
+
+def wav_duration(path: str) -> Optional[float]:
+    try:
+        with wave.open(path, "rb") as wf:
+            return round(wf.getnframes() / float(wf.getframerate() or 16000), 3)
+    except Exception:
+        return None
+
+
+class TTSCache:
+    """Content-addressed index of synthesized narration audio.
+
+    Keys are sha256 over narration text, voice, rate, sample rate, provider
+    and synth version, so an unchanged script maps to the audio file that was
+    already written for it (by this or another article) and synthesis is
+    skipped. The index is a SQLite table next to the audio (`tts_cache.db`)
+    recording each file's path (relative to the audio directory, so the
+    directory can move), size and duration; a miss writes one row, so
+    persisting stays O(1) however large the cache grows, and processes
+    sharing the directory see each other's entries. An entry whose file was
+    removed by retention cleanup, no longer has its recorded size or resolves
+    outside the audio directory is dropped on lookup.
+
+    Env overrides: TTS_CACHE_ENABLED (default 1), TTS_CACHE_MAX_ENTRIES
+    (default 20000).
+    """
+
+    def __init__(self, audio_dir: str, logger: Optional[PipelineLogger] = None):
+        self.logger = logger or PipelineLogger(component="tts_cache")
+        self.enabled = os.getenv("TTS_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+        self.max_entries = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "20000"))
+        self.audio_dir = os.path.abspath(audio_dir)
+        self.index_path = os.path.join(audio_dir, INDEX_NAME)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._count = 0
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            self._open(audio_dir)
+
+    def _open(self, audio_dir: str) -> None:
+        try:
+            os.makedirs(audio_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.index_path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    duration_seconds REAL,
+                    provider TEXT,
+                    ts REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_ts ON entries(ts);
+                """
+            )
+            self._conn.commit()
+            self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if self._count == 0:
+                self._import_legacy(os.path.join(audio_dir, LEGACY_INDEX_NAME))
+        except Exception as e:
+            self.logger.warning("tts_cache_load_failed", detail=str(e), path=self.index_path)
+            self._conn = None
+
+    def _relative(self, path: str) -> Optional[str]:
+        """`path` relative to the audio directory, or None when it lies outside it."""
+        root, full = os.path.realpath(self.audio_dir), os.path.realpath(path)
+        try:
+            inside = full != root and os.path.commonpath([root, full]) == root
+        except ValueError:  # different drives
+            inside = False
+        return os.path.relpath(full, root) if inside else None
+
+    def _resolve(self, stored: str) -> Optional[str]:
+        """Absolute path of a stored entry, or None when it resolves outside the audio directory."""
+        rel = self._relative(os.path.join(self.audio_dir, stored)) if stored else None
+        return os.path.join(self.audio_dir, rel) if rel else None
+
+    def _import_legacy(self, path: str) -> None:
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            data = json.loads(content) if content else {}
+        except Exception as e:
+            self.logger.warning("tts_cache_load_failed", detail=str(e), path=path)
+            return
+        # The JSON index stored absolute paths; keep only those inside this directory
+        rows = []
+        for k, v in data.items():
+            rel = self._relative(v.get("path") or "") if isinstance(v, dict) and v.get("path") else None
+            if rel:
+                rows.append((k, rel, int(v.get("size") or -1), v.get("duration_seconds"), v.get("provider"), float(v.get("ts") or 0.0)))
+        self._conn.executemany("INSERT OR IGNORE INTO entries(key, path, size, duration_seconds, provider, ts) VALUES(?,?,?,?,?,?)", rows)
+        self._conn.commit()
+        self._count = len(rows)
+
+    @staticmethod
+    def make_key(narration: str, voice: str, rate: int, sample_rate: int, provider: str, voice_name: Optional[str] = None) -> str:
+        raw = "\n".join([SYNTH_VERSION, provider, voice, voice_name or "", str(rate), str(sample_rate), narration or ""])
+        return hashlib.sha256(raw.encode("utf-8", errors="ignore")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the index entry for `key` if its audio file is still intact."""
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, duration_seconds, provider, ts FROM entries WHERE key=?", (key,)
+            ).fetchone()
+            entry = None
+            if row is not None:
+                entry = {"path": self._resolve(row[0]), "size": row[1], "duration_seconds": row[2], "provider": row[3], "ts": row[4]}
+                try:
+                    intact = entry["path"] is not None and os.path.getsize(entry["path"]) == int(entry["size"])
+                except OSError:
+                    intact = False
+                if not intact:
+                    self._conn.execute("DELETE FROM entries WHERE key=?", (key,))
+                    self._conn.commit()
+                    self._count = max(0, self._count - 1)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, path: str, provider: str) -> Optional[Dict[str, Any]]:
+        """Record a freshly written audio file (one row; oldest entries beyond the cap are evicted).
+
+        Files outside the audio directory are not cached.
+        """
+        if self._conn is None:
+            return None
+        rel = self._relative(path)
+        if rel is None:
+            return None
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        entry = {"path": path, "size": size, "duration_seconds": wav_duration(path), "provider": provider, "ts": time.time()}
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries(key, path, size, duration_seconds, provider, ts) VALUES(?,?,?,?,?,?)",
+                    (key, rel, size, entry["duration_seconds"], provider, entry["ts"]),
+                )
+                self._count += 1
+                if self.max_entries > 0 and self._count > self.max_entries:
+                    # Exact count only when the running estimate crosses the cap
+                    self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                    excess = self._count - self.max_entries
+                    if excess > 0:
+                        self._conn.execute(
+                            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY ts LIMIT ?)", (excess,)
+                        )
+                        self._count = self.max_entries
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.error("tts_cache_save_failed", detail=str(e), path=self.index_path)
+        return dict(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": self._count,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,49 @@
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from .agents.script_gen_agent import TEMPLATE_PHRASES
+
+
+def phrase_cache_enabled() -> bool:
+    return os.getenv("TTS_PHRASE_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def _phrase_pattern(phrases: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    alts = []
+    # Longest first so "In today’s bulletin:" wins over any shorter overlapping phrase
+    for p in sorted({p.strip() for p in phrases if p and p.strip()}, key=len, reverse=True):
+        # Straight and curly apostrophes are interchangeable
+        alts.append(re.sub(r"['’]", "['’]", re.escape(p)))
+    if not alts:
+        return None
+    # Whole phrases only: bounded by whitespace or the ends of the text
+    return re.compile(r"(?<!\S)(?:" + "|".join(alts) + r")(?!\S)")
+
+
+_DEFAULT_PATTERN = _phrase_pattern(TEMPLATE_PHRASES)
+
+
+def split_template(narration: str, phrases: Optional[Iterable[str]] = None) -> List[Tuple[str, bool]]:
+    """Split narration into `(text, is_template)` segments in spoken order.
+
+    Template segments are the fixed script wording (`TEMPLATE_PHRASES` from
+    the script generator by default), whose audio does not depend on the
+    story; everything between them is variable text.
+    """
+    pattern = _DEFAULT_PATTERN if phrases is None else _phrase_pattern(phrases)
+    text = narration or ""
+    if pattern is None:
+        return [(text.strip(), False)] if text.strip() else []
+    out: List[Tuple[str, bool]] = []
+    pos = 0
+    for m in pattern.finditer(text):
+        before = text[pos:m.start()].strip()
+        if before:
+            out.append((before, False))
+        out.append((m.group(0), True))
+        pos = m.end()
+    rest = text[pos:].strip()
+    if rest:
+        out.append((rest, False))
+    return out
@@ -0,0 +1,150 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from .agents.tts_agent_stub import TTSAgentStub
+from .logging_utils import PipelineLogger, StageLogger
+
+
+def parse_pool_sizes(raw: Optional[str]) -> Dict[str, int]:
+    """Parse `pyttsx3=1,stub=4` into `{provider: workers}`."""
+    out: Dict[str, int] = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.split("=", 1)
+        try:
+            out[k.strip().lower()] = max(1, int(v))
+        except ValueError:
+            continue
+    return out
+
+
+def pool_size_for(provider: str) -> int:
+    # pyttsx3 keeps one engine per driver per process, so more workers only queue on it
+    defaults = {"pyttsx3": 1, "stub": min(4, os.cpu_count() or 1)}
+    sizes = {**defaults, **parse_pool_sizes(os.getenv("TTS_POOL_SIZES"))}
+    return sizes.get(provider, 1)
+
+
+_STOP = object()
+
+
+class TTSPool:
+    """Worker threads that synthesize scripts from a shared queue.
+
+    Every worker warms its provider engine once when it starts (COM init,
+    `pyttsx3.init()`, voice lookup) and reuses it for each script it takes,
+    instead of paying engine startup per item. Workers share one agent, and
+    with it the audio cache. Pool size comes from TTS_POOL_SIZES per provider
+    (`pyttsx3=1,stub=4` by default; stub is capped by the core count).
+    """
+
+    def __init__(
+        self,
+        voice: str = "en-US-Neural-1",
+        size: Optional[int] = None,
+        logger: Optional[PipelineLogger] = None,
+        agent: Optional[TTSAgentStub] = None,
+    ):
+        self.log = logger or PipelineLogger(component="tts_pool")
+        self.agent = agent or TTSAgentStub(voice=voice, logger=self.log)
+        self.provider = self.agent._effective_provider()
+        self.size = max(1, int(size or pool_size_for(self.provider)))
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start(self) -> None:
+        # Caller holds the lock; workers start on first use
+        if self._threads:
+            return
+        for i in range(self.size):
+            t = threading.Thread(target=self._worker, name=f"tts-{self.provider}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        self.log.info("tts_pool_started", provider=self.provider, workers=self.size)
+
+    def _worker(self) -> None:
+        self.agent.warm()
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is _STOP:
+                    return
+                fut, fn, args, kwargs = job
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    fut.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    fut.set_exception(e)
+        finally:
+            self.agent.release_engine()
+
+    def _enqueue(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("TTSPool is closed")
+            self._start()
+            self._jobs.put((fut, fn, args, kwargs))
+        return fut
+
+    def submit(
+        self,
+        script: Dict[str, Any],
+        category: str = "general",
+        rate: Optional[int] = None,
+        voice: Optional[str] = None,
+    ) -> Future:
+        return self._enqueue(self.agent.synthesize_item, script, category=category, rate=rate, voice=voice)
+
+    def render(self, narration: str, audio_path: str, rate: Optional[int] = None) -> Future:
+        """Write raw narration audio to `audio_path` on a worker's engine.
+
+        Nothing is cached, delivered or indexed; the future resolves to the
+        provider that produced the file (None on failure).
+        """
+        return self._enqueue(self.agent._render_audio, narration, audio_path, rate)
+
+    def synthesize_item(
+        self,
+        script: Dict[str, Any],
+        category: str = "general",
+        rate: Optional[int] = None,
+        voice: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return self.submit(script, category, rate, voice).result()
+
+    def synthesize(self, scripts: List[Dict[str, Any]], category: str = "general") -> List[Dict[str, Any]]:
+        """Pool counterpart of `TTSAgentStub.synthesize`; output order follows input order."""
+        run = StageLogger(source="pipeline", category=category, meta={"stage": "voice", "voice": self.agent.voice, "workers": self.size})
+        run.start("voice")
+        futures = [self.submit(s, category) for s in scripts]
+        outputs = [f.result() for f in futures]
+        run.complete("voice", meta={"count": len(outputs), "workers": self.size, "cache": self.agent.cache.stats()})
+        run.end_run("completed")
+        self.log.info("tts_generated", count=len(outputs), workers=self.size, cache=self.agent.cache.stats())
+        return outputs
+
+    def close(self) -> None:
+        """Finish queued scripts, then stop the workers and release their engines."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(_STOP)
+        for t in threads:
+            t.join()
+
+    def __enter__(self) -> "TTSPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
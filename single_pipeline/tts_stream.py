@@ -0,0 +1,174 @@
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .audio_codec import convert_pcm, read_pcm
+from .logging_utils import PipelineLogger
+from .tts_pool import TTSPool
+
+# Latin sentence ends plus the Devanagari danda / double danda; line breaks always split
+_SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|(?<=[।॥])(?=\S)|\n+")
+
+
+def split_sentences(text: str, min_chars: Optional[int] = None) -> List[str]:
+    """Split narration into sentence chunks for incremental synthesis.
+
+    Fragments shorter than `min_chars` (TTS_CHUNK_MIN_CHARS, default 24) are
+    merged forward so abbreviations and one-word lines do not become
+    separate, choppy chunks.
+    """
+    if min_chars is None:
+        min_chars = int(os.getenv("TTS_CHUNK_MIN_CHARS", "24"))
+    parts = [p.strip() for p in _SENTENCE_END.split(text or "") if p and p.strip()]
+    out: List[str] = []
+    buf = ""
+    for p in parts:
+        buf = f"{buf} {p}" if buf else p
+        if len(buf) >= min_chars:
+            out.append(buf)
+            buf = ""
+    if buf:
+        if out and len(buf) < min_chars:
+            out[-1] = f"{out[-1]} {buf}"
+        else:
+            out.append(buf)
+    return out
+
+
+def wav_stream_header(channels: int, sampwidth: int, framerate: int) -> bytes:
+    """RIFF/WAVE header with unknown (maximal) sizes, for audio of unknown length."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, channels, framerate, framerate * channels * sampwidth, channels * sampwidth, sampwidth * 8,
+        b"data", 0xFFFFFFFF,
+    )
+
+
+class ChunkedVoice:
+    """Sentence-chunked narration synthesis with in-order, progressive output.
+
+    Each sentence is rendered on the shared `TTSPool` into a temporary file,
+    so chunks synthesize in parallel where the provider allows it without
+    leaving per-sentence files, cache rows or deliveries behind. Output is
+    consumed in sentence order as each chunk completes, so time to first
+    audio is the time of the first sentence:
+    - `wav_stream()` yields a streaming WAV (header, then PCM per chunk);
+    - `events()` yields one dict per chunk (status, provider, duration),
+      then `{"final": item}`.
+    Meanwhile the chunks are appended to a part file that becomes the
+    item's regular narration WAV (and a cache entry for the full text) once
+    every chunk succeeded; `final` is then the usual `synthesize_item` result.
+    """
+
+    def __init__(
+        self,
+        pool: TTSPool,
+        script: Dict[str, Any],
+        category: str = "general",
+        rate: Optional[int] = None,
+        voice: Optional[str] = None,
+        logger: Optional[PipelineLogger] = None,
+    ):
+        self.pool = pool
+        self.script = script
+        self.category = category
+        self.rate = rate
+        self.voice = voice
+        self.log = logger or PipelineLogger(component="tts_stream")
+        narration = (script.get("variants", {}).get("narration") or script.get("title") or "")
+        self.sentences = split_sentences(narration) or [narration]
+        target = pool.agent._target(script, rate, voice)
+        self.audio_path = target["audio_path"]
+        self.audio_url = f"/data/tts/{target['fname']}"
+        self.final: Optional[Dict[str, Any]] = None
+        self.stats: Dict[str, Any] = {"chunks": len(self.sentences)}
+
+    def _run(self) -> Iterator[Tuple[int, Dict[str, Any], Optional[Tuple[int, int, int]], bytes]]:
+        """Yield `(index, chunk item, pcm layout, pcm)` in sentence order and assemble the full WAV."""
+        t0 = time.perf_counter()
+        chunk_dir = tempfile.mkdtemp(prefix="tts_chunks_")
+        chunk_paths = [os.path.join(chunk_dir, f"{i:04d}.wav") for i in range(len(self.sentences))]
+        futures: List[Future] = [
+            self.pool.render(text, path, self.rate) for text, path in zip(self.sentences, chunk_paths)
+        ]
+        part_path = f"{self.audio_path}.{os.getpid()}.{threading.get_ident()}.part"
+        writer: Optional[wave.Wave_write] = None
+        layout: Optional[Tuple[int, int, int]] = None
+        complete = True
+        provider = None
+        try:
+            for i, fut in enumerate(futures):
+                chunk_provider = fut.result()
+                item: Dict[str, Any] = {"status": "success" if chunk_provider else "error", "provider": chunk_provider}
+                pcm = b""
+                if chunk_provider:
+                    src, frames = read_pcm(chunk_paths[i])
+                    if layout is None:
+                        layout = src
+                        writer = wave.open(part_path, "wb")
+                        writer.setnchannels(layout[0])
+                        writer.setsampwidth(layout[1])
+                        writer.setframerate(layout[2])
+                    converted = convert_pcm(frames, src, layout)
+                    if converted is None:
+                        self.log.warning("tts_chunk_format_mismatch", chunk=i, layout=list(src), expected=list(layout))
+                        complete = False
+                    else:
+                        pcm = converted
+                        writer.writeframes(pcm)
+                        item["duration_seconds"] = round(len(pcm) / float(layout[0] * layout[1] * layout[2]), 3)
+                        provider = provider or chunk_provider
+                    os.remove(chunk_paths[i])
+                else:
+                    item["error"] = "chunk_render_failed"
+                    self.log.warning("tts_chunk_failed", chunk=i)
+                    complete = False
+                if i == 0:
+                    self.stats["first_audio_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+                yield i, item, layout, pcm
+            if writer is not None:
+                writer.close()
+                writer = None
+                if complete:
+                    self.pool.agent.adopt_audio(self.script, part_path, provider or "stub", self.rate, self.voice)
+                    self.final = self.pool.synthesize_item(self.script, self.category, self.rate, self.voice)
+            self.stats["total_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            self.stats["complete"] = complete
+            self.log.info("tts_stream_complete", file=self.audio_path, **self.stats)
+        finally:
+            # Client went away or a chunk raised: skip chunks not yet started and drop the part file
+            for fut in futures:
+                fut.cancel()
+            if writer is not None:
+                writer.close()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    def wav_stream(self) -> Iterator[bytes]:
+        header_sent = False
+        for _, _, layout, pcm in self._run():
+            if not header_sent and layout is not None:
+                header_sent = True
+                yield wav_stream_header(*layout)
+            if pcm:
+                yield pcm
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        for i, item, _, _ in self._run():
+            yield {"chunk": i, "text": self.sentences[i], "item": item}
+        yield {"final": self.final, "stats": self.stats}
+
+    def run(self) -> Optional[Dict[str, Any]]:
+        """Synthesize every chunk without streaming; returns the full item (None if a chunk failed)."""
+        for _ in self._run():
+            pass
+        return self.final
@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+
+def _data_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "data"))
+
+
+# Job lifecycle: queued -> leased -> done | queued (nack, retry or expired lease) | dead (budget spent)
+JOB_STATUSES = ("queued", "leased", "done", "dead")
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class WorkQueue:
+    """Durable job queue on SQLite with leases, priorities and acknowledgements.
+
+    Workers `lease()` the highest-priority available job of a stage; the job
+    stays invisible to other workers until its visibility timeout expires, so
+    a crashed worker's job is picked up again automatically. `ack()` marks it
+    done (optionally enqueuing the next stage in the same transaction) and
+    `nack()` schedules a retry or moves it to `dead` after `max_attempts`.
+
+    Several worker processes can share the DB file (WORK_QUEUE_DB, default
+    `data/work_queue.db`). SQLite locking needs a local filesystem or a
+    network filesystem with working POSIX locks when workers span hosts.
+    """
+
+    def __init__(self, path: Optional[str] = None, visibility_timeout: Optional[float] = None):
+        self.path = path or os.getenv("WORK_QUEUE_DB") or os.path.join(_data_root(), "work_queue.db")
+        self.visibility_timeout = float(visibility_timeout or os.getenv("WORK_QUEUE_VISIBILITY_SECONDS", "300"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; write transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA busy_timeout=30000;")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                bucket TEXT,
+                priority REAL NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                lease_owner TEXT,
+                lease_expires REAL,
+                available_at REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_stage_ready ON jobs(stage, status, priority DESC, id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_run_stage ON jobs(run_id, stage, status);
+            """
+        )
+
+    @staticmethod
+    def _row(r: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(r)
+        job["payload"] = json.loads(job["payload"]) if job.get("payload") else None
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+    def _insert(self, stage: str, payload: Dict[str, Any], run_id: str, priority: float, bucket: Optional[str],
+                max_attempts: int, delay: float, now: float) -> int:
+        cur = self._conn.execute(
+            "INSERT INTO jobs(run_id, stage, bucket, priority, payload, max_attempts, available_at, created_at, updated_at) "
+            "VALUES(?,?,?,?,?,?,?,?,?)",
+            (run_id, stage, bucket, float(priority), json.dumps(payload, ensure_ascii=False), int(max_attempts), now + delay, now, now),
+        )
+        return int(cur.lastrowid)
+
+    def enqueue(
+        self,
+        stage: str,
+        payload: Dict[str, Any],
+        run_id: str,
+        priority: float = 0.0,
+        bucket: Optional[str] = None,
+        max_attempts: int = 3,
+        delay: float = 0.0,
+    ) -> int:
+        with self._lock:
+            return self._insert(stage, payload, run_id, priority, bucket, max_attempts, delay, time.time())
+
+    def enqueue_many(self, stage: str, jobs: List[Dict[str, Any]], run_id: str, max_attempts: int = 3) -> List[int]:
+        """Enqueue `[{"payload", "priority"?, "bucket"?}]` in one transaction."""
+        now = time.time()
+        ids: List[int] = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for j in jobs:
+                    ids.append(self._insert(stage, j["payload"], run_id, j.get("priority", 0.0), j.get("bucket"), max_attempts, 0.0, now))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def lease(self, stage: str, worker_id: str, limit: int = 1, visibility_timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Atomically claim up to `limit` ready jobs; expired leases are reclaimed.
+
+        An expired lease whose job already spent `max_attempts` is moved to
+        `dead` (error `lease_expired`) instead, so a job that keeps crashing
+        its worker is not retried forever.
+        """
+        now = time.time()
+        vt = float(visibility_timeout or self.visibility_timeout)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status='dead', error='lease_expired', lease_owner=NULL, lease_expires=NULL, updated_at=? "
+                    "WHERE stage=? AND status='leased' AND lease_expires<? AND attempts>=max_attempts",
+                    (now, stage, now),
+                )
+                rows = self._conn.execute(
+                    "SELECT id FROM jobs WHERE stage=? AND available_at<=? AND "
+                    "(status='queued' OR (status='leased' AND lease_expires<?)) "
+                    "ORDER BY priority DESC, id LIMIT ?",
+                    (stage, now, now, int(limit)),
+                ).fetchall()
+                ids = [r["id"] for r in rows]
+                for job_id in ids:
+                    self._conn.execute(
+                        "UPDATE jobs SET status='leased', lease_owner=?, lease_expires=?, attempts=attempts+1, updated_at=? WHERE id=?",
+                        (worker_id, now + vt, now, job_id),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if not ids:
+                return []
+            marks = ",".join("?" * len(ids))
+            got = self._conn.execute(f"SELECT * FROM jobs WHERE id IN ({marks}) ORDER BY priority DESC, id", ids).fetchall()
+        return [self._row(r) for r in got]
+
+    def extend(self, job_id: int, worker_id: str, visibility_timeout: Optional[float] = None) -> bool:
+        """Heartbeat: push the lease deadline out for a long-running job."""
+        now = time.time()
+        vt = float(visibility_timeout or self.visibility_timeout)
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_expires=?, updated_at=? WHERE id=? AND status='leased' AND lease_owner=?",
+                (now + vt, now, job_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def ack(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: Optional[Dict[str, Any]] = None,
+        next_stage: Optional[str] = None,
+        next_priority: Optional[float] = None,
+    ) -> bool:
+        """Mark a leased job done; returns False if the lease was lost meanwhile.
+
+        With `next_stage`, the result is enqueued for that stage atomically.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT run_id, bucket, priority, max_attempts FROM jobs WHERE id=? AND status='leased' AND lease_owner=?",
+                    (job_id, worker_id),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                self._conn.execute(
+                    "UPDATE jobs SET status='done', result=?, error=NULL, lease_owner=NULL, lease_expires=NULL, updated_at=? WHERE id=?",
+                    (json.dumps(result, ensure_ascii=False) if result is not None else None, now, job_id),
+                )
+                if next_stage and result is not None:
+                    prio = row["priority"] if next_priority is None else next_priority
+                    self._insert(next_stage, result, row["run_id"], prio, row["bucket"], row["max_attempts"], 0.0, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def nack(self, job_id: int, worker_id: str, error: str, retry_delay: float = 0.0) -> str:
+        """Release a failed job for retry, or mark it `dead` once attempts are spent."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT attempts, max_attempts FROM jobs WHERE id=? AND status='leased' AND lease_owner=?",
+                    (job_id, worker_id),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return "lost"
+                status = "dead" if row["attempts"] >= row["max_attempts"] else "queued"
+                self._conn.execute(
+                    "UPDATE jobs SET status=?, error=?, lease_owner=NULL, lease_expires=NULL, available_at=?, updated_at=? WHERE id=?",
+                    (status, error, now + max(0.0, retry_delay), now, job_id),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return status
+
+    def counts(self, run_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """`{stage: {status: n}}`, optionally for one run."""
+        sql = "SELECT stage, status, COUNT(*) AS n FROM jobs"
+        args: List[Any] = []
+        if run_id:
+            sql += " WHERE run_id=?"
+            args.append(run_id)
+        sql += " GROUP BY stage, status"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        out: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            out.setdefault(r["stage"], {})[r["status"]] = r["n"]
+        return out
+
+    def results(self, run_id: str, stage: str) -> List[Dict[str, Any]]:
+        """Results of a run's finished jobs for one stage, in submission order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM jobs WHERE run_id=? AND stage=? AND status='done' ORDER BY id",
+                (run_id, stage),
+            ).fetchall()
+        return [json.loads(r["result"]) for r in rows if r["result"]]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .agents.script_gen_agent import ScriptGenAgent
+from .agents.tts_agent_stub import TTSAgentStub
+from .agents.avatar_agent_stub import AvatarAgentStub
+from .logging_utils import PipelineLogger
+from .bucket_orchestrator import (
+    PRIORITY_ORDER,
+    _backoff_delay,
+    _route_bucket,
+    _style_for_bucket,
+    _voice_for_bucket,
+)
+from .work_queue import WorkQueue, new_run_id
+from .priority import priority_of
+
+
+QUEUE_STAGES = ["scripts", "voice", "avatar"]
+NEXT_STAGE = {"scripts": "voice", "voice": "avatar", "avatar": None}
+
+
+def _output_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "output"))
+
+
+def _sanitize_identifier(s: str) -> str:
+    import re as _re
+    cleaned = _re.sub(r"[^a-zA-Z0-9_-]", "", (s or "").strip())
+    return cleaned or "default"
+
+
+def _job_priority(it: Dict[str, Any], bucket: str) -> float:
+    # priority_score orders jobs; bucket priority only breaks ties
+    order = PRIORITY_ORDER
+    rank = float(len(order) - order.index(bucket)) if bucket in order else 0.0
+    return round(priority_of(it), 4) + rank / 1000.0
+
+
+def submit_items(
+    items: List[Dict[str, Any]],
+    registry: str = "single",
+    category: str = "general",
+    voice: Optional[str] = None,
+    style: Optional[str] = None,
+    queue: Optional[WorkQueue] = None,
+    run_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Enqueue filtered items as `scripts` jobs of a new run.
+
+    Items are routed to buckets like BucketOrchestrator; voice/style default
+    to the bucket's when not given. Returns `{run_id, count}`.
+    """
+    q = queue or WorkQueue()
+    run_id = run_id or new_run_id()
+    jobs = []
+    for it in items:
+        bucket = _route_bucket((it.get("language") or "en").lower(), (it.get("tone") or "news").lower())
+        params = {
+            "registry": registry,
+            "category": category,
+            "bucket": bucket,
+            "voice": voice or _voice_for_bucket(bucket),
+            "style": style or _style_for_bucket(bucket),
+        }
+        jobs.append({"payload": {"item": it, "params": params}, "priority": _job_priority(it, bucket), "bucket": bucket})
+    max_attempts = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3"))
+    q.enqueue_many("scripts", jobs, run_id, max_attempts=max_attempts)
+    return {"run_id": run_id, "count": len(jobs)}
+
+
+def export_run(run_id: str, registry: str = "single", queue: Optional[WorkQueue] = None) -> Dict[str, Any]:
+    """Write a run's finished stage outputs to `output/{registry}_{run_id}_{stage}.json`."""
+    q = queue or WorkQueue()
+    files: Dict[str, str] = {}
+    root = _output_root()
+    os.makedirs(root, exist_ok=True)
+    for stage in QUEUE_STAGES:
+        items = [r.get("item") for r in q.results(run_id, stage)]
+        path = os.path.join(root, f"{_sanitize_identifier(registry)}_{_sanitize_identifier(run_id)}_{stage}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        files[stage] = path
+    return {"run_id": run_id, "files": files, "counts": q.counts(run_id)}
+
+
+class StageWorker:
+    """Leases jobs of one stage, runs the agent and acks/nacks them.
+
+    Agents are created once per (voice|style) and reused across jobs. A
+    heartbeat keeps the lease alive while a long render or synthesis runs.
+    """
+
+    def __init__(
+        self,
+        stage: str,
+        queue: Optional[WorkQueue] = None,
+        worker_id: Optional[str] = None,
+        batch: int = 1,
+        poll_seconds: float = 1.0,
+    ):
+        if stage not in NEXT_STAGE:
+            raise ValueError(f"unknown stage: {stage}")
+        self.stage = stage
+        self.queue = queue or WorkQueue()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{stage}"
+        self.batch = max(1, int(batch))
+        self.poll_seconds = float(poll_seconds)
+        self.log = PipelineLogger(component=f"worker_{stage}")
+        self.retry_base_seconds = float(os.getenv("ORCH_RETRY_BASE_SECONDS", "0.5"))
+        self.retry_max_seconds = float(os.getenv("ORCH_RETRY_MAX_SECONDS", "8"))
+        self._agents: Dict[Tuple[str, str], Any] = {}
+        self.stats = {"done": 0, "retried": 0, "dead": 0, "lost": 0}
+
+    def _agent(self, params: Dict[str, Any]) -> Any:
+        if self.stage == "scripts":
+            key = ("scripts", "")
+        elif self.stage == "voice":
+            key = ("voice", params.get("voice") or "")
+        else:
+            key = ("avatar", params.get("style") or "")
+        if key not in self._agents:
+            if self.stage == "scripts":
+                self._agents[key] = ScriptGenAgent(logger=self.log)
+            elif self.stage == "voice":
+                self._agents[key] = TTSAgentStub(voice=key[1] or "en-US-Neural-1", logger=self.log)
+            else:
+                self._agents[key] = AvatarAgentStub(style=key[1] or "news-anchor", logger=self.log)
+        return self._agents[key]
+
+    def process(self, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Run one job payload; returns (next payload, error)."""
+        item = payload.get("item") or {}
+        params = payload.get("params") or {}
+        category = params.get("category") or "general"
+        agent = self._agent(params)
+        if self.stage == "scripts":
+            out = agent.generate_item(item)
+            if (out.get("stage_status") or {}).get("script") == "failed":
+                return None, "script_failed"
+        elif self.stage == "voice":
+            out = agent.synthesize_item(item, category=category)
+            if out.get("status") != "success" or not out.get("audio_path"):
+                return None, str(out.get("error") or "voice_failed")
+        else:
+            out = agent.render_item(item, category=category)
+        return {"item": out, "params": params}, None
+
+    def _heartbeat(self, job_id: int, stop: threading.Event) -> None:
+        interval = max(1.0, self.queue.visibility_timeout / 3.0)
+        while not stop.wait(interval):
+            if not self.queue.extend(job_id, self.worker_id):
+                return
+
+    def _handle(self, job: Dict[str, Any]) -> None:
+        stop = threading.Event()
+        hb = threading.Thread(target=self._heartbeat, args=(job["id"], stop), daemon=True)
+        hb.start()
+        try:
+            try:
+                result, error = self.process(job["payload"] or {})
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            stop.set()
+        if error is None:
+            if self.queue.ack(job["id"], self.worker_id, result, next_stage=NEXT_STAGE[self.stage]):
+                self.stats["done"] += 1
+            else:
+                self.stats["lost"] += 1
+                self.log.warning("job_lease_lost", job_id=job["id"], stage=self.stage)
+            return
+        delay = _backoff_delay(int(job.get("attempts") or 1) - 1, self.retry_base_seconds, self.retry_max_seconds)
+        status = self.queue.nack(job["id"], self.worker_id, error, retry_delay=delay)
+        key = {"queued": "retried", "dead": "dead"}.get(status, "lost")
+        self.stats[key] += 1
+        log = self.log.error if status == "dead" else self.log.warning
+        log("job_failed", job_id=job["id"], stage=self.stage, run_id=job.get("run_id"), error=error, status=status)
+
+    def run(self, once: bool = False, max_jobs: Optional[int] = None) -> Dict[str, int]:
+        """Work until stopped; with `once`, return as soon as no job is ready."""
+        handled = 0
+        self.log.info("worker_started", worker_id=self.worker_id, stage=self.stage)
+        while max_jobs is None or handled < max_jobs:
+            jobs = self.queue.lease(self.stage, self.worker_id, limit=self.batch)
+            if not jobs:
+                if once:
+                    break
+                time.sleep(self.poll_seconds)
+                continue
+            for job in jobs:
+                self._handle(job)
+                handled += 1
+        self.log.info("worker_stopped", worker_id=self.worker_id, stage=self.stage, **self.stats)
+        return dict(self.stats)
+
+
+if __name__ == "__main__":
+    import argparse
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    parser = argparse.ArgumentParser(description="News-Ai queue worker")
+    parser.add_argument("--stage", choices=QUEUE_STAGES, help="Stage to work on")
+    parser.add_argument("--batch", type=int, default=1, help="Jobs leased per poll")
+    parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when idle")
+    parser.add_argument("--once", action="store_true", help="Exit when no job is ready")
+    parser.add_argument("--worker-id", default=None)
+    parser.add_argument("--submit", action="store_true", help="Enqueue <registry>_filtered.json as a new run")
+    parser.add_argument("--status", metavar="RUN_ID", default=None, help="Show job counts for a run")
+    parser.add_argument("--export", metavar="RUN_ID", default=None, help="Write a run's stage outputs to output/")
+    parser.add_argument("--registry", default="single")
+    parser.add_argument("--category", default="general")
+    parser.add_argument("--voice", default=None)
+    parser.add_argument("--style", default=None)
+    args = parser.parse_args()
+
+    if args.submit:
+        from .streaming import iter_json_items
+        path = os.path.join(_output_root(), f"{_sanitize_identifier(args.registry)}_filtered.json")
+        out = submit_items(list(iter_json_items(path)), registry=args.registry, category=args.category,
+                           voice=args.voice, style=args.style)
+        print(json.dumps(out, ensure_ascii=False))
+    elif args.status:
+        print(json.dumps({"run_id": args.status, "counts": WorkQueue().counts(args.status)}, ensure_ascii=False))
+    elif args.export:
+        print(json.dumps(export_run(args.export, registry=args.registry), ensure_ascii=False))
+    elif args.stage:
+        worker = StageWorker(args.stage, worker_id=args.worker_id, batch=args.batch, poll_seconds=args.poll)
+        try:
+            stats = worker.run(once=args.once)
+        except KeyboardInterrupt:
+            stats = dict(worker.stats)
+        print(json.dumps({"stage": args.stage, "worker_id": worker.worker_id, **stats}, ensure_ascii=False))
+    else:
+        parser.print_help()
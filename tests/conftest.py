@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_media_index(tmp_path_factory, monkeypatch):
+    # Keep agents' media rows out of the repo's data/media_index.db and the janitor thread out of tests
+    monkeypatch.setenv("MEDIA_INDEX_DB", str(tmp_path_factory.mktemp("media") / "media_index.db"))
+    monkeypatch.setenv("MEDIA_JANITOR_ENABLED", "0")
@@ -0,0 +1,48 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+
+
+def _script():
+    return {"title": "Codec", "lang": "en", "tone": "news", "variants": {"narration": "three short words"}}
+
+
+def _agent(tmp_path, monkeypatch, codec):
+    monkeypatch.setenv("TTS_PROVIDER", "stub")
+    monkeypatch.setenv("TTS_SAMPLE_RATE", "8000")
+    monkeypatch.setenv("TTS_AUDIO_CODEC", codec)
+    return TTSAgentStub(output_base=str(tmp_path))
+
+
+def test_delivery_falls_back_to_wav_without_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    out = _agent(tmp_path, monkeypatch, "opus").synthesize_item(_script())
+    assert out["status"] == "success"
+    assert out["delivery_path"] == out["audio_path"] and out["delivery_url"] == out["audio_url"]
+    assert out["metadata"]["delivery_format"] == "wav"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake ffmpeg is a shell script")
+def test_stub_pcm_is_streamed_to_the_encoder(tmp_path, monkeypatch):
+    # Stand-in ffmpeg: copies stdin (raw PCM) to its last argument
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    fake = bindir / "ffmpeg"
+    fake.write_text('#!/bin/sh\nfor a; do out="$a"; done\ncat > "$out"\n')
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bindir) + os.pathsep + os.environ.get("PATH", ""))
+
+    agent = _agent(tmp_path, monkeypatch, "opus")
+    out = agent.synthesize_item(_script())
+    assert out["delivery_path"].endswith(".ogg") and out["delivery_url"].endswith(".ogg")
+    assert out["metadata"]["delivery_format"] == "opus"
+    # The encoder saw exactly the WAV's PCM, and the WAV is still there for renderers
+    assert os.path.getsize(out["delivery_path"]) == os.path.getsize(out["audio_path"]) - 44
+    assert not any(".tmp" in n for n in os.listdir(tmp_path))
+
+    again = agent.synthesize_item(_script())
+    assert again["metadata"]["cache"] == "hit" and again["delivery_path"] == out["delivery_path"]
@@ -0,0 +1,38 @@
+from single_pipeline.autoscaler import Autoscaler, allocate, parse_bounds
+
+
+ORDER = ["HI-NEWS", "EN-NEWS", "EN-KIDS"]
+
+
+def test_spike_gets_the_spare_budget():
+    caps = allocate(4, {"HI-NEWS": 40, "EN-KIDS": 1}, {"HI-NEWS": 2.0, "EN-KIDS": 2.0}, {}, ORDER)
+    assert caps["HI-NEWS"] == 3
+    assert caps["EN-KIDS"] == 1
+    # Idle buckets keep a cap of one so new arrivals are not starved
+    assert caps["EN-NEWS"] == 1
+
+
+def test_bounds_and_latency_shape_allocation():
+    bounds = parse_bounds("HI-NEWS=1:2,EN-NEWS=2:6")
+    assert bounds == {"HI-NEWS": (1, 2), "EN-NEWS": (2, 6)}
+    caps = allocate(6, {"HI-NEWS": 50, "EN-NEWS": 10, "EN-KIDS": 10}, {"EN-NEWS": 5.0, "EN-KIDS": 0.5}, bounds, ORDER)
+    assert caps["HI-NEWS"] == 2
+    assert caps["EN-NEWS"] >= 2
+    # Slow EN-NEWS items outweigh the same backlog of fast EN-KIDS ones
+    assert caps["EN-NEWS"] > caps["EN-KIDS"]
+
+
+def test_tick_applies_caps_and_counts_decisions():
+    applied = []
+    backlog = {"HI-NEWS": 10}
+    scaler = Autoscaler(ORDER, bounds={}, interval=60)
+    scaler.add_target("shards", 3, lambda: dict(backlog), applied.append)
+    scaler.observe("shards", "HI-NEWS", 1.5)
+    scaler.tick()
+    scaler.tick()
+    assert applied[-1]["HI-NEWS"] == 3
+    assert scaler.decisions == 1
+    backlog.update({"EN-KIDS": 5})
+    scaler.tick()
+    assert applied[-1]["HI-NEWS"] == 2 and applied[-1]["EN-KIDS"] == 1
+    assert scaler.stop()["decisions"] == 2
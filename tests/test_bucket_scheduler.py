@@ -0,0 +1,95 @@
+import threading
+import time
+
+from single_pipeline.bucket_scheduler import BucketScheduler, priority_weights
+
+
+ORDER = ["HI-NEWS", "EN-NEWS", "TA-NEWS"]
+
+
+def test_weighted_turns_follow_priority_order():
+    sched = BucketScheduler(
+        {"HI-NEWS": [{"i": i} for i in range(30)], "TA-NEWS": [{"i": i} for i in range(30)]},
+        ORDER,
+        batch_size=1,
+    )
+    picks = []
+    for _ in range(8):
+        bucket, _batch = sched.next_batch()
+        picks.append(bucket)
+        sched.done(bucket)
+    w = priority_weights(ORDER)
+    assert w["HI-NEWS"] > w["TA-NEWS"]
+    assert picks.count("HI-NEWS") > picks.count("TA-NEWS") > 0
+
+
+def test_workers_steal_when_home_bucket_is_empty():
+    sched = BucketScheduler(
+        {"EN-NEWS": [{"i": i} for i in range(12)], "TA-NEWS": [{"i": 0}]},
+        ORDER,
+        caps={"EN-NEWS": 4, "TA-NEWS": 1},
+        batch_size=2,
+    )
+    homes = sched.home_buckets(3)
+    assert set(homes) == {"EN-NEWS", "TA-NEWS"}
+    seen = []
+    lock = threading.Lock()
+
+    def worker(home):
+        while True:
+            got = sched.next_batch(home)
+            if got is None:
+                return
+            bucket, batch = got
+            time.sleep(0.01)
+            with lock:
+                seen.extend((bucket, it["i"]) for it in batch)
+            sched.done(bucket)
+
+    threads = [threading.Thread(target=worker, args=(h,)) for h in homes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert len(seen) == 13
+    assert sched.stats["steals"] >= 1
+    assert sched.backlog() == {"HI-NEWS": 0, "EN-NEWS": 0, "TA-NEWS": 0}
+
+
+def test_caps_block_until_done():
+    sched = BucketScheduler({"HI-NEWS": [{"i": 0}, {"i": 1}]}, ORDER, caps={"HI-NEWS": 1}, batch_size=1)
+    first = sched.next_batch()
+    got = []
+    t = threading.Thread(target=lambda: got.append(sched.next_batch()))
+    t.start()
+    time.sleep(0.05)
+    assert got == []
+    sched.done(first[0])
+    t.join(timeout=2)
+    assert got and got[0][1] == [{"i": 1}]
+
+
+def test_streaming_put_blocks_on_inflight_window():
+    sched = BucketScheduler({}, ORDER, batch_size=2, closed=False, max_inflight=3)
+    fed = []
+
+    def feed():
+        for i in range(7):
+            sched.put("EN-NEWS", {"i": i})
+            fed.append(i)
+        sched.close()
+
+    t = threading.Thread(target=feed)
+    t.start()
+    time.sleep(0.05)
+    assert len(fed) == 3
+    seen = []
+    while True:
+        got = sched.next_batch()
+        if got is None:
+            break
+        seen.extend(it["i"] for it in got[1])
+        sched.done(got[0], len(got[1]))
+    t.join(timeout=2)
+    assert seen == list(range(7))
+    assert sched.stats["peak_inflight"] == 3
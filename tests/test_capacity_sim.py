@@ -0,0 +1,50 @@
+import json
+import sqlite3
+
+from single_pipeline.capacity_sim import ArrivalModel, CapacitySimulator, LatencyModel
+
+
+FIXED = {s: {"dist": "fixed", "seconds": 1.0} for s in ("scripts", "voice", "avatar")}
+
+
+def _burst(n, lang="en", tone="news"):
+    return [(0.0, {"id": f"i{i}", "language": lang, "tone": tone, "priority_score": 0.5}) for i in range(n)]
+
+
+def test_shards_batches_follow_scheduler_caps():
+    sim = CapacitySimulator(LatencyModel.from_spec(FIXED), mode="shards", workers=4, caps={"EN-NEWS": 1}, batch_size=2)
+    report = sim.run(_burst(4))
+    en = report["buckets"]["EN-NEWS"]
+    # Cap 1: two batches of two items run back to back, 6 s each
+    assert report["makespan_seconds"] == 12.0
+    assert (en["ttv_p50"], en["ttv_p99"]) == (6.0, 12.0)
+    assert en["queue_max"] == 4
+
+
+def test_pipelined_overlaps_stages():
+    sim = CapacitySimulator(LatencyModel.from_spec(FIXED), mode="pipelined",
+                            caps={}, stage_workers={"scripts": 1, "voice": 1, "avatar": 1})
+    report = sim.run(_burst(4))
+    # Fill 3 s, then one video per second
+    assert report["makespan_seconds"] == 6.0
+    assert report["completed"] == 4
+
+
+def test_latency_from_stage_events_is_per_item(tmp_path):
+    db = tmp_path / "app.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE pipeline_stage_events (run_id TEXT, stage TEXT, status TEXT, duration_ms INTEGER, meta TEXT, ended_at TEXT)")
+    conn.execute("INSERT INTO pipeline_stage_events VALUES ('r', 'avatar', 'completed', 8000, ?, NULL)",
+                 (json.dumps({"bucket": "HI-NEWS", "count": 4}),))
+    conn.commit()
+    conn.close()
+    model = LatencyModel.from_stage_events(str(db))
+    assert model.samples[("avatar", "HI-NEWS")] == [2.0]
+    assert model.summary()["avatar"]["source"] == "measured"
+
+
+def test_arrival_mix_routes_like_orchestrator():
+    import random
+    arrivals = ArrivalModel(0, ArrivalModel.parse_mix("hi:news=1"), burst=3).generate(60, random.Random(1))
+    sim = CapacitySimulator(LatencyModel.from_spec(FIXED), workers=1, caps={})
+    assert list(sim.run(arrivals)["buckets"]) == ["HI-NEWS"]
@@ -13,4 +13,36 @@ def test_basic_language_detect_supports_more_scripts():
     }
     for code, text in samples.items():
         lang = agent._basic_language_detect(text)
-        assert lang in (code, "mixed", "unknown")
\ No newline at end of file
+        assert lang in (code, "mixed", "unknown")
+
+class _CountingTagger:
+    version = "t1"
+
+    def __init__(self):
+        self.calls = 0
+
+    def tag_text(self, title, body, language=None):
+        self.calls += 1
+        return {"category": "tech", "tone": "neutral", "audience": "general"}
+
+
+def _filter(agent, item):
+    agent.begin_batch()
+    agent.filter_item(item)
+    return agent.end_batch()["expensive"]["tagged"]
+
+
+def test_tagged_counts_only_calls_that_reach_the_tagger(tmp_path):
+    from single_pipeline.tag_cache import TagCache
+
+    agent = FilterAgent()
+    agent.tag_cache = TagCache(cache_path=str(tmp_path / "tag_cache.json"))
+    item = {"title": "Chip exports rise", "body": "Shipments grew again this quarter."}
+
+    agent.uniguru = None
+    assert _filter(agent, item) == 0
+
+    agent.uniguru = _CountingTagger()
+    assert _filter(agent, item) == 1
+    # Tag-cache hit: no tagging work
+    assert _filter(agent, item) == 0 and agent.uniguru.calls == 1
@@ -0,0 +1,28 @@
+import time
+
+from single_pipeline.filter_cascade import FilterCascade
+
+
+def test_rules_reject_cheaply_and_count():
+    cascade = FilterCascade(min_body_chars=10, max_age_hours=24, source_blocklist=["spamwire"])
+    now = time.time()
+    items = [
+        {"title": "Fresh story", "body": "Long enough body text.", "timestamp": now - 60},
+        {"title": "Fresh story", "body": "Long enough body text.", "timestamp": now - 60},
+        {"title": "Blocked", "body": "Long enough body text.", "source": {"name": "SpamWire"}},
+        {"title": "Short", "body": "tiny"},
+        {"title": "Old", "body": "Long enough body text.", "timestamp": now - 3 * 86400},
+    ]
+    results = [cascade.evaluate(it, now=now) for it in items]
+    assert [r[0] for r in results] == [True, False, False, False, False]
+    assert [r[1] for r in results[1:]] == ["exact_hash", "source_blocklist", "length", "age"]
+    stats = cascade.stats()
+    assert stats["exact_hash"] == {"pass": 4, "reject": 1}
+    assert stats["age"] == {"pass": 1, "reject": 1}
+
+
+def test_seen_scope_cache_uses_lookup(monkeypatch):
+    monkeypatch.setenv("FILTER_SEEN_SCOPE", "cache")
+    cascade = FilterCascade(seen_hashes=lambda h: True)
+    passed, rule, reason = cascade.evaluate({"title": "t", "body": "b"})
+    assert not passed and reason == "duplicate_seen"
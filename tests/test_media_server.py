@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import pytest
+
+from server.media import MediaFiles, RangeNotSatisfiable, parse_range
+
+
+def _get(app, path, headers=None, method="GET", query=b"", extensions=None):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(msg):
+        sent.append(msg)
+
+    scope = {
+        "type": "http", "method": method, "path": path, "root_path": "", "query_string": query,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    }
+    if extensions:
+        scope["extensions"] = extensions
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body, sent
+
+
+@pytest.fixture
+def media(tmp_path):
+    (tmp_path / "clip.wav").write_bytes(bytes(range(256)) * 4)
+    (tmp_path / "phrases").mkdir()
+    (tmp_path / "phrases" / "phrase_0123456789abcdef.wav").write_bytes(b"phrase")
+    return MediaFiles(str(tmp_path), max_age=60, sendfile=True)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=900-", 1000) == (900, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=990-5000", 1000) == (990, 999)
+    assert parse_range("bytes=0-1,5-6", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=1000-", 1000)
+
+
+def test_etag_revalidation_and_ranges(media):
+    status, headers, body, _ = _get(media, "/clip.wav")
+    assert status == 200 and len(body) == 1024 and headers["accept-ranges"] == "bytes"
+    assert headers["content-type"].startswith("audio/")
+    etag = headers["etag"]
+    assert headers["cache-control"] == "public, max-age=60, must-revalidate"
+
+    status, _, body, _ = _get(media, "/clip.wav", {"If-None-Match": etag})
+    assert status == 304 and body == b""
+
+    status, headers, body, _ = _get(media, "/clip.wav", {"Range": "bytes=256-511"})
+    assert status == 206 and body == bytes(range(256)) and headers["content-range"] == "bytes 256-511/1024"
+
+    # A stale If-Range validator gets the full, current file
+    status, _, body, _ = _get(media, "/clip.wav", {"Range": "bytes=0-9", "If-Range": '"old"'})
+    assert status == 200 and len(body) == 1024
+
+    status, headers, _, _ = _get(media, "/clip.wav", {"Range": "bytes=5000-"})
+    assert status == 416 and headers["content-range"] == "bytes */1024"
+
+    status, headers, _, _ = _get(media, "/clip.wav", query=f"v={etag.strip(chr(34))}".encode())
+    assert "immutable" in headers["cache-control"]
+
+
+def test_content_addressed_names_traversal_and_sendfile(media):
+    status, headers, body, _ = _get(media, "/phrases/phrase_0123456789abcdef.wav", method="HEAD")
+    assert status == 200 and body == b"" and "immutable" in headers["cache-control"] and headers["content-length"] == "6"
+    assert _get(media, "/../" + os.path.basename(__file__))[0] == 404
+    assert _get(media, "/missing.wav")[0] == 404
+    _, _, _, sent = _get(media, "/clip.wav", {"Range": "bytes=10-19"}, extensions={"http.response.zerocopysend": {}})
+    assert sent[-1]["type"] == "http.response.zerocopysend" and (sent[-1]["offset"], sent[-1]["count"]) == (10, 10)
+
+
+def test_file_removed_after_resolve_is_a_404(media, tmp_path, monkeypatch):
+    # Retention may delete a file between the path check and the open
+    monkeypatch.setattr(media, "_resolve", lambda scope: ("gone.wav", str(tmp_path / "gone.wav")))
+    status, _, body, sent = _get(media, "/gone.wav")
+    assert status == 404 and body == b"Not Found" and len(sent) == 2
@@ -0,0 +1,71 @@
+from single_pipeline import bucket_orchestrator as bo
+
+
+def _orchestrator(monkeypatch, dead):
+    monkeypatch.setenv("ORCH_ITEM_RETRIES", "2")
+    monkeypatch.setenv("ORCH_RETRY_BASE_SECONDS", "0")
+    monkeypatch.setattr(bo, "_record_dead_letter", lambda stage, et, em, payload: dead.append((stage, et, payload)))
+    return bo.BucketOrchestrator(registry="retry_test")
+
+
+def test_retries_are_per_item_and_good_items_pass(monkeypatch):
+    dead = []
+    orch = _orchestrator(monkeypatch, dead)
+    calls = {}
+
+    def fn(it):
+        calls[it["id"]] = calls.get(it["id"], 0) + 1
+        if it["id"] == "bad":
+            raise RuntimeError("boom")
+        if it["id"] == "flaky" and calls["flaky"] == 1:
+            raise TimeoutError("slow")
+        return {**it, "ok": True}
+
+    items = [{"id": "a"}, {"id": "bad"}, {"id": "flaky"}, {"id": "b"}]
+    outputs, failed = orch._run_items("voice", "EN-NEWS", items, fn)
+    assert [o["id"] for o in outputs] == ["a", "flaky", "b"]
+    assert failed == 1
+    # Good items run once; only the failing item spends its whole budget
+    assert calls == {"a": 1, "bad": 3, "flaky": 2, "b": 1}
+    assert len(dead) == 1
+    stage, error_type, payload = dead[0]
+    assert (stage, error_type) == ("voice", "RuntimeError")
+    assert payload["id"] == "bad" and payload["attempts"] == 3
+
+
+def test_failed_status_counts_as_item_failure(monkeypatch):
+    dead = []
+    orch = _orchestrator(monkeypatch, dead)
+    out = orch._retry(lambda: {"status": "failed", "error": "no_file"}, "voice", {"bucket": "HI-NEWS"}, ok=bo._voice_ok)
+    assert out is None
+    assert dead[0][1] == "ItemFailed"
+
+
+def test_backoff_is_bounded():
+    for attempt in range(10):
+        d = bo._backoff_delay(attempt, 0.5, 8.0)
+        assert 0.0 <= d <= min(8.0, 0.5 * 2 ** attempt)
+
+
+def test_pipelined_reports_degraded_and_failed_buckets(monkeypatch, tmp_path):
+    dead = []
+    monkeypatch.setattr(bo, "_output_root", lambda: str(tmp_path))
+    orch = _orchestrator(monkeypatch, dead)
+    orch.item_retries = 0
+    orch._generate = lambda it: {**it, "script": {}}
+    orch._synthesize = lambda voice, s: (
+        {"status": "failed", "error": "tts"} if s["id"].startswith("bad") else {**s, "status": "success", "audio_path": "a.wav"}
+    )
+    orch._render = lambda bucket, style, v: {**v, "video_url": "v.mp4"}
+    routed = [
+        ("HI-NEWS", {"id": "ok1"}), ("HI-NEWS", {"id": "bad1"}),
+        ("EN-NEWS", {"id": "bad2"}),
+        ("TA-NEWS", {"id": "ok2"}),
+    ]
+    out = orch.run_pipelined(routed)
+    by_bucket = {r["bucket"]: r for r in out["results"]}
+    assert by_bucket["HI-NEWS"]["status"] == "degraded"
+    assert by_bucket["HI-NEWS"]["failed"] == {"scripts": 0, "voice": 1, "avatar": 0}
+    assert by_bucket["EN-NEWS"]["status"] == "failed"
+    assert by_bucket["TA-NEWS"]["status"] == "success"
+    assert out["buckets_success"] == 2 and out["success"]
@@ -0,0 +1,63 @@
+import time
+
+from single_pipeline.priority import DeadlinePolicy, PriorityScorer
+from single_pipeline.stage_executor import BucketQueue
+
+
+def test_fresh_trending_items_rank_first():
+    now = time.time()
+    scorer = PriorityScorer(half_life_hours=6, engagement_lookup=lambda keys: {"g-hot": {"views": 40, "quality_sum": 32}})
+    items = [
+        {"id": "old", "dedup_key": "g-old", "timestamp": now - 48 * 3600},
+        {"id": "fresh", "dedup_key": "g-fresh", "timestamp": now - 600},
+        {"id": "hot1", "dedup_key": "g-hot", "timestamp": now - 600},
+        {"id": "hot2", "dedup_key": "g-hot", "timestamp": now - 900},
+        {"id": "hot3", "dedup_key": "g-hot", "timestamp": now - 1200},
+    ]
+    scorer.score(items, now=now)
+    by_id = {it["id"]: it for it in items}
+    assert by_id["hot1"]["trend_score"] > by_id["fresh"]["trend_score"] == 0.0
+    assert by_id["hot1"]["priority_score"] > by_id["fresh"]["priority_score"] > by_id["old"]["priority_score"]
+
+
+def test_engagement_is_zero_without_a_working_lookup():
+    now = time.time()
+    item = {"id": "a", "dedup_key": "g", "timestamp": now}
+
+    def broken(keys):
+        raise RuntimeError("db locked")
+
+    for scorer in (PriorityScorer(), PriorityScorer(engagement_lookup=broken)):
+        scorer.score([item], now=now)
+        assert item["trend_score"] == 0.0 and item["priority_score"] == 0.5
+
+def test_bucket_queue_serves_highest_priority_across_buckets():
+    q = BucketQueue(10, order=["HI-NEWS", "EN-NEWS"], priority=lambda it: it["p"])
+    q.put("HI-NEWS", {"p": 0.2})
+    q.put("EN-NEWS", {"p": 0.9})
+    q.put("HI-NEWS", {"p": 0.5})
+    got = []
+    for _ in range(3):
+        b, it = q.get()
+        got.append((b, it["p"]))
+        q.task_done(b)
+    assert got == [("EN-NEWS", 0.9), ("HI-NEWS", 0.5), ("HI-NEWS", 0.2)]
+
+
+def test_deadline_policy_degrades_when_estimate_overruns():
+    policy = DeadlinePolicy(deadlines={"EN-NEWS": 60}, est_seconds=5)
+    assert not policy.should_degrade("EN-NEWS", {})
+    assert not policy.should_degrade("TA-NEWS", {})
+    policy.observe("EN-NEWS", 120)
+    assert policy.should_degrade("EN-NEWS", {})
+
+
+def test_deadline_counts_from_item_admission():
+    policy = DeadlinePolicy(deadlines={"EN-NEWS": 60}, est_seconds=5)
+    early = DeadlinePolicy.admit({}, now=policy.started_at)
+    late = DeadlinePolicy.admit({}, now=policy.started_at + 300)
+    now = policy.started_at + 320
+    # 320s into the run the early item is overdue, the late one still has 40s
+    assert policy.should_degrade("EN-NEWS", early, now=now)
+    assert not policy.should_degrade("EN-NEWS", late, now=now)
+    assert policy.deadline_at("EN-NEWS", late) == policy.started_at + 360
@@ -0,0 +1,87 @@
+from single_pipeline.run_state import RunStateStore, stage_input_hash
+
+
+def test_skips_unchanged_success_and_redoes_changes(tmp_path):
+    store = RunStateStore(path=str(tmp_path / "state.db"))
+    calls = []
+
+    def fn(it):
+        calls.append(it["id"])
+        return {"id": it["id"], "status": "failed" if it.get("bad") else "success"}
+
+    items = [{"id": "a", "title": "A"}, {"id": "b", "title": "B", "bad": True}]
+    _, counts = store.run_items("voice", items, fn)
+    assert counts == {"skipped": 0, "processed": 2}
+
+    # Timestamps are volatile; only the failed item and the edited item rerun
+    items = [
+        {"id": "a", "title": "A", "timestamps": {"processed_at": "later"}},
+        {"id": "b", "title": "B", "bad": True},
+    ]
+    calls.clear()
+    outputs, counts = store.run_items("voice", items, fn)
+    assert calls == ["b"] and counts == {"skipped": 1, "processed": 1}
+    assert len(outputs) == 2
+
+    calls.clear()
+    store.run_items("voice", [{"id": "a", "title": "A edited"}], fn)
+    assert calls == ["a"]
+    assert store.status("b") == {"voice": "failed"}
+
+
+def test_state_survives_restart_and_checks_artifacts(tmp_path):
+    db = str(tmp_path / "state.db")
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    store = RunStateStore(path=db)
+    item = {"id": "a", "title": "A"}
+    store.run_item("voice", item, lambda it: {"status": "success", "audio_path": str(audio)})
+    store.close()
+
+    store = RunStateStore(path=db)
+    out, skipped = store.run_item("voice", item, lambda it: {"status": "success", "audio_path": str(audio)})
+    assert skipped and out["audio_path"] == str(audio)
+
+    audio.unlink()
+    _, skipped = store.run_item("voice", item, lambda it: {"status": "success", "audio_path": None})
+    assert not skipped
+
+
+def test_params_are_part_of_the_input_hash():
+    it = {"id": "a"}
+    assert stage_input_hash("voice", it, {"voice": "x"}) != stage_input_hash("voice", it, {"voice": "y"})
+
+
+def test_orchestrator_rerun_skips_despite_rescoring(tmp_path, monkeypatch):
+    import json
+
+    from single_pipeline import bucket_orchestrator as bo
+
+    monkeypatch.setenv("RUN_STATE_DB", str(tmp_path / "state.db"))
+    monkeypatch.setattr(bo, "_output_root", lambda: str(tmp_path))
+    (tmp_path / "inc_filtered.json").write_text(json.dumps([
+        {"id": "a", "title": "A", "language": "en", "tone": "news"},
+        {"id": "b", "title": "B", "language": "en", "tone": "news"},
+    ]))
+    # Engagement grows between runs, so every run assigns new scores
+    views = iter(range(1, 100))
+    engagement = lambda keys: {k: {"views": next(views), "quality_sum": 1.0} for k in keys}
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    calls = []
+
+    def _orchestrator():
+        orch = bo.BucketOrchestrator(registry="inc", incremental=True, engagement_lookup=engagement)
+        orch._generate = lambda it: calls.append(("scripts", it["id"])) or {**it, "script": {}}
+        orch._synthesize = lambda voice, s: calls.append(("voice", s["id"])) or {
+            "id": s["id"], "status": "success", "audio_path": str(audio)}
+        orch._render = lambda bucket, style, v: calls.append(("avatar", v["id"])) or {"id": v["id"], "status": "success"}
+        return orch
+
+    first = _orchestrator().run()
+    assert first["success"] and len(calls) == 6
+
+    calls.clear()
+    second = _orchestrator().run()
+    assert calls == []
+    assert second["skipped"] == {"scripts": 2, "voice": 2, "avatar": 2}
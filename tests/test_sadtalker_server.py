@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from scripts.sadtalker_server import RenderService, load_preprocess_cache, serve
+
+SADTALKER_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SadTalker")
+
+
+class _FakeEngine:
+    """Stands in for SadTalker: counts model loads, writes a small mp4 per render."""
+
+    def __init__(self):
+        self.loads = 0
+        self._models = set()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def loaded(self):
+        return sorted(f"{p}@{s}" for p, s in self._models)
+
+    def models(self, preprocess="full", size=256):
+        if (preprocess, size) not in self._models:
+            self.loads += 1
+            self._models.add((preprocess, size))
+
+    def render(self, job, save_dir):
+        self.gate.wait(5)
+        self.models(job.get("preprocess") or "full", int(job.get("size") or 256))
+        out = os.path.join(save_dir, "result.mp4")
+        with open(out, "wb") as f:
+            f.write(b"mp4")
+        return out
+
+
+@pytest.fixture
+def server(tmp_path):
+    engine = _FakeEngine()
+    service = RenderService(engine, output_root=str(tmp_path))
+    httpd = serve(service, port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield engine, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def _call(url, method="GET", body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def _wait_done(base, job_id):
+    for _ in range(100):
+        status, job = _call(f"{base}/jobs/{job_id}")
+        if job["status"] not in ("queued", "running", "withdrawn"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_models_load_once_across_jobs(server, tmp_path):
+    engine, base = server
+    img, wav = tmp_path / "face.png", tmp_path / "voice.wav"
+    img.write_bytes(b"png")
+    wav.write_bytes(b"wav")
+    assert _call(f"{base}/warmup", "POST", {})[1]["models_loaded"] == ["full@256"]
+
+    results = []
+    for _ in range(3):
+        status, job = _call(f"{base}/jobs", "POST", {"source_image": str(img), "driven_audio": str(wav), "result_dir": str(tmp_path / "out")})
+        assert status == 202
+        done = _wait_done(base, job["job_id"])
+        assert done["status"] == "done" and done["result_path"] == str(tmp_path / "out" / f"{job['job_id']}.mp4")
+        assert os.path.isfile(done["result_path"])
+        results.append(done["result_path"])
+    assert engine.loads == 1 and len(set(results)) == 3
+    assert not os.path.exists(tmp_path / "out" / job["job_id"])  # per-job work dir is cleaned
+    health = _call(f"{base}/health")[1]
+    assert health["jobs_done"] == 3 and health["status"] == "ok"
+
+
+def test_bad_jobs_and_cancellation(server, tmp_path):
+    engine, base = server
+    assert _call(f"{base}/jobs", "POST", {"source_image": "/nope.png"})[0] == 400
+    img = tmp_path / "face.png"
+    img.write_bytes(b"png")
+    spec = {"source_image": str(img), "driven_audio": str(img), "result_dir": str(tmp_path)}
+    engine.gate.clear()  # hold the first job so the second stays queued
+    first = _call(f"{base}/jobs", "POST", spec)[1]
+    second = _call(f"{base}/jobs", "POST", spec)[1]
+    assert _call(f"{base}/jobs/{second['job_id']}", "DELETE")[1]["status"] == "cancelled"
+    engine.gate.set()
+    assert _wait_done(base, first["job_id"])["status"] == "done"
+    assert _call(f"{base}/jobs/{second['job_id']}")[1]["status"] == "cancelled"
+    assert _call(f"{base}/jobs/unknown")[0] == 404
+
+
+def test_result_dir_must_stay_below_the_output_root(server, tmp_path):
+    engine, base = server
+    img = tmp_path / "face.png"
+    img.write_bytes(b"png")
+    for result_dir in (str(tmp_path.parent), str(tmp_path / ".." / "elsewhere"), "/etc"):
+        status, body = _call(f"{base}/jobs", "POST", {"source_image": str(img), "driven_audio": str(img), "result_dir": result_dir})
+        assert status == 400 and body["error"] == "invalid_job"
+    assert not (tmp_path.parent / "elsewhere").exists()
+
+def test_withdrawn_running_job_leaves_no_result(server, tmp_path):
+    engine, base = server
+    img = tmp_path / "face.png"
+    img.write_bytes(b"png")
+    engine.gate.clear()
+    job = _call(f"{base}/jobs", "POST", {"source_image": str(img), "driven_audio": str(img), "result_dir": str(tmp_path)})[1]
+    for _ in range(100):
+        if _call(f"{base}/jobs/{job['job_id']}")[1]["status"] == "running":
+            break
+        time.sleep(0.02)
+    assert _call(f"{base}/jobs/{job['job_id']}", "DELETE")[1]["status"] == "withdrawn"
+    engine.gate.set()
+    done = _wait_done(base, job["job_id"])
+    assert done["status"] == "cancelled"
+    assert not os.path.exists(done["result_path"])
+
+
+def test_no_same_provider_speculation_against_the_server(monkeypatch):
+    from single_pipeline import bucket_orchestrator as bo
+
+    monkeypatch.setenv("ORCH_SPECULATIVE", "1")
+    monkeypatch.setenv("AVATAR_PROVIDER", "local")
+    monkeypatch.setenv("SADTALKER_SERVER_URL", "http://127.0.0.1:7861")
+    monkeypatch.delenv("ORCH_SPECULATIVE_PROVIDER", raising=False)
+    assert bo.BucketOrchestrator(registry="spec_test").speculator is None
+    monkeypatch.setenv("ORCH_SPECULATIVE_PROVIDER", "ffmpeg")
+    assert bo.BucketOrchestrator(registry="spec_test").speculator is not None
+
+
+def test_preprocess_cache_is_keyed_by_image_content(tmp_path):
+    anchor = tmp_path / "anchor.png"
+    anchor.write_bytes(b"face-v1")
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "anchor.mat").write_bytes(b"coeffs")
+    (work / "anchor.png").write_bytes(b"crop")
+    cache = load_preprocess_cache(SADTALKER_ROOT, str(tmp_path / "cache"))
+
+    assert cache.get(str(anchor), "full", 256) is None
+    coeff, crop, info = cache.put(str(anchor), "full", 256, str(work / "anchor.mat"), str(work / "anchor.png"), ((512, 512), (0, 0, 512, 512), (1.5, 2, 3, 4)))
+    assert info == [[512, 512], [0, 0, 512, 512], [1.5, 2, 3, 4]]
+
+    # A fresh process (new cache object) reuses the stored entry; another mode or size does not
+    again = load_preprocess_cache(SADTALKER_ROOT, str(tmp_path / "cache"))
+    assert again.get(str(anchor), "full", 256) == (coeff, crop, info)
+    assert again.get(str(anchor), "crop", 256) is None
+    assert again.get(str(anchor), "full", 512) is None
+    assert open(coeff, "rb").read() == b"coeffs"
+
+    # New anchor content means a new entry
+    copy = tmp_path / "renamed.png"
+    copy.write_bytes(b"face-v1")
+    assert again.get(str(copy), "full", 256) is not None
+    anchor.write_bytes(b"face-v2")
+    os.utime(anchor, ns=(1, 1))
+    assert again.get(str(anchor), "full", 256) is None
+    assert again.stats() == {"hits": 2, "misses": 3}
+
+
+def test_inference_fallback_passes_the_shared_cache_dir(tmp_path, monkeypatch):
+    from single_pipeline.agents import avatar_agent_stub as avatar
+
+    root = tmp_path / "SadTalker"
+    root.mkdir()
+    (root / "inference.py").write_text("")
+    img, wav = tmp_path / "face.png", tmp_path / "voice.wav"
+    img.write_bytes(b"png")
+    wav.write_bytes(b"wav")
+    monkeypatch.setenv("SADTALKER_ROOT", str(root))
+    monkeypatch.delenv("SADTALKER_SERVER_URL", raising=False)
+    monkeypatch.delenv("SADTALKER_PREPROCESS_CACHE", raising=False)
+    cmds = []
+    monkeypatch.setattr(avatar, "_run_cancellable", lambda cmd, cancel=None, cwd=None: cmds.append(cmd) or (1, b"no torch"))
+    agent = avatar.AvatarAgentStub(output_base=str(tmp_path / "avatar"))
+    assert not agent._render_via_local(str(img), str(wav), str(tmp_path / "out.mp4"))
+    cmd = cmds[0]
+    assert cmd[cmd.index("--preprocess_cache") + 1] == str(root / "preprocess_cache")
+
+    agent.sadtalker_preprocess_cache = "off"
+    agent._render_via_local(str(img), str(wav), str(tmp_path / "out.mp4"))
+    assert "--preprocess_cache" not in cmds[1]
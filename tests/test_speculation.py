@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from single_pipeline.agents.avatar_agent_stub import _run_cancellable
+from single_pipeline.speculation import LatencyWindow, Speculator
+
+
+def _speculator(**kw):
+    spec = Speculator("avatar", factor=3, min_seconds=0.05, min_samples=3, max_backups=1, **kw)
+    for s in (0.01, 0.01, 0.02):
+        spec.latency.observe(s)
+    return spec
+
+
+def test_threshold_waits_for_samples_then_uses_p95():
+    w = LatencyWindow(size=100)
+    for i in range(1, 101):
+        w.observe(i / 100.0)
+    assert w.percentile(95) == 0.95
+    spec = Speculator("avatar", factor=3, min_seconds=0.5, min_samples=5)
+    assert spec.threshold() is None
+    for _ in range(5):
+        spec.latency.observe(1.0)
+    assert spec.threshold() == 3.0
+
+
+def test_backup_wins_and_straggler_is_cancelled():
+    spec = _speculator()
+    seen = {}
+
+    def primary(cancel, tag):
+        seen["primary_cancelled"] = cancel.wait(5)
+        return {"who": tag}
+
+    def backup(cancel, tag):
+        return {"who": tag}
+
+    started = time.time()
+    out = spec.run(primary, backup, ok=lambda o: True)
+    assert out == {"who": "backup"}
+    assert time.time() - started < 1.0
+    time.sleep(0.05)
+    assert seen["primary_cancelled"] is True
+    assert spec.stats["backup_wins"] == 1
+
+
+def test_fast_primary_never_starts_backup():
+    spec = _speculator()
+    out = spec.run(lambda c, t: {"who": t}, lambda c, t: {"who": t}, ok=lambda o: True)
+    assert out == {"who": "primary"}
+    assert spec.stats["backups"] == 0
+
+
+def test_render_subprocess_is_killed_on_cancel():
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    started = time.time()
+    code, _err = _run_cancellable([sys.executable, "-c", "import time; time.sleep(30)"], cancel)
+    assert code != 0
+    assert time.time() - started < 5
+
+
+def test_late_loser_is_discarded_after_winner_returns():
+    spec = _speculator()
+    discarded = []
+    release = threading.Event()
+
+    def primary(cancel, tag):
+        # Like a process worker: never sees the cancel and finishes anyway
+        release.wait(5)
+        return {"who": tag}
+
+    out = spec.run(primary, lambda c, t: {"who": t}, ok=lambda o: True, discard=discarded.append)
+    assert out == {"who": "backup"}
+    release.set()
+    for _ in range(100):
+        if discarded:
+            break
+        time.sleep(0.01)
+    assert discarded == [{"who": "primary"}]
+
+
+def test_rejected_attempts_are_discarded_when_nothing_wins():
+    spec = _speculator()
+    discarded = []
+    release = threading.Event()
+
+    def primary(cancel, tag):
+        release.wait(5)
+        return {"who": tag}
+
+    def backup(cancel, tag):
+        release.set()
+        return {"who": tag}
+
+    out = spec.run(primary, backup, ok=lambda o: False, discard=discarded.append)
+    # The backup finished first and was rejected; the primary's result is returned as the last outcome
+    assert out == {"who": "primary"}
+    assert discarded == [{"who": "backup"}]
+
+    def failing_primary(cancel, tag):
+        release.wait(5)
+        raise RuntimeError(tag)
+
+    discarded.clear()
+    release.clear()
+    with pytest.raises(RuntimeError, match="primary"):
+        spec.run(failing_primary, backup, ok=lambda o: False, discard=discarded.append)
+    assert discarded == [{"who": "backup"}]
+
+
+def test_only_the_promoted_attempt_reaches_the_final_paths(tmp_path):
+    from single_pipeline.agents.avatar_agent_stub import AvatarAgentStub, discard_attempt, promote_attempt
+
+    agent = AvatarAgentStub(output_base=str(tmp_path))
+    item = {"id": "x1", "title": "Markets", "lang": "en"}
+    winner = agent.render_item(item, provider="ffmpeg", attempt="backup")
+    loser = agent.render_item(item, provider="ffmpeg", attempt="primary")
+    final_meta = winner["pending_files"]["metadata_path"]
+    assert not (tmp_path / "x1_en_news.json").exists()
+
+    promote_attempt(winner)
+    discard_attempt(loser)
+    assert "pending_files" not in winner
+    assert os.path.exists(final_meta)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["x1_en_news.json"]
@@ -0,0 +1,27 @@
+import os
+
+from single_pipeline.stage_backends import StageBackends, parse_stage_backends, run_stage_item
+
+
+ITEM = {"id": "b1", "title": "Markets rally", "body": "Stocks rose today on strong earnings.", "language": "en", "tone": "news"}
+
+
+def test_parse_stage_backends_defaults_to_threads():
+    assert parse_stage_backends("voice=processes,scripts=inline,avatar=gpu") == {
+        "scripts": "inline",
+        "voice": "processes",
+        "avatar": "threads",
+    }
+
+
+def test_process_backend_matches_in_process_result():
+    backends = StageBackends({"scripts": "processes", "voice": "processes", "avatar": "inline"}, process_workers=2)
+    try:
+        script = backends.call("scripts", {}, ITEM)
+        assert script["script"] == run_stage_item("scripts", {}, ITEM)["script"]
+        voice = backends.call("voice", {"voice": "en-US-Neural-1"}, script)
+        assert voice["status"] == "success" and os.path.exists(voice["audio_path"])
+        video = backends.call("avatar", {"style": "news-anchor", "provider": "stub"}, voice)
+        assert video["title"] == ITEM["title"]
+    finally:
+        backends.shutdown()
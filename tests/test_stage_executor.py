@@ -0,0 +1,72 @@
+import threading
+import time
+
+from single_pipeline.stage_executor import PipelinedExecutor, StageSpec
+
+
+def test_stages_overlap_and_preserve_items():
+    results = []
+    events = {}
+    lock = threading.Lock()
+
+    def stage(name):
+        def slow(bucket, it):
+            with lock:
+                events[(name, it["i"], "start")] = time.monotonic()
+            time.sleep(0.05)
+            with lock:
+                events[(name, it["i"], "end")] = time.monotonic()
+            return {**it, "seen": it.get("seen", 0) + 1}
+        return slow
+
+    stages = [StageSpec("a", stage("a"), workers=2), StageSpec("b", stage("b"), workers=2)]
+    ex = PipelinedExecutor(stages, on_result=lambda b, it: results.append(it))
+    ex.start()
+    for i in range(6):
+        ex.submit("EN-NEWS", {"i": i})
+    ex.close_and_wait()
+    assert sorted(r["i"] for r in results) == list(range(6))
+    assert all(r["seen"] == 2 for r in results)
+    # Item 0 moves on to stage b while stage a is still working through the batch
+    assert events[("b", 0, "start")] < events[("a", 5, "end")]
+
+
+def test_bucket_caps_limit_concurrency_and_none_drops():
+    active = {"n": 0, "max": 0}
+    lock = threading.Lock()
+
+    def work(bucket, it):
+        with lock:
+            active["n"] += 1
+            active["max"] = max(active["max"], active["n"])
+        time.sleep(0.02)
+        with lock:
+            active["n"] -= 1
+        return None if it["i"] % 2 else it
+
+    ex = PipelinedExecutor([StageSpec("only", work, workers=4, bucket_caps={"HI-NEWS": 1})])
+    ex.start()
+    for i in range(6):
+        ex.submit("HI-NEWS", {"i": i})
+    stats = ex.close_and_wait()
+    assert active["max"] == 1
+    assert stats["stages"]["only"]["dropped"] == 3
+
+
+def test_max_inflight_bounds_items_inside_pipeline():
+    def slow(bucket, it):
+        time.sleep(0.01)
+        return it
+
+    ex = PipelinedExecutor(
+        [StageSpec("a", slow, workers=2, queue_size=16), StageSpec("b", slow, workers=2, queue_size=16)],
+        max_inflight=4,
+    )
+    ex.start()
+    for i in range(20):
+        ex.submit("EN-NEWS", {"i": i})
+        assert ex.inflight() <= 4
+    stats = ex.close_and_wait()
+    assert stats["peak_inflight"] == 4
+    assert stats["stages"]["b"]["out"] == 20
+    assert ex.inflight() == 0
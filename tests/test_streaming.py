@@ -0,0 +1,47 @@
+import json
+import threading
+
+from single_pipeline.streaming import JsonArraySink, iter_json_array, run_streaming
+
+
+def test_stream_emits_first_output_before_batch_finishes():
+    items = [{"title": f"Stream item {i}", "body": f"Streaming body {i} for the pipeline."} for i in range(3)]
+    fed = []
+    first_out = threading.Event()
+    at_first_output = {}
+
+    def source():
+        for i, it in enumerate(items):
+            if i == 1:
+                # Later inputs are released only after the first video; a batch pipeline would time out here
+                at_first_output["released"] = first_out.wait(10)
+            fed.append(i)
+            yield it
+
+    def on_output(out):
+        if not first_out.is_set():
+            at_first_output["fed"] = list(fed)
+            first_out.set()
+
+    out = run_streaming(registry="stream_test", items=source(), write_sinks=False, buffer_size=1, on_output=on_output)
+    assert out["count"] == 3
+    assert at_first_output == {"fed": [0], "released": True}
+    assert out["first_output_seconds"] is not None
+    assert out["stages"]["filter"]["in"] == 3
+
+
+def test_json_array_sink_is_valid_json(tmp_path):
+    path = str(tmp_path / "x_voice.json")
+    sink = JsonArraySink(path)
+    sink.write({"a": 1})
+    sink.write({"b": 2})
+    sink.close()
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == [{"a": 1}, {"b": 2}]
+
+
+def test_iter_json_array_streams_across_chunk_boundaries(tmp_path):
+    data = [{"id": i, "body": "x, ] " * i, "n": 123456789} for i in range(40)] + [7, "tail"]
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    assert list(iter_json_array(str(path), chunk_size=5)) == data
@@ -0,0 +1,43 @@
+from single_pipeline.tag_cache import TagCache
+
+
+class CountingTagger:
+    version = "t1"
+
+    def __init__(self):
+        self.calls = 0
+
+    def tag_text(self, title, body, language=None):
+        self.calls += 1
+        return {"category": "tech", "tone": "neutral", "audience": "general"}
+
+
+def test_memoizes_by_content_language_and_persists(tmp_path):
+    path = str(tmp_path / "tag_cache.json")
+    tagger = CountingTagger()
+    cache = TagCache(cache_path=path)
+    cache.tag(tagger, "AI news", "body", "en")
+    cache.tag(tagger, "AI news", "body", "en")
+    cache.tag(tagger, "AI news", "body", "hi")
+    assert tagger.calls == 2
+    assert cache.stats()["hits"] == 1
+    cache.flush()
+
+    reloaded = TagCache(cache_path=path)
+    assert reloaded.tag(tagger, "AI news", "body", "en")["category"] == "tech"
+    assert tagger.calls == 2
+    # A new tagger version must not reuse old results
+    tagger.version = "t2"
+    reloaded.tag(tagger, "AI news", "body", "en")
+    assert tagger.calls == 3
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setenv("TAG_CACHE_MAX_ENTRIES", "2")
+    cache = TagCache(cache_path=str(tmp_path / "c.json"))
+    tagger = CountingTagger()
+    for title in ("a", "b", "c"):
+        cache.tag(tagger, title, "", "en")
+    assert cache.stats()["entries"] == 2
+    cache.tag(tagger, "a", "", "en")
+    assert tagger.calls == 4
@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+from single_pipeline.tts_cache import INDEX_NAME, LEGACY_INDEX_NAME, TTSCache
+
+
+def _agent(tmp_path, monkeypatch, **env):
+    monkeypatch.setenv("TTS_PROVIDER", "stub")
+    monkeypatch.setenv("TTS_SAMPLE_RATE", "8000")
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    return TTSAgentStub(output_base=str(tmp_path))
+
+
+def _script(title, narration):
+    return {"title": title, "lang": "en", "tone": "news", "variants": {"narration": narration}}
+
+
+def test_unchanged_narration_reuses_audio_across_runs(tmp_path, monkeypatch):
+    first = _agent(tmp_path, monkeypatch).synthesize_item(_script("A", "markets rallied today"))
+    assert first["status"] == "success" and first["metadata"]["cache"] == "miss"
+    assert first["metadata"]["duration_seconds"] == 1.29  # 3 words x (0.35s tone + 0.08s pause)
+
+    with sqlite3.connect(str(tmp_path / INDEX_NAME)) as conn:
+        ((path, size),) = conn.execute("SELECT path, size FROM entries").fetchall()
+    # Stored relative to the audio directory
+    assert path == os.path.basename(first["audio_path"]) and size == os.path.getsize(first["audio_path"])
+
+    # Fresh agent (new run); a different title with the same narration maps to the same audio
+    second = _agent(tmp_path, monkeypatch)
+    again = second.synthesize_item(_script("B", "markets rallied today"))
+    assert again["metadata"]["cache"] == "hit"
+    assert again["audio_path"] == first["audio_path"] and again["audio_url"] == first["audio_url"]
+    assert second.cache.stats()["hits"] == 1
+
+
+def test_key_covers_rate_and_missing_files_are_resynthesized(tmp_path, monkeypatch):
+    out = _agent(tmp_path, monkeypatch).synthesize_item(_script("A", "rain expected tonight"))
+    slower = _agent(tmp_path, monkeypatch, TTS_RATE="120").synthesize_item(_script("A", "rain expected tonight"))
+    assert slower["metadata"]["cache"] == "miss"
+
+    os.remove(out["audio_path"])
+    redo = _agent(tmp_path, monkeypatch).synthesize_item(_script("A", "rain expected tonight"))
+    assert redo["metadata"]["cache"] == "miss" and os.path.exists(redo["audio_path"])
+
+
+def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    agent = _agent(tmp_path, monkeypatch, TTS_CACHE_ENABLED="0")
+    agent.synthesize_item(_script("A", "short"))
+    assert agent.synthesize_item(_script("A", "short"))["metadata"]["cache"] == "miss"
+    assert not (tmp_path / INDEX_NAME).exists()
+
+
+def test_legacy_json_index_is_imported_and_cap_evicts_oldest(tmp_path, monkeypatch):
+    audio = tmp_path / "old.wav"
+    audio.write_bytes(b"RIFF....")
+    outside = tmp_path.parent / f"{tmp_path.name}_elsewhere.wav"
+    outside.write_bytes(b"RIFF....")
+    legacy = {
+        "k_old": {"path": str(audio), "size": audio.stat().st_size, "provider": "stub", "ts": 1.0},
+        "k_outside": {"path": str(outside), "size": outside.stat().st_size, "provider": "stub", "ts": 1.0},
+    }
+    (tmp_path / LEGACY_INDEX_NAME).write_text(json.dumps(legacy), encoding="utf-8")
+    monkeypatch.setenv("TTS_CACHE_MAX_ENTRIES", "2")
+    cache = TTSCache(str(tmp_path))
+    assert cache.get("k_old")["path"] == str(audio)
+    assert cache.get("k_outside") is None
+
+    for key in ("k1", "k2"):
+        cache.put(key, str(audio), "stub")
+    assert cache.stats()["entries"] == 2
+    assert cache.get("k_old") is None
+    assert cache.get("k1") is not None and cache.get("k2") is not None
+
+
+def test_entries_resolving_outside_the_audio_dir_are_misses(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "tts"
+    cache = TTSCache(str(audio_dir))
+    outside = tmp_path / "stray.wav"
+    outside.write_bytes(b"RIFF....")
+    assert cache.put("k_out", str(outside), "stub") is None
+
+    cache._conn.execute(
+        "INSERT INTO entries(key, path, size, provider, ts) VALUES(?,?,?,?,?)",
+        ("k_escape", "../stray.wav", outside.stat().st_size, "stub", 1.0),
+    )
+    assert cache.get("k_escape") is None and cache.get("k_out") is None
+
+
+def test_phrase_hit_url_keeps_its_subdirectory(tmp_path, monkeypatch):
+    agent = _agent(tmp_path, monkeypatch)
+    path, _provider = agent._phrase_audio("Here's what happened:", agent.voice, agent.rate)
+    assert os.path.dirname(path) == str(tmp_path / "phrases")
+
+    hit = agent.synthesize_item(_script("A", "Here's what happened:"))
+    assert hit["metadata"]["cache"] == "hit" and hit["audio_path"] == path
+    assert hit["audio_url"] == f"/data/tts/phrases/{os.path.basename(path)}"
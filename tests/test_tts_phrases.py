@@ -0,0 +1,64 @@
+import wave
+
+from single_pipeline.agents.script_gen_agent import ScriptGenAgent
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+from single_pipeline.audio_codec import join_pcm
+from single_pipeline.tts_phrases import split_template
+
+
+class _RecordingAgent(TTSAgentStub):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.rendered = []
+
+    def _render_audio(self, narration, audio_path, rate=None, encoder=None):
+        self.rendered.append(narration)
+        return super()._render_audio(narration, audio_path, rate, encoder=encoder)
+
+
+def _agent(tmp_path, monkeypatch, cls=TTSAgentStub, **env):
+    monkeypatch.setenv("TTS_PROVIDER", "stub")
+    monkeypatch.setenv("TTS_SAMPLE_RATE", "8000")
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    return cls(output_base=str(tmp_path))
+
+
+def _pcm(path):
+    with wave.open(path, "rb") as wf:
+        return wf.readframes(wf.getnframes())
+
+
+def test_split_template_finds_script_gen_boilerplate():
+    text = ScriptGenAgent()._style_variant("Dam opens", "Water released at noon.", "formal")
+    assert split_template(text) == [
+        ("In today’s bulletin:", True), ("Dam opens.", False), ("Key details:", True), ("Water released at noon.", False),
+    ]
+    assert split_template("Here's what happened: rain") == [("Here's what happened:", True), ("rain", False)]
+    assert split_template("A quick take: on markets") == [("A quick take: on markets", False)]
+
+
+def test_only_variable_text_is_synthesized_after_first_use(tmp_path, monkeypatch):
+    agent = _agent(tmp_path, monkeypatch, cls=_RecordingAgent)
+    gen = ScriptGenAgent()
+    for i, title in enumerate(["Rain floods streets", "Markets close higher"]):
+        narration = gen._conversational(title, f"Story body {i}.", "neutral", "general")
+        out = agent.synthesize_item({"title": title, "variants": {"narration": narration}})
+        assert out["status"] == "success"
+    assert agent.rendered == ["Here’s what happened:", "Rain floods streets — Story body 0.", "Markets close higher — Story body 1."]
+
+
+def test_spliced_audio_matches_whole_text_without_crossfade(tmp_path, monkeypatch):
+    narration = "Story time! Owls at night. In simple words: owls hunt in the dark."
+    spliced = _agent(tmp_path / "a", monkeypatch, TTS_PHRASE_CROSSFADE_MS="0").synthesize_item({"title": "Owls", "variants": {"narration": narration}})
+    whole = _agent(tmp_path / "b", monkeypatch, TTS_PHRASE_CACHE_ENABLED="0").synthesize_item({"title": "Owls", "variants": {"narration": narration}})
+    assert _pcm(spliced["audio_path"]) == _pcm(whole["audio_path"])
+
+
+def test_join_pcm_crossfades_each_seam():
+    a = b"\x10\x00" * 10  # 16 repeated
+    b = b"\x20\x00" * 10  # 32 repeated
+    out = join_pcm([a, b], (1, 2, 8000), crossfade_frames=3)
+    assert len(out) == 2 * 17
+    seam = [int.from_bytes(out[i:i + 2], "little", signed=True) for i in range(14, 20, 2)]
+    assert seam == [20, 24, 28]
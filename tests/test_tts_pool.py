@@ -0,0 +1,55 @@
+import threading
+
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+from single_pipeline.stage_backends import StageBackends, parse_stage_backends
+from single_pipeline.tts_pool import TTSPool, pool_size_for
+
+
+class _CountingAgent(TTSAgentStub):
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.warmed = []
+        self.released = []
+
+    def warm(self):
+        self.warmed.append(threading.current_thread().name)
+
+    def release_engine(self):
+        self.released.append(threading.current_thread().name)
+
+
+def _script(i):
+    return {"title": f"T{i}", "lang": "en", "tone": "news", "variants": {"narration": f"story number {i}"}}
+
+
+def test_workers_warm_once_and_keep_input_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_PROVIDER", "stub")
+    monkeypatch.setenv("TTS_SAMPLE_RATE", "8000")
+    agent = _CountingAgent(output_base=str(tmp_path))
+    with TTSPool(agent=agent, size=3) as pool:
+        out = pool.synthesize([_script(i) for i in range(9)])
+        assert [o["title"] for o in out] == [f"T{i}" for i in range(9)]
+        assert all(o["status"] == "success" for o in out)
+        slow = pool.synthesize_item(_script(0), rate=110, voice="en-IN-Custom")
+        assert slow["metadata"]["cache"] == "miss"
+    assert len(agent.warmed) == 3 and sorted(agent.released) == sorted(agent.warmed)
+
+
+def test_pool_size_is_per_provider(monkeypatch):
+    monkeypatch.setenv("TTS_POOL_SIZES", "pyttsx3=2,stub=5,bad=x")
+    assert pool_size_for("pyttsx3") == 2
+    assert pool_size_for("stub") == 5
+    assert pool_size_for("azure") == 1
+
+
+def test_pool_backend_is_voice_only(tmp_path, monkeypatch):
+    assert parse_stage_backends("voice=pool,avatar=pool") == {"scripts": "threads", "voice": "pool", "avatar": "threads"}
+    monkeypatch.setenv("TTS_PROVIDER", "stub")
+    monkeypatch.setenv("TTS_SAMPLE_RATE", "8000")
+    backends = StageBackends({"scripts": "threads", "voice": "pool", "avatar": "threads"})
+    try:
+        out = backends.call("voice", {"voice": "en-US-Neural-1"}, _script(1))
+        assert out["status"] == "success"
+        assert backends.describe()["tts_pool_workers"] >= 1
+    finally:
+        backends.shutdown()
@@ -0,0 +1,66 @@
+import os
+import wave
+
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub
+from single_pipeline.tts_pool import TTSPool
+from single_pipeline.tts_stream import ChunkedVoice, split_sentences
+
+
+NARRATION = "Rains lashed the coast today. Schools stay shut on Monday! Officials urge caution near rivers."
+
+
+def _script(narration=NARRATION):
+    return {"title": "Storm", "lang": "en", "tone": "news", "variants": {"narration": narration}}
+
+
+def _pool(tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_PROVIDER", "stub")
+    monkeypatch.setenv("TTS_SAMPLE_RATE", "8000")
+    return TTSPool(agent=TTSAgentStub(output_base=str(tmp_path)), size=2)
+
+
+def test_split_sentences_handles_danda_and_merges_short_fragments():
+    assert split_sentences("बारिश जारी है। स्कूल बंद रहेंगे।अधिकारी सतर्क हैं॥", min_chars=5) == [
+        "बारिश जारी है।", "स्कूल बंद रहेंगे।", "अधिकारी सतर्क हैं॥",
+    ]
+    assert split_sentences("Dr. Rao spoke. Markets rallied strongly today.", min_chars=20) == [
+        "Dr. Rao spoke. Markets rallied strongly today.",
+    ]
+    assert split_sentences("One.\nTwo?", min_chars=1) == ["One.", "Two?"]
+
+
+def test_stream_is_in_order_and_becomes_the_cached_item(tmp_path, monkeypatch):
+    with _pool(tmp_path, monkeypatch) as pool:
+        chunked = ChunkedVoice(pool, _script())
+        assert len(chunked.sentences) == 3
+        body = b"".join(chunked.wav_stream())
+        final = chunked.final
+        assert final["status"] == "success" and final["metadata"]["cache"] == "hit"
+        assert final["audio_url"] == chunked.audio_url
+        with wave.open(final["audio_path"], "rb") as wf:
+            pcm = wf.readframes(wf.getnframes())
+        # Streamed bytes are the header plus exactly the assembled file's PCM
+        assert body[:4] == b"RIFF" and body[44:] == pcm
+        # Stub audio is per word, so chunked and whole-text synthesis match
+        whole = TTSAgentStub(output_base=str(tmp_path / "whole"))
+        whole_path = whole.synthesize_item(_script())["audio_path"]
+        with wave.open(whole_path, "rb") as wf:
+            assert wf.readframes(wf.getnframes()) == pcm
+        assert chunked.stats["complete"] is True and "first_audio_ms" in chunked.stats
+
+
+def test_events_report_each_chunk_then_the_final_item(tmp_path, monkeypatch):
+    with _pool(tmp_path, monkeypatch) as pool:
+        events = list(ChunkedVoice(pool, _script()).events())
+    assert [e.get("chunk") for e in events[:-1]] == [0, 1, 2]
+    assert all(e["item"]["status"] == "success" and e["item"]["duration_seconds"] > 0 for e in events[:-1])
+    assert events[-1]["final"]["status"] == "success"
+
+
+def test_chunks_leave_only_the_assembled_narration(tmp_path, monkeypatch):
+    with _pool(tmp_path, monkeypatch) as pool:
+        final = ChunkedVoice(pool, _script()).run()
+        entries = pool.agent.cache.stats()["entries"]
+    assert final["status"] == "success"
+    assert sorted(p.name for p in tmp_path.glob("*.wav")) == [os.path.basename(final["audio_path"])]
+    assert entries == 1
@@ -0,0 +1,42 @@
+import math
+import struct
+import wave
+
+import pytest
+
+from single_pipeline.agents import tts_agent_stub
+from single_pipeline.agents.tts_agent_stub import TTSAgentStub, _tone_pcm
+
+
+def _frames(path):
+    with wave.open(str(path), "rb") as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, 8000)
+        data = wf.readframes(wf.getnframes())
+    return struct.unpack(f"<{len(data) // 2}h", data)
+
+
+def test_word_tones_and_pauses_match_reference_samples(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_agent_stub, "np", None)
+    stub = TTSAgentStub(output_base=str(tmp_path))
+    path = tmp_path / "a.wav"
+    stub._write_wav(str(path), sample_rate=8000, text="hello world")
+    frames = _frames(path)
+    tone, pause = int(0.35 * 8000), int(0.08 * 8000)
+    assert len(frames) == 2 * (tone + pause)
+    assert not any(frames[tone:tone + pause])
+    # Sample 100 of "hello": same formula as the original per-sample writer
+    freq = max(140.0, min(360.0, 220.0 + float((sum(ord(c) for c in "hello") % 80) - 40)))
+    i, t = 100, 100 / 8000.0
+    a = 0.25 * min(1.0, i / (8000 * 0.02)) * 0.8 * max(0.2, 1.0 - i / tone)
+    expected = int(a * 32767 * (math.sin(2 * math.pi * freq * t) + 0.3 * math.sin(2 * math.pi * (freq * 2.0) * t)))
+    assert frames[i] == expected
+
+
+def test_numpy_path_matches_pure_python(monkeypatch):
+    if tts_agent_stub.np is None:
+        pytest.skip("numpy not installed")
+    harmonics = ((220.0, 1.0), (440.0, 0.5), (660.0, 0.25))
+    fast = struct.unpack("<4000h", _tone_pcm(harmonics, 4000, 8000))
+    monkeypatch.setattr(tts_agent_stub, "np", None)
+    slow = struct.unpack("<4000h", _tone_pcm(harmonics, 4000, 8000))
+    assert max(abs(x - y) for x, y in zip(fast, slow)) <= 1
@@ -0,0 +1,26 @@
+import json
+
+from single_pipeline.providers.uniguru_local.adapter import UniguruLocalAdapter
+
+
+def test_word_boundaries_and_priority():
+    adapter = UniguruLocalAdapter()
+    # "ai" must not match inside "said"
+    assert adapter.tag_text("He said so", "Nothing else.")["category"] == "general"
+    tags = adapter.tag_text("Breaking: AI startup raises funds", "Stocks rally as markets cheer.")
+    assert tags["category"] == "finance"
+    assert tags["tone"] == "formal"
+
+
+def test_audience_depends_on_language():
+    adapter = UniguruLocalAdapter()
+    assert adapter.tag_text("School students", "", language="hi")["audience"] == "kids"
+    assert adapter.tag_text("School students", "", language="en")["audience"] == "general"
+
+
+def test_keywords_load_from_data_file(tmp_path):
+    path = tmp_path / "kw.json"
+    path.write_text(json.dumps({"category": {"sports": ["cricket", "world cup"]}}), encoding="utf-8")
+    adapter = UniguruLocalAdapter(keywords_path=str(path))
+    assert adapter.tag_text("World Cup final", "")["category"] == "sports"
+    assert adapter.tag_text("Budget", "")["category"] == "general"
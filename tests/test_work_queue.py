@@ -0,0 +1,63 @@
+import time
+
+from single_pipeline.work_queue import WorkQueue
+from single_pipeline.worker import StageWorker, submit_items
+
+
+def test_lease_priority_and_visibility_timeout(tmp_path):
+    q = WorkQueue(path=str(tmp_path / "q.db"), visibility_timeout=0.2)
+    q.enqueue("voice", {"n": 1}, "run1", priority=1)
+    q.enqueue("voice", {"n": 2}, "run1", priority=5)
+    first = q.lease("voice", "w1")
+    assert [j["payload"]["n"] for j in first] == [2]
+    second = q.lease("voice", "w2")
+    assert [j["payload"]["n"] for j in second] == [1]
+    assert q.lease("voice", "w3") == []
+
+    # w1 "crashes": its lease expires and another worker picks the job up
+    time.sleep(0.25)
+    reclaimed = q.lease("voice", "w3", limit=5)
+    assert sorted(j["payload"]["n"] for j in reclaimed) == [1, 2]
+    assert not q.ack(first[0]["id"], "w1", {"late": True})
+    assert q.ack(reclaimed[0]["id"], "w3", {"ok": True}, next_stage="avatar")
+    assert q.counts("run1")["avatar"] == {"queued": 1}
+
+
+def test_nack_retries_then_dead(tmp_path):
+    q = WorkQueue(path=str(tmp_path / "q.db"))
+    q.enqueue("scripts", {"n": 1}, "run1", max_attempts=2)
+    job = q.lease("scripts", "w")[0]
+    assert q.nack(job["id"], "w", "boom") == "queued"
+    job = q.lease("scripts", "w")[0]
+    assert job["attempts"] == 2
+    assert q.nack(job["id"], "w", "boom") == "dead"
+    assert q.counts("run1") == {"scripts": {"dead": 1}}
+
+
+def test_expired_lease_past_budget_is_dead(tmp_path):
+    q = WorkQueue(path=str(tmp_path / "q.db"), visibility_timeout=0.1)
+    q.enqueue("avatar", {"n": 1}, "run1", max_attempts=2)
+    assert q.lease("avatar", "w1")
+    # Each worker "crashes" mid-job; the second expiry spends the budget
+    time.sleep(0.15)
+    assert q.lease("avatar", "w2")[0]["attempts"] == 2
+    time.sleep(0.15)
+    assert q.lease("avatar", "w3") == []
+    assert q.counts("run1") == {"avatar": {"dead": 1}}
+    assert q._conn.execute("SELECT error FROM jobs").fetchone()["error"] == "lease_expired"
+
+
+def test_workers_chain_stages_for_a_run(tmp_path):
+    q = WorkQueue(path=str(tmp_path / "q.db"))
+    items = [
+        {"id": "a1", "title": "Markets rally", "body": "Stocks rose today.", "language": "en", "tone": "news"},
+        {"id": "a2", "title": "खबर", "body": "आज की खबर", "language": "hi", "tone": "news"},
+    ]
+    sub = submit_items(items, registry="queue_test", queue=q)
+    for stage in ("scripts", "voice", "avatar"):
+        stats = StageWorker(stage, queue=q, worker_id=f"t-{stage}").run(once=True)
+        assert stats["done"] == 2
+    counts = q.counts(sub["run_id"])
+    assert all(c == {"done": 2} for c in counts.values())
+    videos = q.results(sub["run_id"], "avatar")
+    assert {v["params"]["bucket"] for v in videos} == {"EN-NEWS", "HI-NEWS"}